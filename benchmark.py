@@ -0,0 +1,195 @@
+"""
+Mediciones de rendimiento del sistema de gestión del taller.
+
+Trabaja sobre un directorio temporal, por lo que no modifica los datos
+reales en data/. Uso:
+
+    python benchmark.py
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import modules.data_manager as data_manager
+import modules.id_generator as id_generator
+from modules.data_manager import DATA_FILES, save_json_data, clear_cache, enum_code_tables, iter_records
+from modules.storage import JsonFileBackend, JsonLinesBackend
+from modules.user_manager import get_user_by_id, update_user, delete_user
+from modules.validators import validate_user_data, validate_tool_data, validate_many
+
+SIZES = [100, 1000, 10000, 100000]
+OPERATIONS_PER_SIZE = 200
+VALIDATION_RECORDS = 100000
+ENCODING_RECORDS = 100000
+
+
+def _use_temp_directory(directory: Path) -> None:
+    """Redirige los archivos de datos y de secuencias al directorio indicado."""
+    for name in list(DATA_FILES):
+        DATA_FILES[name] = directory / f"{name}.json"
+    data_manager.DATA_DIR = directory
+    id_generator.SEQUENCE_FILE = directory / "secuencias.json"
+    clear_cache()
+
+
+def _make_users(count: int) -> List[dict]:
+    """Genera usuarios de prueba con IDs 1..count."""
+    return [
+        {
+            "id": i,
+            "nombre": f"Nombre{i}",
+            "apellido": f"Apellido{i}",
+            "documento": str(10000000 + i),
+            "tipo_usuario": "Estudiante",
+            "email": "",
+            "curso": "3A",
+            "talleres_inscritos": []
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _average_microseconds(operation: Callable[[int], object], ids: List[int]) -> float:
+    """Ejecuta la operación para cada ID y devuelve el promedio en microsegundos."""
+    start = time.perf_counter()
+    for record_id in ids:
+        operation(record_id)
+    return (time.perf_counter() - start) / len(ids) * 1_000_000
+
+
+def benchmark_primary_key() -> None:
+    """Mide lectura, actualización y baja por ID para distintos tamaños."""
+    print("=== Acceso por ID (microsegundos por operación) ===\n")
+    print(f"{'Registros':>10} {'Lectura':>10} {'Actualizar':>12} {'Eliminar':>10}")
+
+    for size in SIZES:
+        save_json_data("usuarios", _make_users(size))
+        step = max(1, size // OPERATIONS_PER_SIZE)
+        ids = list(range(1, size + 1, step))[:OPERATIONS_PER_SIZE]
+
+        # La primera lectura y actualización cargan el archivo y construyen
+        # los índices; se excluyen de la medición
+        get_user_by_id(ids[0])
+        update_user(ids[0], {"curso": "4B"})
+
+        read = _average_microseconds(get_user_by_id, ids)
+        update = _average_microseconds(lambda user_id: update_user(user_id, {"curso": "4B"}), ids)
+        delete = _average_microseconds(delete_user, ids)
+        print(f"{size:>10} {read:>10.1f} {update:>12.1f} {delete:>10.1f}")
+    print()
+
+
+def _make_tools(count: int) -> List[dict]:
+    """Genera herramientas de prueba válidas."""
+    return [
+        {
+            "nombre": f"Herramienta{i}",
+            "tipo": "Herramienta Manual",
+            "marca": "Marca",
+            "modelo": "M1",
+            "estado": "Disponible",
+            "ubicacion": "Taller 1 - Estante A",
+            "fecha_adquisicion": "2024-03-15"
+        }
+        for i in range(count)
+    ]
+
+
+def benchmark_validation() -> None:
+    """Mide el costo de validar un registro completo de usuario y de herramienta."""
+    print("=== Validación (microsegundos por registro) ===\n")
+    users = _make_users(VALIDATION_RECORDS)
+    invalid_users = [
+        {**user, "documento": "12AB", "tipo_usuario": "Invitado", "email": "sin-arroba"}
+        for user in users
+    ]
+    tools = _make_tools(VALIDATION_RECORDS)
+    cases = [
+        ("Usuario válido", validate_user_data, users),
+        ("Usuario inválido", validate_user_data, invalid_users),
+        ("Herramienta válida", validate_tool_data, tools)
+    ]
+
+    print(f"{'Caso':<20} {'Registro':>10}")
+    for label, validator, records in cases:
+        start = time.perf_counter()
+        for record in records:
+            validator(record)
+        elapsed = (time.perf_counter() - start) / len(records) * 1_000_000
+        print(f"{label:<20} {elapsed:>10.2f}")
+    print()
+
+
+def benchmark_batch_validation() -> None:
+    """
+    Mide validate_many sobre todos los usuarios con distinta cantidad de
+    procesos, tanto desde una lista en memoria como desde los registros
+    guardados (iter_records entrega vistas de sólo lectura).
+    """
+    print(f"=== Validación masiva de {VALIDATION_RECORDS} usuarios ===\n")
+    users = _make_users(VALIDATION_RECORDS)
+    save_json_data("usuarios", users)
+    sources = (("memoria", lambda: users), ("guardados", lambda: iter_records("usuarios")))
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cpus})
+
+    print(f"{'Origen':<10} {'Procesos':>10} {'Segundos':>10} {'Aceleración':>12}")
+    for label, source in sources:
+        baseline = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            for _ in validate_many("usuarios", source(), workers=workers):
+                pass
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{label:<10} {workers:>10} {elapsed:>10.2f} {baseline / elapsed:>11.2f}x")
+    print(f"(CPUs disponibles: {cpus})\n")
+
+
+def _best_of(operation: Callable[[], object], repeat: int = 3) -> float:
+    """Ejecuta la operación varias veces y devuelve el mejor tiempo en segundos."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark_compact_encoding(directory: Path) -> None:
+    """Compara tamaño y tiempo de carga del formato normal y el compacto."""
+    print(f"=== Formato compacto de enumeraciones ({ENCODING_RECORDS} registros) ===\n")
+    tools = _make_tools(ENCODING_RECORDS)
+    for i, tool in enumerate(tools, 1):
+        tool["id"] = i
+        tool["tipo"] = "Máquina Eléctrica" if i % 2 else "Equipo de Medición"
+        tool["estado"] = "Fuera de Servicio" if i % 3 else "En Mantenimiento"
+    records = {"usuarios": _make_users(ENCODING_RECORDS), "herramientas": tools}
+
+    print(f"{'Archivo':<20} {'Formato':<10} {'Tamaño (KB)':>12} {'Carga (ms)':>12}")
+    for backend_class, suffix in ((JsonFileBackend, ".json"), (JsonLinesBackend, ".jsonl")):
+        for label, code_tables in (("normal", None), ("compacto", enum_code_tables())):
+            data_files = {name: directory / f"{label}_{name}.json" for name in records}
+            backend = backend_class(data_files, journal=False, code_tables=code_tables)
+            for name, entity_records in records.items():
+                backend.save(name, entity_records)
+                size = (directory / f"{label}_{name}{suffix}").stat().st_size / 1024
+                load = _best_of(lambda: backend.load(name)) * 1000
+                print(f"{name + suffix:<20} {label:<10} {size:>12.0f} {load:>12.1f}")
+    print()
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        _use_temp_directory(Path(directory))
+        benchmark_primary_key()
+        benchmark_compact_encoding(Path(directory))
+        benchmark_batch_validation()
+    benchmark_validation()
+
+
+if __name__ == "__main__":
+    main()
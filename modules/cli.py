@@ -1,4 +1,4 @@
-from .cli_manager import tool_management_menu, user_management_menu
+from .cli_manager import tool_management_menu, user_management_menu, maintenance_management_menu, export_menu
 
 def main_menu():
     while True:
@@ -7,6 +7,7 @@ def main_menu():
         print("2. Gestión de Herramientas y Máquinas")
         print("3. Gestión de Mantenimientos")
         print("4. Gestión de Asignaciones / Préstamos")
+        print("5. Exportar Datos")
         print("0. Salir")
 
         choice = input("Seleccione una opción: ")
@@ -16,9 +17,11 @@ def main_menu():
         elif choice == '2':
             tool_management_menu()
         elif choice == '3':
-            print("Funcionalidad 'Gestión de Mantenimientos' en desarrollo...")
+            maintenance_management_menu()
         elif choice == '4':
             print("Funcionalidad 'Gestión de Asignaciones / Préstamos' en desarrollo...")
+        elif choice == '5':
+            export_menu()
         elif choice == '0':
             print("Saliendo del programa. ¡Hasta pronto!")
             break
@@ -1,5 +1,50 @@
-from modules.user_manager import create_user, get_all_users, format_user_info, get_user_by_id, update_user, delete_user, search_users
-from modules.enums import UserType
+from modules.user_manager import create_user, list_users, format_user_info, get_user_by_id, update_user, delete_user, iter_search_users, import_users_from_csv
+from modules.enums import UserType, MaintenanceType
+from modules.export_manager import EXPORT_FORMATS, export_all
+from modules.table_renderer import USER_COLUMNS, TOOL_COLUMNS, MAINTENANCE_COLUMNS, write_table, write_table_stream
+from modules.tool_manager import list_tools
+from modules.maintenance_manager import (
+    DUE_WINDOW_DAYS, schedule_maintenance, get_due_this_week, reschedule_maintenance,
+    start_maintenance, complete_maintenance, get_tool_history, get_tool_maintenance_summary
+)
+
+# Registros por página en los listados
+PAGE_SIZE = 20
+
+def browse_pages(fetch_page, columns, empty_message: str):
+    """
+    Muestra un listado como tabla, de a una página, con navegación siguiente/anterior.
+
+    Args:
+        fetch_page: Función (cursor, límite) -> (registros, cursor siguiente)
+        columns: Columnas de la tabla (por ejemplo USER_COLUMNS)
+        empty_message: Mensaje a mostrar si no hay registros
+    """
+    cursors = [None]
+    while True:
+        records, next_cursor = fetch_page(cursors[-1], PAGE_SIZE)
+        if not records and len(cursors) == 1:
+            print(empty_message)
+            return
+
+        print(f"\n--- Página {len(cursors)} ---")
+        write_table(records, columns)
+
+        options = []
+        if next_cursor:
+            options.append("[s] Siguiente")
+        if len(cursors) > 1:
+            options.append("[a] Anterior")
+        options.append("[0] Volver")
+        choice = input(" ".join(options) + ": ").strip().lower()
+
+        if choice == 's' and next_cursor:
+            cursors.append(next_cursor)
+        elif choice == 'a' and len(cursors) > 1:
+            cursors.pop()
+        elif choice == '0':
+            return
+
 
 def user_management_menu():
     while True:
@@ -9,6 +54,7 @@ def user_management_menu():
         print("3. Eliminar Usuario")
         print("4. Listar Usuarios")
         print("5. Buscar Usuario")
+        print("6. Importar Usuarios desde CSV")
         print("0. Volver al Menú Principal")
 
         choice = input("Seleccione una opción: ")
@@ -130,13 +176,7 @@ def user_management_menu():
                 print("Eliminación de usuario cancelada.")
         elif choice == '4':
             print("\n--- Listado de Usuarios ---")
-            users = get_all_users()
-            if users:
-                for user in users:
-                    print(format_user_info(user))
-                    print("--------------------")
-            else:
-                print("No hay usuarios registrados en el sistema.")
+            browse_pages(list_users, USER_COLUMNS, "No hay usuarios registrados en el sistema.")
         elif choice == '5':
             print("\n--- Buscar Usuario ---")
             search_term = input("Ingrese término de búsqueda (nombre, apellido, documento) o deje en blanco: ").strip()
@@ -149,15 +189,24 @@ def user_management_menu():
                 print("Tipo de usuario no válido. Por favor, elija uno de la lista.")
                 continue
 
-            found_users = search_users(search_term=search_term, user_type=user_type, course=course, role=role)
+            results = iter_search_users(search_term=search_term, user_type=user_type, course=course, role=role)
+            print("\n--- Resultados de la Búsqueda ---")
+            if not write_table_stream(results, USER_COLUMNS):
+                print("No se encontraron usuarios con los criterios de búsqueda especificados.")
+        elif choice == '6':
+            print("\n--- Importar Usuarios desde CSV ---")
+            csv_path = input("Ingrese la ruta del archivo CSV: ").strip()
+            if not csv_path:
+                print("Importación cancelada.")
+                continue
 
-            if found_users:
-                print("\n--- Resultados de la Búsqueda ---")
-                for user in found_users:
-                    print(format_user_info(user))
-                    print("--------------------")
+            success, message, report = import_users_from_csv(csv_path)
+            if success:
+                print(f"¡Éxito! {message}")
             else:
-                print("No se encontraron usuarios con los criterios de búsqueda especificados.")
+                print(f"Error: {message}")
+            for row in report:
+                print(f"Fila {row['fila']} (documento {row['documento'] or 'N/A'}): {'; '.join(row['errores'])}")
         elif choice == '0':
             break
         else:
@@ -182,7 +231,8 @@ def tool_management_menu():
         elif choice == '3':
             print("Funcionalidad 'Eliminar Herramienta' en desarrollo...")
         elif choice == '4':
-            print("Funcionalidad 'Listar Herramientas' en desarrollo...")
+            print("\n--- Listado de Herramientas ---")
+            browse_pages(list_tools, TOOL_COLUMNS, "No hay herramientas registradas en el sistema.")
         elif choice == '5':
             print("Funcionalidad 'Buscar Herramientas' en desarrollo...")
         elif choice == '0':
@@ -191,6 +241,115 @@ def tool_management_menu():
         else:
             print("Opción no válida. Intente de nuevo.")
 
+def _input_id(prompt: str):
+    """Pide un ID numérico; devuelve None si no es válido."""
+    try:
+        return int(input(prompt))
+    except ValueError:
+        print("ID no válido. Por favor, ingrese un número.")
+        return None
+
+def maintenance_management_menu():
+    while True:
+        print("\n--- Menú de Gestión de Mantenimientos ---")
+        print("1. Programar Mantenimiento")
+        print(f"2. Ver Vencimientos (próximos {DUE_WINDOW_DAYS} días)")
+        print("3. Iniciar Mantenimiento")
+        print("4. Completar Mantenimiento")
+        print("5. Reprogramar Mantenimiento")
+        print("6. Historial de una Herramienta")
+        print("0. Volver al Menú Principal")
+
+        choice = input("Seleccione una opción: ")
+
+        if choice == '1':
+            print("\n--- Programar Mantenimiento ---")
+            tool_id = _input_id("ID de la herramienta: ")
+            if tool_id is None:
+                continue
+            scheduled_date = input("Fecha programada (YYYY-MM-DD): ").strip()
+            maintenance_type = input(f"Tipo ({', '.join(MaintenanceType.get_all_values())}) [Preventivo]: ").strip() \
+                or MaintenanceType.PREVENTIVO.value
+            frequency = input("Frecuencia en días del plan preventivo (deje en blanco si no se repite): ").strip()
+            if frequency and not frequency.isdigit():
+                print("Frecuencia no válida. Por favor, ingrese un número de días.")
+                continue
+            description = input("Descripción: ").strip()
+            success, message, _ = schedule_maintenance(
+                tool_id, scheduled_date, maintenance_type, int(frequency) if frequency else None, description
+            )
+            print(f"¡Éxito! {message}" if success else f"Error: {message}")
+        elif choice == '2':
+            print(f"\n--- Mantenimientos vencidos o que vencen en los próximos {DUE_WINDOW_DAYS} días ---")
+            due = get_due_this_week()
+            if due:
+                write_table(due, MAINTENANCE_COLUMNS)
+            else:
+                print("No hay mantenimientos pendientes en ese período.")
+        elif choice == '3':
+            maintenance_id = _input_id("ID del mantenimiento a iniciar: ")
+            if maintenance_id is not None:
+                success, message = start_maintenance(maintenance_id)
+                print(f"¡Éxito! {message}" if success else f"Error: {message}")
+        elif choice == '4':
+            maintenance_id = _input_id("ID del mantenimiento a completar: ")
+            if maintenance_id is None:
+                continue
+            cost = input("Costo (deje en blanco si no corresponde): ").strip()
+            try:
+                cost = float(cost) if cost else None
+            except ValueError:
+                print("Costo no válido.")
+                continue
+            notes = input("Observaciones: ").strip()
+            success, message, _ = complete_maintenance(maintenance_id, cost, notes)
+            print(f"¡Éxito! {message}" if success else f"Error: {message}")
+        elif choice == '5':
+            maintenance_id = _input_id("ID del mantenimiento a reprogramar: ")
+            if maintenance_id is not None:
+                new_date = input("Nueva fecha (YYYY-MM-DD): ").strip()
+                success, message = reschedule_maintenance(maintenance_id, new_date)
+                print(f"¡Éxito! {message}" if success else f"Error: {message}")
+        elif choice == '6':
+            tool_id = _input_id("ID de la herramienta: ")
+            if tool_id is None:
+                continue
+            start = input("Desde (YYYY-MM-DD, deje en blanco para no acotar): ").strip() or None
+            end = input("Hasta (YYYY-MM-DD, deje en blanco para no acotar): ").strip() or None
+            maintenance_type = input(f"Tipo ({', '.join(MaintenanceType.get_all_values())}, deje en blanco para todos): ").strip() or None
+            try:
+                history = get_tool_history(tool_id, start, end, maintenance_type)
+            except ValueError:
+                print("Fecha no válida. Use YYYY-MM-DD.")
+                continue
+            print(f"\n--- Historial de la herramienta {tool_id} ---")
+            if history:
+                write_table(history, MAINTENANCE_COLUMNS)
+            else:
+                print("No hay mantenimientos en ese período.")
+            summary = get_tool_maintenance_summary(tool_id)
+            print(f"Mantenimientos: {summary['mantenimientos']} "
+                  f"({summary['preventivos']} preventivos, {summary['correctivos']} correctivos)")
+            print(f"Costo total: {summary['costo_total']:.2f}")
+            if summary['mtbf_dias'] is not None:
+                print(f"Tiempo medio entre fallas: {summary['mtbf_dias']:.1f} días")
+        elif choice == '0':
+            print("Volviendo al Menú Principal...")
+            break
+        else:
+            print("Opción no válida. Intente de nuevo.")
+
+def export_menu():
+    print("\n--- Exportar Datos ---")
+    output_dir = input("Directorio de destino (deje en blanco para 'exportaciones'): ").strip() or "exportaciones"
+    export_format = input(f"Formato ({', '.join(EXPORT_FORMATS)}) [csv]: ").strip().lower() or "csv"
+    if export_format not in EXPORT_FORMATS:
+        print("Formato no válido.")
+        return
+
+    for filename, (success, message, _) in export_all(output_dir, export_format).items():
+        print(f"{'¡Éxito!' if success else 'Error:'} {message}")
+
 def prompt_for_user_data() -> dict:
     print("\n--- Crear Nuevo Usuario ---")
     user_data = {}
@@ -1,65 +1,1763 @@
 """
 Módulo para el manejo de datos JSON.
 Contiene funciones para leer, escribir y gestionar archivos JSON de forma segura.
+
+El almacenamiento concreto lo resuelve un backend intercambiable (ver
+modules/storage.py): por defecto archivos JSON con journal de mutaciones.
+La variable de entorno TALLER_STORAGE permite elegir "jsonl" (JSON Lines,
+recorrible sin cargar todo en memoria) o "sqlite". Con TALLER_COMPACT=1 los
+backends JSON guardan los campos de ENUM_FIELDS como códigos enteros.
+
+Los datos leídos se mantienen en una caché en memoria por entidad. Cada
+entrada se valida contra la firma que informa el backend (fecha de
+modificación y tamaño de los archivos, o versión de la tabla), por lo que
+sólo se vuelven a leer cuando cambiaron en el almacenamiento.
+
+Para modificar muchos registros se puede abrir una transacción:
+
+    with transaction("usuarios", "herramientas"):
+        create_user(...)
+        delete_tool(...)
+
+Dentro del bloque las funciones de los gestores trabajan sobre una copia en
+memoria de cada entidad y, al salir sin errores, cada entidad modificada se
+escribe una sola vez. Si ocurre una excepción no se escribe nada.
 """
+import base64
+import bisect
+import heapq
 import json
 import os
-from typing import Dict, List, Any, Optional
+import threading
+from collections.abc import Sequence
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Iterator, Iterable, Mapping, Set, Callable, Tuple
 from pathlib import Path
 
+from modules.enums import UserType, ToolState, ToolType, MaintenanceType, MaintenanceStatus, AssignmentStatus
+from modules.storage import StorageBackend, StorageError, JsonFileBackend, JsonLinesBackend
+from modules.text_search import normalize_text
+
 # Configuración de rutas
 DATA_DIR = Path("data")
 DATA_FILES = {
     "usuarios": DATA_DIR / "usuarios.json",
-    "herramientas": DATA_DIR / "herramientas.json", 
+    "herramientas": DATA_DIR / "herramientas.json",
     "mantenimientos": DATA_DIR / "mantenimientos.json",
     "asignaciones": DATA_DIR / "asignaciones.json"
 }
+SQLITE_DB_PATH = DATA_DIR / "taller.db"
+
+# Journal de mutaciones del backend JSON (una línea JSON por operación)
+JOURNAL_COMPACTION_THRESHOLD = 500
+
+# Campos que guardan valores de enumeraciones: entidad -> {campo: enumeración}.
+# En formato compacto se escriben como la posición del valor en la enumeración.
+ENUM_FIELDS = {
+    "usuarios": {"tipo_usuario": UserType},
+    "herramientas": {"estado": ToolState, "tipo": ToolType},
+    "mantenimientos": {"tipo": MaintenanceType, "estado": MaintenanceStatus},
+    "asignaciones": {"estado": AssignmentStatus}
+}
+
+# Caché de datos parseados: entidad -> {"signature": firma, "records": [...]}.
+# Las bajas dejan un hueco (None) en "records" en lugar de desplazar la lista;
+# "holes" cuenta los huecos y "positions" (índice de clave primaria, construido
+# al primer uso) mapea id -> posición en "records".
+_cache: Dict[str, Dict[str, Any]] = {}
+HOLE_COMPACTION_MIN = 1024
+_cache_stats = {"hits": 0, "misses": 0}
+
+# Transacción activa de cada hilo
+_local = threading.local()
+
+# Índices hash registrados: entidad -> {campo: función de normalización}.
+# Cada entrada de caché guarda sus índices construidos en entry["indexes"]
+# como nombre -> {clave: {id: registro}}, de modo que se descartan junto con
+# la entrada cuando el archivo cambia en disco.
+_index_definitions: Dict[str, Dict[str, Callable[[Any], Any]]] = {}
+
+# Claves de cada índice registrado (por campo o invertido):
+# entidad -> {nombre: función registro -> claves del registro}
+_index_keys: Dict[str, Dict[str, Callable[[Mapping[str, Any]], Iterable[Any]]]] = {}
+
+# Contadores registrados: entidad -> {nombre: función registro -> clave}.
+# Cada entrada de caché guarda los suyos en entry["counters"] como
+# nombre -> {clave: cantidad}; se mantienen junto con los índices y se
+# guardan en data/<entidad>.contadores.json con la firma de los datos
+# que cuentan, para poder leerlos sin cargar la entidad.
+_counter_definitions: Dict[str, Dict[str, Callable[[Mapping[str, Any]], Any]]] = {}
+# Contadores que suman un valor del registro en lugar de contar:
+# entidad -> {nombre: función registro -> valor entero}
+_counter_amounts: Dict[str, Dict[str, Callable[[Mapping[str, Any]], int]]] = {}
+
+# Índices de prioridad registrados: entidad -> {nombre: función registro -> prioridad}.
+# Cada entrada de caché guarda sus montículos en entry["heaps"] como
+# nombre -> [(prioridad, id), ...]. Las bajas y cambios no se quitan del
+# montículo: los elementos obsoletos se descartan al consultarlo, y el
+# montículo se reconstruye si acumula más de HEAP_REBUILD_FACTOR veces la
+# cantidad de registros.
+_heap_definitions: Dict[str, Dict[str, Callable[[Mapping[str, Any]], Any]]] = {}
+HEAP_REBUILD_FACTOR = 2
+
+# Índices ordenados registrados: entidad -> {nombre: (función registro -> grupos,
+# función registro -> orden)}. Cada entrada de caché guarda los suyos en
+# entry["sorted_indexes"] como nombre -> {grupo: [(orden, id), ...]}, con cada
+# lista ordenada para resolver rangos con búsqueda binaria.
+_sorted_definitions: Dict[str, Dict[str, Tuple[Callable[[Mapping[str, Any]], Iterable[Any]],
+                                               Callable[[Mapping[str, Any]], Any]]]] = {}
+
+
+class RecordsView(Sequence):
+    """
+    Vista de solo lectura sobre los registros en caché de una entidad.
+
+    Cada registro se entrega envuelto en un MappingProxyType, de modo que
+    no se puede modificar la caché por accidente. Para obtener un registro
+    editable usar copy_record(registro).
+    """
+
+    __slots__ = ("_records",)
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self._records = records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordsView(self._records[index])
+        return MappingProxyType(self._records[index])
+
+    def __iter__(self) -> Iterator[MappingProxyType]:
+        return map(MappingProxyType, filter(None, self._records))
+
+
+class _LiveRecords:
+    """
+    Secuencia perezosa de los registros de una entrada, sin los huecos que
+    dejan las bajas. Se entrega a los backends para que sólo recorran la
+    lista cuando realmente necesitan reescribir la entidad.
+    """
+
+    __slots__ = ("_records",)
+
+    def __init__(self, records: List[Optional[Dict[str, Any]]]):
+        self._records = records
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return filter(None, self._records)
+
+
+def enum_code_tables() -> Dict[str, Dict[str, List[str]]]:
+    """
+    Arma las tablas de códigos del formato compacto a partir de ENUM_FIELDS.
+
+    Returns:
+        Diccionario entidad -> {campo: valores en orden de código}
+    """
+    return {
+        filename: {field: enum.get_all_values() for field, enum in fields.items()}
+        for filename, fields in ENUM_FIELDS.items()
+    }
+
+
+def create_backend(kind: str, db_path: Optional[Path] = None, compact: bool = False) -> StorageBackend:
+    """
+    Crea un backend de almacenamiento.
+
+    Args:
+        kind: "json", "jsonl" o "sqlite"
+        db_path: Ruta de la base de datos para "sqlite" (por defecto SQLITE_DB_PATH)
+        compact: Si los backends JSON guardan los campos de ENUM_FIELDS como
+            códigos (SQLite lo ignora: sus columnas indexadas guardan el texto)
+
+    Returns:
+        Backend creado
+
+    Raises:
+        ValueError: Si el tipo de backend no existe
+    """
+    kind = kind.lower()
+    code_tables = enum_code_tables() if compact else None
+    if kind == "json":
+        return JsonFileBackend(DATA_FILES, compaction_threshold=JOURNAL_COMPACTION_THRESHOLD,
+                               code_tables=code_tables)
+    if kind == "jsonl":
+        return JsonLinesBackend(DATA_FILES, compaction_threshold=JOURNAL_COMPACTION_THRESHOLD,
+                                code_tables=code_tables)
+    if kind == "sqlite":
+        from modules.sqlite_storage import SqliteBackend
+        return SqliteBackend(db_path or SQLITE_DB_PATH, DATA_FILES.keys())
+    raise ValueError(f"Backend de almacenamiento desconocido: {kind}")
+
+
+_backend: StorageBackend = create_backend(
+    os.environ.get("TALLER_STORAGE", "json"),
+    compact=os.environ.get("TALLER_COMPACT", "") == "1"
+)
+
+
+def get_backend() -> StorageBackend:
+    """Obtiene el backend de almacenamiento activo."""
+    return _backend
+
+def set_backend(backend: StorageBackend) -> None:
+    """
+    Reemplaza el backend de almacenamiento activo.
+
+    Args:
+        backend: Nuevo backend; la caché se vacía para leer desde él
+    """
+    global _backend
+    _backend = backend
+    clear_cache()
+    recover_storage()
+
+def recover_storage() -> List[str]:
+    """
+    Completa las escrituras de varias entidades que una interrupción dejó a
+    medio publicar y descarta los temporales de las que no se confirmaron.
+    Se ejecuta al arrancar y al cambiar de backend.
+
+    Returns:
+        Entidades recuperadas (vacía si no había nada pendiente o si la
+        recuperación falló; en ese caso se reintenta en el próximo arranque)
+    """
+    try:
+        recovered = _backend.recover()
+    except StorageError:
+        return []
+    for filename in recovered:
+        _cache.pop(filename, None)
+    return recovered
+
+def use_sqlite_storage(db_path: Optional[Path] = None) -> StorageBackend:
+    """
+    Activa el backend SQLite.
+
+    Args:
+        db_path: Ruta de la base de datos (por defecto SQLITE_DB_PATH)
+
+    Returns:
+        El backend SQLite activado
+    """
+    backend = create_backend("sqlite", db_path)
+    set_backend(backend)
+    return backend
+
+def use_jsonl_storage() -> StorageBackend:
+    """
+    Activa el backend JSON Lines.
+
+    Los archivos .json existentes se convierten a .jsonl la primera vez que
+    se accede a cada entidad.
+
+    Returns:
+        El backend JSON Lines activado
+    """
+    backend = create_backend("jsonl")
+    set_backend(backend)
+    return backend
 
 def ensure_data_directory() -> None:
     """Asegura que el directorio de datos exista."""
     DATA_DIR.mkdir(exist_ok=True)
 
+def copy_record(record: Mapping[str, Any]) -> Dict[str, Any]:
+    """Copia un registro incluyendo sus listas y diccionarios anidados."""
+    return {
+        key: value.copy() if isinstance(value, (list, dict)) else value
+        for key, value in record.items()
+    }
+
+def _working_copy(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copia una entrada de caché para trabajar sobre ella en una transacción.
+
+    Además de la lista de registros se copian las posiciones, índices,
+    montículos, índices ordenados y contadores ya construidos: copiarlos es
+    más barato que reconstruirlos y, como la copia reemplaza a la entrada al
+    confirmar, así la caché no los pierde. Los registros se comparten, porque
+    las mutaciones los reemplazan en lugar de modificarlos.
+    """
+    working = {
+        "signature": entry["signature"],
+        "records": list(_live_records(entry))
+    }
+    if "positions" in entry:
+        working["positions"] = dict(entry["positions"])
+    if entry.get("indexes"):
+        working["indexes"] = {
+            name: {key: dict(bucket) for key, bucket in index.items()}
+            for name, index in entry["indexes"].items()
+        }
+    if entry.get("heaps"):
+        working["heaps"] = {name: list(heap) for name, heap in entry["heaps"].items()}
+    if entry.get("sorted_indexes"):
+        working["sorted_indexes"] = {
+            name: {group: list(items) for group, items in index.items()}
+            for name, index in entry["sorted_indexes"].items()
+        }
+    if "counters" in entry:
+        working["counters"] = {name: dict(counter) for name, counter in entry["counters"].items()}
+    return working
+
+class TransactionAborted(StorageError):
+    """La transacción se descartó y sus cambios no se van a guardar."""
+
+
+class Transaction:
+    """
+    Unidad de trabajo sobre una o más entidades.
+
+    Mantiene una copia de trabajo de cada entidad involucrada; las
+    mutaciones se aplican sobre esa copia y se escriben todas juntas al
+    confirmar. Se obtiene a través de transaction().
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty: Set[str] = set()
+        self.rolled_back = False
+        # Bloques transaction() anidados abiertos sobre esta transacción, y
+        # si alguno de ellos la descartó
+        self.depth = 0
+        self.aborted = False
+
+    def enlist(self, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        Incorpora una entidad a la transacción, copiando su estado actual.
+
+        Args:
+            filename: Nombre del archivo (sin extensión)
+
+        Returns:
+            Entrada de trabajo de la entidad o None si no existe
+
+        Raises:
+            TransactionAborted: Si la transacción ya fue descartada
+        """
+        if self.rolled_back:
+            raise TransactionAborted("La transacción ya fue descartada")
+        if filename not in self.entries:
+            entry = _load_cache_entry(filename)
+            if entry is None:
+                return None
+            self.entries[filename] = _working_copy(entry)
+        return self.entries[filename]
+
+    def rollback(self) -> None:
+        """
+        Descarta todos los cambios de la transacción.
+
+        Desde un bloque anidado se descarta también el trabajo de los
+        bloques exteriores, así que se lanza TransactionAborted para que
+        ninguno de ellos siga como si sus cambios se fueran a guardar.
+
+        Raises:
+            TransactionAborted: Si se llama desde un bloque anidado
+        """
+        self._discard()
+        if self.depth:
+            raise TransactionAborted("La transacción se descartó desde un bloque anidado")
+
+    def _discard(self) -> None:
+        """Descarta las copias de trabajo; desde un bloque anidado marca la transacción como abortada."""
+        self.entries.clear()
+        self.dirty.clear()
+        self.rolled_back = True
+        if self.depth:
+            self.aborted = True
+
+    def commit(self) -> None:
+        """
+        Escribe las entidades modificadas, una escritura por entidad.
+
+        Con las entidades bloqueadas (ver StorageBackend.locked) verifica
+        que ninguna haya cambiado en el almacenamiento desde que se incorporó
+        a la transacción, y sin soltar el bloqueo las escribe juntas con
+        save_many, que en los backends JSON las publica de forma atómica:
+        quedan guardadas todas o ninguna.
+
+        Raises:
+            StorageError: Si hubo modificaciones concurrentes o falló la escritura
+        """
+        if not self.dirty:
+            return
+
+        records_by_entity = {filename: _live_records(self.entries[filename]) for filename in self.dirty}
+        with _backend.locked(records_by_entity):
+            for filename in records_by_entity:
+                if _backend.signature(filename) != self.entries[filename]["signature"]:
+                    raise StorageError(f"La entidad '{filename}' fue modificada durante la transacción")
+            try:
+                _backend.save_many(records_by_entity)
+            except StorageError:
+                for filename in records_by_entity:
+                    _cache.pop(filename, None)
+                raise
+            for filename in records_by_entity:
+                self.entries[filename]["signature"] = _backend.signature(filename)
+
+        for filename in records_by_entity:
+            entry = self.entries[filename]
+            _cache[filename] = entry
+            _save_counters(filename, entry)
+        self.dirty.clear()
+
+
+def _current_transaction() -> Optional[Transaction]:
+    """Obtiene la transacción activa del hilo actual, si existe."""
+    return getattr(_local, "transaction", None)
+
+@contextmanager
+def transaction(*filenames: str) -> Iterator[Transaction]:
+    """
+    Abre una transacción sobre las entidades indicadas.
+
+    Cada entidad se carga una vez; las funciones de los gestores trabajan
+    sobre la copia en memoria y al salir del bloque se escribe una sola vez
+    cada entidad modificada. Si el bloque lanza una excepción, o se llama a
+    rollback(), no se escribe nada. Las entidades no declaradas que se
+    modifiquen dentro del bloque se incorporan automáticamente.
+
+    Una transacción abierta dentro de otra se suma a la exterior, que es la
+    única que confirma. No hay confirmaciones parciales: si el bloque
+    anidado lanza una excepción o llama a rollback(), se descarta la
+    transacción completa y el bloque exterior termina con
+    TransactionAborted aunque la excepción se haya capturado en el medio.
+
+    Args:
+        filenames: Entidades a cargar al comenzar
+
+    Yields:
+        La transacción activa
+
+    Raises:
+        StorageError: Si la confirmación falla
+        TransactionAborted: Si un bloque anidado descartó la transacción
+    """
+    outer = _current_transaction()
+    if outer is not None:
+        outer.depth += 1
+        try:
+            for filename in filenames:
+                outer.enlist(filename)
+            yield outer
+        except BaseException:
+            outer._discard()
+            raise
+        finally:
+            outer.depth -= 1
+        return
+
+    tx = Transaction()
+    for filename in filenames:
+        tx.enlist(filename)
+
+    _local.transaction = tx
+    try:
+        yield tx
+    except BaseException:
+        tx.rollback()
+        raise
+    finally:
+        _local.transaction = None
+
+    if tx.aborted:
+        raise TransactionAborted("Un bloque anidado descartó la transacción; no se guardó ningún cambio")
+    if not tx.rolled_back:
+        tx.commit()
+
+def _load_cache_entry(filename: str) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene la entrada de caché compartida de una entidad, recargándola si cambió.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+
+    Returns:
+        Entrada de caché o None si la entidad no existe o no se puede leer
+    """
+    if filename not in DATA_FILES:
+        return None
+
+    try:
+        signature = _backend.signature(filename)
+    except StorageError:
+        return None
+
+    entry = _cache.get(filename)
+    if entry is not None and entry["signature"] == signature:
+        _cache_stats["hits"] += 1
+        return entry
+
+    _cache_stats["misses"] += 1
+    try:
+        records = _backend.load(filename)
+    except StorageError:
+        # Sin cargar nada en caché: una entidad que no se puede leer (por
+        # ejemplo, una tabla de códigos de versión desconocida) se ve vacía
+        # pero no se puede modificar, para no sobrescribir sus datos
+        return None
+
+    entry = {"signature": signature, "records": records}
+    # Los contadores guardados con la misma firma evitan recontar en la
+    # primera escritura
+    if _counter_definitions.get(filename):
+        counters = _load_saved_counters(filename, signature)
+        if counters is not None:
+            entry["counters"] = counters
+    _cache[filename] = entry
+    return entry
+
+def _get_cache_entry(filename: str) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene la entrada de una entidad para lectura.
+
+    Dentro de una transacción que ya incorporó la entidad se devuelve su
+    copia de trabajo; en otro caso, la entrada de la caché compartida.
+    """
+    tx = _current_transaction()
+    if tx is not None and filename in tx.entries:
+        return tx.entries[filename]
+    return _load_cache_entry(filename)
+
+def _get_mutable_entry(filename: str) -> Optional[Dict[str, Any]]:
+    """Obtiene la entrada de una entidad para modificarla, incorporándola a la transacción activa."""
+    tx = _current_transaction()
+    if tx is not None:
+        return tx.enlist(filename)
+    return _load_cache_entry(filename)
+
+def _in_transaction(filename: str) -> bool:
+    """Indica si la entidad forma parte de la transacción activa."""
+    tx = _current_transaction()
+    return tx is not None and filename in tx.entries
+
+def _get_cached_records(filename: str) -> List[Dict[str, Any]]:
+    """
+    Obtiene la lista de registros en caché, recargándola si el archivo cambió.
+
+    La lista devuelta es la de la caché: no debe modificarse.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+
+    Returns:
+        Lista de registros en caché
+    """
+    entry = _get_cache_entry(filename)
+    return _live_records(entry) if entry is not None else []
+
+def _live_records(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Obtiene la lista de registros de una entrada sin huecos de bajas.
+
+    Si hay huecos, la lista se compacta en el lugar (un recorrido completo,
+    que sólo hacen las lecturas completas) y se descarta el índice de
+    posiciones para reconstruirlo al próximo uso.
+    """
+    records = entry["records"]
+    if entry.get("holes"):
+        records[:] = [record for record in records if record is not None]
+        entry["holes"] = 0
+        entry.pop("positions", None)
+    return records
+
+def _positions(entry: Dict[str, Any]) -> Dict[Any, int]:
+    """Obtiene el índice id -> posición de una entrada, construyéndolo si no existe."""
+    positions = entry.get("positions")
+    if positions is None:
+        positions = {
+            record.get("id"): i
+            for i, record in enumerate(entry["records"]) if record is not None
+        }
+        entry["positions"] = positions
+    return positions
+
+def get_record(filename: str, record_id: Any) -> Optional[Mapping[str, Any]]:
+    """
+    Obtiene un registro por su ID.
+
+    Si el backend puede resolver consultas (SQLite) se le pide sólo ese
+    registro, sin cargar la entidad; si no, se usa el índice de clave
+    primaria de la caché (O(1)).
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        record_id: ID del registro
+
+    Returns:
+        Registro de solo lectura o None si no existe
+    """
+    records = _backend_query(filename, {"id": record_id})
+    if records is not None:
+        return MappingProxyType(records[0]) if records else None
+
+    entry = _get_cache_entry(filename)
+    if entry is None:
+        return None
+    position = _positions(entry).get(record_id)
+    if position is None:
+        return None
+    return MappingProxyType(entry["records"][position])
+
 def load_json_data(filename: str) -> List[Dict[str, Any]]:
     """
     Carga datos desde un archivo JSON.
-    
+
     Args:
         filename: Nombre del archivo (sin extensión)
-        
+
     Returns:
-        Lista de diccionarios con los datos, o lista vacía si no existe
+        Lista de diccionarios con los datos, o lista vacía si no existe.
+        Los registros son copias: pueden modificarse sin afectar la caché.
     """
-    file_path = DATA_FILES.get(filename)
-    if not file_path or not file_path.exists():
-        return []
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except (json.JSONDecodeError, IOError) as e:
-        return []
+    return [copy_record(record) for record in _get_cached_records(filename)]
 
-def save_json_data(filename: str, data: List[Dict[str, Any]]) -> bool:
+def get_records_view(filename: str) -> RecordsView:
     """
-    Guarda datos en un archivo JSON.
-    
+    Obtiene una vista de solo lectura de los datos de un archivo.
+
+    Evita copiar los registros, por lo que es la forma recomendada para
+    lecturas y búsquedas que no modifican los datos.
+
     Args:
         filename: Nombre del archivo (sin extensión)
-        data: Lista de diccionarios a guardar
-        
+
     Returns:
-        True si se guardó correctamente, False en caso contrario
+        Vista de solo lectura sobre los registros
     """
-    ensure_data_directory()
-    file_path = DATA_FILES.get(filename)
-    
-    if not file_path:
-        return False
-    
+    return RecordsView(_get_cached_records(filename))
+
+def iter_records(filename: str) -> Iterator[Mapping[str, Any]]:
+    """
+    Recorre los registros de una entidad de forma perezosa.
+
+    Si la entidad ya está en caché se recorre la caché; si no, y el backend
+    lo permite (JSON Lines, SQLite), se leen los registros a medida que se
+    consumen, sin cargar el archivo completo en memoria.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+
+    Yields:
+        Registros de solo lectura
+    """
+    if filename not in DATA_FILES:
+        return
+
+    if _backend.supports_streaming and not _in_transaction(filename):
+        entry = _cache.get(filename)
+        try:
+            cached = entry is not None and entry["signature"] == _backend.signature(filename)
+            if not cached:
+                yield from map(MappingProxyType, _backend.iter_records(filename))
+                return
+        except StorageError:
+            return
+
+    yield from get_records_view(filename)
+
+def _identity(value: Any) -> Any:
+    return value
+
+def register_index(filename: str, field: str, normalize: Optional[Callable[[Any], Any]] = None) -> None:
+    """
+    Registra un índice hash en memoria sobre un campo de una entidad.
+
+    El índice se construye la primera vez que se consulta, se mantiene al
+    agregar, modificar o eliminar registros y se reconstruye sólo cuando la
+    entidad cambia en el almacenamiento.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        field: Campo a indexar
+        normalize: Función aplicada al valor del campo y a los valores
+                   buscados (por ejemplo, para ignorar espacios)
+    """
+    normalize = normalize or _identity
+    _index_definitions.setdefault(filename, {})[field] = normalize
+    _register_index_keys(filename, field, lambda record: (normalize(record.get(field)),))
+
+def register_inverted_index(filename: str, name: str,
+                            keys: Callable[[Mapping[str, Any]], Iterable[Any]]) -> None:
+    """
+    Registra un índice invertido en memoria sobre una entidad.
+
+    A diferencia de register_index, cada registro puede aparecer bajo varias
+    claves (por ejemplo, las palabras o trigramas de su nombre). Se construye
+    y mantiene igual que los índices por campo y se consulta con
+    find_records_by_keys.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice
+        keys: Función que devuelve las claves bajo las que se indexa un registro
+    """
+    _register_index_keys(filename, name, keys)
+
+def _register_index_keys(filename: str, name: str,
+                         keys: Callable[[Mapping[str, Any]], Iterable[Any]]) -> None:
+    _index_keys.setdefault(filename, {})[name] = keys
+    entry = _cache.get(filename)
+    if entry is not None:
+        entry.get("indexes", {}).pop(name, None)
+
+def _get_index(filename: str, entry: Dict[str, Any], name: str) -> Dict[Any, Dict[Any, Dict[str, Any]]]:
+    """Obtiene un índice de una entrada, construyéndolo si todavía no existe."""
+    indexes = entry.setdefault("indexes", {})
+    index = indexes.get(name)
+    if index is None:
+        record_keys = _index_keys[filename][name]
+        index = {}
+        for record in filter(None, entry["records"]):
+            for key in record_keys(record):
+                index.setdefault(key, {})[record.get("id")] = record
+        indexes[name] = index
+    return index
+
+def _index_add(filename: str, entry: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Agrega un registro a los índices, montículos y contadores ya construidos de una entrada."""
+    for name, index in entry.get("indexes", {}).items():
+        for key in _index_keys[filename][name](record):
+            index.setdefault(key, {})[record.get("id")] = record
+    for name, heap in entry.get("heaps", {}).items():
+        priority = _heap_definitions[filename][name](record)
+        if priority is not None:
+            heapq.heappush(heap, (priority, record.get("id")))
+    for name, index in entry.get("sorted_indexes", {}).items():
+        groups, order = _sorted_definitions[filename][name]
+        key = order(record)
+        if key is not None:
+            for group in groups(record):
+                bisect.insort(index.setdefault(group, []), (key, record.get("id")))
+    _count(filename, entry, record, 1)
+
+def _index_remove(filename: str, entry: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Quita un registro de los índices y contadores ya construidos de una entrada."""
+    for name, index in entry.get("indexes", {}).items():
+        for key in _index_keys[filename][name](record):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(record.get("id"), None)
+                if not bucket:
+                    del index[key]
+    for name, index in entry.get("sorted_indexes", {}).items():
+        groups, order = _sorted_definitions[filename][name]
+        key = order(record)
+        if key is None:
+            continue
+        item = (key, record.get("id"))
+        for group in groups(record):
+            items = index.get(group)
+            if items is None:
+                continue
+            position = bisect.bisect_left(items, item)
+            if position < len(items) and items[position] == item:
+                del items[position]
+                if not items:
+                    del index[group]
+    _count(filename, entry, record, -1)
+
+def register_counter(filename: str, name: str, key: Callable[[Mapping[str, Any]], Any],
+                     amount: Optional[Callable[[Mapping[str, Any]], int]] = None) -> None:
+    """
+    Registra un contador de registros agrupados por una clave.
+
+    Los contadores se actualizan en O(1) en cada alta, cambio o baja, se
+    guardan junto a los datos después de cada escritura y se consultan con
+    get_counts sin necesidad de cargar la entidad.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del contador
+        key: Función que devuelve la clave bajo la que se cuenta un registro
+             (None para no contarlo)
+        amount: Función que devuelve el valor entero a sumar por registro
+                (por ejemplo, un costo en centavos); por defecto se suma 1
+    """
+    _counter_definitions.setdefault(filename, {})[name] = key
+    amounts = _counter_amounts.setdefault(filename, {})
+    if amount is None:
+        amounts.pop(name, None)
+    else:
+        amounts[name] = amount
+    entry = _cache.get(filename)
+    if entry is not None:
+        entry.pop("counters", None)
+
+def _recount(filename: str, records: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Dict[Any, int]]:
+    """Cuenta desde cero los registros para todos los contadores de una entidad."""
+    definitions = _counter_definitions.get(filename, {})
+    amounts = _counter_amounts.get(filename, {})
+    counters = {name: {} for name in definitions}
+    for record in filter(None, records):
+        for name, key_function in definitions.items():
+            key = key_function(record)
+            if key is not None:
+                amount = amounts[name](record) if name in amounts else 1
+                counters[name][key] = counters[name].get(key, 0) + amount
+    for counter in counters.values():
+        for key in [key for key, count in counter.items() if not count]:
+            del counter[key]
+    return counters
+
+def _get_counters(filename: str, entry: Dict[str, Any]) -> Dict[str, Dict[Any, int]]:
+    """Obtiene los contadores de una entrada, contándolos si todavía no existen."""
+    counters = entry.get("counters")
+    if counters is None:
+        counters = _recount(filename, entry["records"])
+        entry["counters"] = counters
+    return counters
+
+def _count(filename: str, entry: Dict[str, Any], record: Dict[str, Any], delta: int) -> None:
+    """Suma delta a los contadores ya construidos de una entrada."""
+    counters = entry.get("counters")
+    if counters is None:
+        return
+    amounts = _counter_amounts.get(filename, {})
+    for name, key_function in _counter_definitions[filename].items():
+        key = key_function(record)
+        if key is None:
+            continue
+        counter = counters[name]
+        count = counter.get(key, 0) + (delta * amounts[name](record) if name in amounts else delta)
+        if count:
+            counter[key] = count
+        else:
+            counter.pop(key, None)
+
+def _counters_path(filename: str) -> Path:
+    return DATA_FILES[filename].with_name(f"{filename}.contadores.json")
+
+def _json_key(key: Any) -> Any:
+    """Convierte una clave a su forma en JSON (las tuplas pasan a listas)."""
+    return json.loads(json.dumps(key, ensure_ascii=False))
+
+def _from_json_key(key: Any) -> Any:
+    return tuple(_from_json_key(item) for item in key) if isinstance(key, list) else key
+
+def _save_counters(filename: str, entry: Dict[str, Any]) -> None:
+    """
+    Guarda los contadores de una entrada junto a los datos, con la firma
+    de los datos que cuentan. Si falla, la próxima lectura los recuenta.
+    """
+    if not _counter_definitions.get(filename):
+        return
+    counters = _get_counters(filename, entry)
+    content = {
+        "signature": _json_key(entry["signature"]),
+        "counters": {name: [[_json_key(key), count] for key, count in counter.items()]
+                     for name, counter in counters.items()}
+    }
+    path = _counters_path(filename)
+    temp_path = path.with_name(path.name + ".tmp")
     try:
-        with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=2, ensure_ascii=False)
-        return True
-    except IOError as e:
-        return False
\ No newline at end of file
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(content, file, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+def _load_saved_counters(filename: str, signature: Any) -> Optional[Dict[str, Dict[Any, int]]]:
+    """Lee los contadores guardados si corresponden a la firma actual de los datos."""
+    try:
+        with open(_counters_path(filename), "r", encoding="utf-8") as file:
+            content = json.load(file)
+        if content.get("signature") != _json_key(signature):
+            return None
+        counters = {
+            name: {_from_json_key(key): count for key, count in pairs}
+            for name, pairs in content["counters"].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if set(counters) != set(_counter_definitions.get(filename, {})):
+        return None
+    return counters
+
+def _counter(filename: str, name: str) -> Dict[Any, int]:
+    """
+    Obtiene un contador sin copiarlo (no debe modificarse).
+
+    Si la entidad está en caché se usan sus contadores; si no, los guardados
+    junto a los datos, siempre que correspondan a la versión actual. Sólo
+    si no hay ninguno válido se cargan los datos y se cuenta.
+    """
+    if name not in _counter_definitions.get(filename, {}):
+        return {}
+
+    if not _in_transaction(filename):
+        try:
+            signature = _backend.signature(filename)
+        except StorageError:
+            return {}
+        entry = _cache.get(filename)
+        if entry is None or entry["signature"] != signature:
+            saved = _load_saved_counters(filename, signature)
+            if saved is not None:
+                return saved[name]
+
+    entry = _get_cache_entry(filename)
+    if entry is None:
+        return {}
+    had_counters = "counters" in entry
+    counter = _get_counters(filename, entry)[name]
+    if not had_counters and not _in_transaction(filename):
+        _save_counters(filename, entry)
+    return counter
+
+def get_counts(filename: str, name: str) -> Dict[Any, int]:
+    """
+    Obtiene un contador registrado con register_counter.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del contador
+
+    Returns:
+        Diccionario clave -> cantidad (sin las claves en cero)
+    """
+    return dict(_counter(filename, name))
+
+def get_count(filename: str, name: str, key: Any) -> int:
+    """
+    Obtiene el valor de una sola clave de un contador, sin copiar el contador.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del contador
+        key: Clave buscada
+
+    Returns:
+        Cantidad (o suma) de la clave, 0 si no tiene registros
+    """
+    return _counter(filename, name).get(key, 0)
+
+def verify_counters(filename: str) -> Tuple[bool, Dict[str, Dict[Any, Tuple[int, int]]]]:
+    """
+    Compara los contadores mantenidos y guardados con un recuento completo.
+
+    Si hay diferencias, los contadores se reemplazan por el recuento.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+
+    Returns:
+        Tupla (coinciden, diferencias). Las diferencias son
+        contador -> {clave: (cantidad mantenida, cantidad real)}
+    """
+    entry = _get_cache_entry(filename)
+    if entry is None or not _counter_definitions.get(filename):
+        return True, {}
+
+    maintained = entry.get("counters")
+    if maintained is None and not _in_transaction(filename):
+        maintained = _load_saved_counters(filename, entry["signature"])
+    actual = _recount(filename, entry["records"])
+    if maintained is None:
+        maintained = actual
+
+    differences = {}
+    for name, counter in actual.items():
+        current = maintained.get(name, {})
+        diff = {
+            key: (current.get(key, 0), counter.get(key, 0))
+            for key in set(current) | set(counter) if current.get(key, 0) != counter.get(key, 0)
+        }
+        if diff:
+            differences[name] = diff
+
+    entry["counters"] = actual
+    if differences and not _in_transaction(filename):
+        _save_counters(filename, entry)
+    return not differences, differences
+
+def find_records(filename: str, field: str, value: Any) -> List[Mapping[str, Any]]:
+    """
+    Obtiene los registros cuyo campo coincide con un valor.
+
+    Usa el índice registrado para el campo (O(1)); si no hay índice,
+    recorre los registros comparando por igualdad.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        field: Campo a comparar
+        value: Valor buscado
+
+    Returns:
+        Lista de registros de solo lectura
+    """
+    entry = _get_cache_entry(filename)
+    if entry is None:
+        return []
+
+    normalize = _index_definitions.get(filename, {}).get(field)
+    if normalize is None:
+        return [record for record in RecordsView(entry["records"]) if record.get(field) == value]
+
+    bucket = _get_index(filename, entry, field).get(normalize(value), {})
+    return [MappingProxyType(record) for record in bucket.values()]
+
+def find_records_by_keys(filename: str, name: str, keys: Iterable[Any]) -> List[Mapping[str, Any]]:
+    """
+    Obtiene los registros que aparecen bajo todas las claves de un índice invertido.
+
+    Intersecta los conjuntos de candidatos empezando por el más chico, de
+    modo que el costo depende de la cantidad de candidatos y no del total
+    de registros.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice registrado con register_inverted_index
+        keys: Claves que deben estar presentes (al menos una)
+
+    Returns:
+        Lista de registros de solo lectura, en el orden en que están guardados
+    """
+    return find_records_by_conditions(filename, [(name, [key]) for key in set(keys)])
+
+def find_records_by_conditions(filename: str, conditions: Iterable[Tuple[str, Iterable[Any]]]) -> List[Mapping[str, Any]]:
+    """
+    Obtiene los registros que cumplen todas las condiciones sobre índices.
+
+    Cada condición es (índice, claves) y la cumplen los registros que están
+    bajo alguna de esas claves. Se parte de la condición con menos
+    candidatos y se descartan los que no cumplen las demás, sin recorrer
+    el resto de los registros.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        conditions: Condiciones (nombre del índice, claves normalizadas)
+
+    Returns:
+        Lista de registros de solo lectura, en el orden en que están guardados
+    """
+    entry = _get_cache_entry(filename)
+    registered = _index_keys.get(filename, {})
+    conditions = [(name, set(keys)) for name, keys in conditions]
+    if entry is None or not conditions or any(name not in registered for name, _ in conditions):
+        return []
+
+    buckets = []
+    for name, keys in conditions:
+        index = _get_index(filename, entry, name)
+        condition_buckets = [index[key] for key in keys if key in index]
+        if not condition_buckets:
+            return []
+        buckets.append(condition_buckets)
+    buckets.sort(key=lambda condition_buckets: sum(len(bucket) for bucket in condition_buckets))
+
+    matches = {}
+    for bucket in buckets[0]:
+        matches.update(bucket)
+    for condition_buckets in buckets[1:]:
+        matches = {
+            record_id: record for record_id, record in matches.items()
+            if any(record_id in bucket for bucket in condition_buckets)
+        }
+        if not matches:
+            return []
+    return _in_storage_order(entry, matches)
+
+def find_records_by_any_key(filename: str, name: str, keys: Iterable[Any]) -> List[Mapping[str, Any]]:
+    """
+    Obtiene los registros que aparecen bajo alguna de las claves de un índice.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice (campo o índice invertido)
+        keys: Claves buscadas, ya normalizadas
+
+    Returns:
+        Lista de registros de solo lectura, en el orden en que están guardados
+    """
+    entry = _get_cache_entry(filename)
+    if entry is None or name not in _index_keys.get(filename, {}):
+        return []
+
+    index = _get_index(filename, entry, name)
+    matches = {}
+    for key in set(keys):
+        matches.update(index.get(key, {}))
+    return _in_storage_order(entry, matches)
+
+def count_records_by_keys(filename: str, name: str, keys: Iterable[Any]) -> int:
+    """
+    Cuenta las entradas de un índice bajo las claves indicadas, sin leer los registros.
+
+    Sirve para estimar cuántos registros devolvería una consulta y elegir
+    el filtro más selectivo.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice (campo o índice invertido)
+        keys: Claves buscadas, ya normalizadas
+
+    Returns:
+        Suma de la cantidad de registros bajo cada clave
+    """
+    entry = _get_cache_entry(filename)
+    if entry is None or name not in _index_keys.get(filename, {}):
+        return 0
+    index = _get_index(filename, entry, name)
+    return sum(len(index.get(key, ())) for key in set(keys))
+
+def get_index_keys(filename: str, name: str) -> List[Any]:
+    """
+    Obtiene las claves distintas de un índice.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice (campo o índice invertido)
+
+    Returns:
+        Lista de claves presentes en el índice
+    """
+    entry = _get_cache_entry(filename)
+    if entry is None or name not in _index_keys.get(filename, {}):
+        return []
+    return list(_get_index(filename, entry, name))
+
+def get_index_sample(filename: str, name: str, key: Any) -> Optional[Mapping[str, Any]]:
+    """
+    Obtiene un registro cualquiera bajo una clave de un índice, en O(1).
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice (campo o índice invertido)
+        key: Clave buscada, ya normalizada
+
+    Returns:
+        Registro de solo lectura o None si la clave no tiene registros
+    """
+    entry = _get_cache_entry(filename)
+    if entry is None or name not in _index_keys.get(filename, {}):
+        return None
+    bucket = _get_index(filename, entry, name).get(key)
+    if not bucket:
+        return None
+    return MappingProxyType(next(iter(bucket.values())))
+
+def register_heap_index(filename: str, name: str, priority: Callable[[Mapping[str, Any]], Any]) -> None:
+    """
+    Registra un índice de prioridad (montículo) sobre una entidad.
+
+    Permite obtener los registros de menor prioridad (por ejemplo, la fecha
+    más próxima) en O(k log n) con find_records_up_to, sin recorrer la
+    entidad. Se construye la primera vez que se consulta y se mantiene al
+    agregar o modificar registros.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice
+        priority: Función que devuelve la prioridad de un registro (None
+                  para dejarlo fuera del índice); las prioridades deben ser
+                  comparables entre sí
+    """
+    _heap_definitions.setdefault(filename, {})[name] = priority
+    entry = _cache.get(filename)
+    if entry is not None:
+        entry.get("heaps", {}).pop(name, None)
+
+def _get_heap(filename: str, entry: Dict[str, Any], name: str) -> List[Tuple[Any, Any]]:
+    """Obtiene un montículo de una entrada, construyéndolo si no existe o acumuló demasiados obsoletos."""
+    heaps = entry.setdefault("heaps", {})
+    heap = heaps.get(name)
+    if heap is None or len(heap) > HEAP_REBUILD_FACTOR * len(_positions(entry)) + HOLE_COMPACTION_MIN:
+        priority = _heap_definitions[filename][name]
+        heap = [
+            (key, record.get("id"))
+            for record in filter(None, entry["records"])
+            for key in (priority(record),) if key is not None
+        ]
+        heapq.heapify(heap)
+        heaps[name] = heap
+    return heap
+
+def find_records_up_to(filename: str, name: str, limit: Any,
+                       max_count: Optional[int] = None) -> List[Mapping[str, Any]]:
+    """
+    Obtiene los registros cuya prioridad es menor o igual a un límite.
+
+    Extrae del montículo sólo los k registros que cumplen la condición y
+    los vuelve a insertar, por lo que el costo es O(k log n).
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice registrado con register_heap_index
+        limit: Prioridad máxima (inclusive)
+        max_count: Cantidad máxima de registros a devolver (opcional)
+
+    Returns:
+        Lista de registros de solo lectura, de menor a mayor prioridad
+    """
+    entry = _get_cache_entry(filename)
+    if entry is None or name not in _heap_definitions.get(filename, {}):
+        return []
+
+    heap = _get_heap(filename, entry, name)
+    priority = _heap_definitions[filename][name]
+    positions = _positions(entry)
+    records = entry["records"]
+
+    found = []
+    kept = []
+    while heap and heap[0][0] <= limit and (max_count is None or len(found) < max_count):
+        item = heapq.heappop(heap)
+        key, record_id = item
+        position = positions.get(record_id)
+        record = records[position] if position is not None else None
+        # Elementos de registros eliminados, modificados o repetidos: se descartan
+        if record is None or priority(record) != key or (kept and kept[-1] == item):
+            continue
+        kept.append(item)
+        found.append(MappingProxyType(record))
+
+    for item in kept:
+        heapq.heappush(heap, item)
+    return found
+
+class _Top:
+    """Valor mayor que cualquier otro; acota por arriba los rangos de los índices ordenados."""
+
+    def __lt__(self, other: Any) -> bool:
+        return False
+
+    def __gt__(self, other: Any) -> bool:
+        return True
+
+
+_TOP = _Top()
+
+def register_sorted_index(filename: str, name: str, groups: Callable[[Mapping[str, Any]], Iterable[Any]],
+                          order: Callable[[Mapping[str, Any]], Any]) -> None:
+    """
+    Registra un índice ordenado por grupos sobre una entidad.
+
+    Cada registro se ubica en uno o más grupos (por ejemplo, su herramienta
+    y su herramienta y tipo) y dentro de cada grupo se mantiene ordenado por
+    una clave (por ejemplo, una fecha), de modo que los rangos se resuelven
+    con búsqueda binaria en O(log n + k). Se construye la primera vez que se
+    consulta y se mantiene al agregar, modificar o eliminar registros.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice
+        groups: Función que devuelve los grupos de un registro
+        order: Función que devuelve la clave de orden de un registro (None
+               para dejarlo fuera del índice)
+    """
+    _sorted_definitions.setdefault(filename, {})[name] = (groups, order)
+    entry = _cache.get(filename)
+    if entry is not None:
+        entry.get("sorted_indexes", {}).pop(name, None)
+
+def _get_sorted_index(filename: str, entry: Dict[str, Any], name: str) -> Dict[Any, List[Tuple[Any, Any]]]:
+    """Obtiene un índice ordenado de una entrada, construyéndolo si todavía no existe."""
+    indexes = entry.setdefault("sorted_indexes", {})
+    index = indexes.get(name)
+    if index is None:
+        groups, order = _sorted_definitions[filename][name]
+        index = {}
+        for record in filter(None, entry["records"]):
+            key = order(record)
+            if key is not None:
+                for group in groups(record):
+                    index.setdefault(group, []).append((key, record.get("id")))
+        for items in index.values():
+            items.sort()
+        indexes[name] = index
+    return index
+
+def _range_bounds(items: List[Tuple[Any, Any]], start: Any, end: Any) -> Tuple[int, int]:
+    """Posiciones [desde, hasta) de los elementos con clave entre start y end (inclusive)."""
+    low = 0 if start is None else bisect.bisect_left(items, (start,))
+    high = len(items) if end is None else bisect.bisect_right(items, (end, _TOP))
+    return low, high
+
+def find_records_in_range(filename: str, name: str, group: Any,
+                          start: Any = None, end: Any = None) -> List[Mapping[str, Any]]:
+    """
+    Obtiene los registros de un grupo cuya clave de orden está en un rango.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice registrado con register_sorted_index
+        group: Grupo a consultar
+        start: Clave mínima, inclusive (None para no acotar)
+        end: Clave máxima, inclusive (None para no acotar)
+
+    Returns:
+        Lista de registros de solo lectura, ordenados por la clave
+    """
+    entry = _get_cache_entry(filename)
+    if entry is None or name not in _sorted_definitions.get(filename, {}):
+        return []
+    items = _get_sorted_index(filename, entry, name).get(group, [])
+    low, high = _range_bounds(items, start, end)
+    positions = _positions(entry)
+    records = entry["records"]
+    return [MappingProxyType(records[positions[record_id]]) for _, record_id in items[low:high]]
+
+def get_range_span(filename: str, name: str, group: Any,
+                   start: Any = None, end: Any = None) -> Optional[Tuple[Any, Any, int]]:
+    """
+    Resume un rango de un índice ordenado sin recorrer sus registros, en O(log n).
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        name: Nombre del índice registrado con register_sorted_index
+        group: Grupo a consultar
+        start: Clave mínima, inclusive (None para no acotar)
+        end: Clave máxima, inclusive (None para no acotar)
+
+    Returns:
+        Tupla (primera clave, última clave, cantidad de registros) o None
+        si el rango está vacío
+    """
+    entry = _get_cache_entry(filename)
+    if entry is None or name not in _sorted_definitions.get(filename, {}):
+        return None
+    items = _get_sorted_index(filename, entry, name).get(group, [])
+    low, high = _range_bounds(items, start, end)
+    if low >= high:
+        return None
+    return items[low][0], items[high - 1][0], high - low
+
+def _in_storage_order(entry: Dict[str, Any], matches: Dict[Any, Dict[str, Any]]) -> List[Mapping[str, Any]]:
+    """Ordena registros (id -> registro) según su posición en la entidad."""
+    positions = _positions(entry)
+    ordered = sorted(matches, key=lambda record_id: positions.get(record_id, 0))
+    return [MappingProxyType(matches[record_id]) for record_id in ordered]
+
+def query_records(filename: str, filters: Mapping[str, Any]) -> List[Mapping[str, Any]]:
+    """
+    Obtiene los registros cuyos campos son iguales a los valores indicados.
+
+    Si el backend puede resolver la consulta (por ejemplo con índices SQL)
+    se le delega; si no, se parte del índice en memoria de alguno de los
+    campos (si existe) o de todos los registros en caché.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        filters: Diccionario campo -> valor esperado
+
+    Returns:
+        Lista de registros de solo lectura que cumplen todos los filtros
+    """
+    if filename not in DATA_FILES:
+        return []
+
+    records = _backend_query(filename, filters) if filters else None
+    if records is not None:
+        return [MappingProxyType(record) for record in records]
+
+    if "id" in filters:
+        record = get_record(filename, filters["id"])
+        if record is None or not all(record.get(field) == value for field, value in filters.items()):
+            return []
+        return [record]
+
+    indexed = _index_definitions.get(filename, {})
+    indexed_field = next((field for field in filters if field in indexed), None)
+    if indexed_field is None:
+        candidates = get_records_view(filename)
+    else:
+        candidates = find_records(filename, indexed_field, filters[indexed_field])
+
+    items = tuple((field, value) for field, value in filters.items() if field != indexed_field)
+    return [
+        record for record in candidates
+        if all(record.get(field) == value for field, value in items)
+    ]
+
+def _backend_query(filename: str, filters: Mapping[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Delega una consulta por igualdad al backend.
+
+    Dentro de una transacción que incorporó la entidad no se delega: el
+    almacenamiento todavía no tiene los cambios de la copia de trabajo.
+
+    Returns:
+        Lista de registros, o None si hay que resolverla en memoria
+    """
+    if _in_transaction(filename):
+        return None
+    try:
+        return _backend.query(filename, filters)
+    except StorageError:
+        return None
+
+def _sort_key(record: Mapping[str, Any], sort_key: str) -> tuple:
+    """
+    Clave de orden de un registro para paginar: primero los números, luego
+    los textos (sin distinguir mayúsculas ni acentos) y al final los vacíos;
+    el ID desempata para que el orden sea total.
+    """
+    value = record.get(sort_key)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        key = (0, value, "")
+    elif value is None or value == "":
+        key = (2, 0, "")
+    else:
+        key = (1, 0, normalize_text(value))
+    return key + (record.get("id"),)
+
+def _encode_cursor(sort_key: str, key: tuple) -> str:
+    payload = json.dumps([sort_key, list(key)], ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str, sort_key: str) -> tuple:
+    try:
+        cursor_sort_key, key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+    if cursor_sort_key != sort_key:
+        raise ValueError("El cursor corresponde a otro criterio de orden")
+    return tuple(key)
+
+# Índice ordenado interno de cada entidad por la clave de orden de "id",
+# para paginar por ID con búsqueda binaria en lugar de recorrer la entidad
+_PAGE_INDEX = "_paginas_id"
+
+def _page_index_groups(record: Mapping[str, Any]) -> Tuple[tuple]:
+    return ((),)
+
+def _page_index_order(record: Mapping[str, Any]) -> tuple:
+    return _sort_key(record, "id")
+
+for _filename in DATA_FILES:
+    register_sorted_index(_filename, _PAGE_INDEX, _page_index_groups, _page_index_order)
+
+def _page_by_id(filename: str, after: Optional[tuple], limit: int) -> List[Mapping[str, Any]]:
+    """
+    Obtiene hasta limit registros posteriores a la clave after, en orden de ID.
+
+    Si el backend lo resuelve (por ejemplo SQLite con WHERE id > ? LIMIT ?)
+    se le delega; si no, se busca en el índice por ID de la caché, en
+    O(log n + limit).
+    """
+    if not _in_transaction(filename):
+        try:
+            records = _backend.page_by_id(filename, None if after is None else after[-1], limit)
+        except StorageError:
+            records = None
+        if records is not None:
+            return [MappingProxyType(record) for record in records]
+
+    entry = _get_cache_entry(filename)
+    if entry is None:
+        return []
+    items = _get_sorted_index(filename, entry, _PAGE_INDEX).get((), [])
+    low = 0 if after is None else bisect.bisect_right(items, (after, _TOP))
+    positions = _positions(entry)
+    records = entry["records"]
+    return [MappingProxyType(records[positions[record_id]]) for _, record_id in items[low:low + limit]]
+
+def page_records(filename: str, cursor: Optional[str] = None, limit: int = 20,
+                 sort_key: str = "id") -> Tuple[List[Mapping[str, Any]], Optional[str]]:
+    """
+    Obtiene una página de registros ordenados, a partir de un cursor.
+
+    El cursor guarda la clave de orden del último registro entregado, por lo
+    que las páginas siguientes no se corren si se agregan o eliminan
+    registros anteriores. Ordenando por ID cada página se obtiene con
+    búsqueda binaria (o la resuelve el backend) sin recorrer la entidad; con
+    otro criterio se recorren todos los registros, pero sólo se mantienen
+    en memoria los de la página.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        cursor: Cursor devuelto por la página anterior (None para la primera)
+        limit: Cantidad máxima de registros de la página
+        sort_key: Campo por el que se ordena
+
+    Returns:
+        Tupla (registros de solo lectura, cursor de la página siguiente o
+        None si no hay más)
+
+    Raises:
+        ValueError: Si limit no es positivo o el cursor no es válido
+    """
+    if limit < 1:
+        raise ValueError("El tamaño de página debe ser positivo")
+
+    after = _decode_cursor(cursor, sort_key) if cursor is not None else None
+    if sort_key == "id":
+        page = _page_by_id(filename, after, limit + 1)
+    else:
+        records = iter_records(filename)
+        if after is not None:
+            records = (record for record in records if _sort_key(record, sort_key) > after)
+        page = heapq.nsmallest(limit + 1, records, key=lambda record: _sort_key(record, sort_key))
+    if len(page) <= limit:
+        return page, None
+    return page[:limit], _encode_cursor(sort_key, _sort_key(page[limit - 1], sort_key))
+
+def save_json_data(filename: str, data: List[Dict[str, Any]]) -> bool:
+    """
+    Guarda datos en un archivo JSON.
+
+    Reemplaza el contenido completo de la entidad.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        data: Lista de diccionarios a guardar
+
+    Returns:
+        True si se guardó correctamente, False en caso contrario
+    """
+    if filename not in DATA_FILES:
+        return False
+
+    tx = _current_transaction()
+    if tx is not None:
+        entry = tx.enlist(filename)
+        for key in ("indexes", "heaps", "sorted_indexes", "positions", "holes", "counters"):
+            entry.pop(key, None)
+        entry["records"] = [copy_record(record) for record in data]
+        tx.dirty.add(filename)
+        return True
+
+    try:
+        _backend.save(filename, data)
+    except StorageError as e:
+        _cache.pop(filename, None)
+        return False
+
+    # Actualizar la caché con lo que se acaba de escribir
+    entry = {
+        "signature": _backend.signature(filename),
+        "records": [copy_record(record) for record in data]
+    }
+    _cache[filename] = entry
+    _save_counters(filename, entry)
+    return True
+
+def compact_data(filename: str) -> bool:
+    """
+    Compacta el almacenamiento de una entidad (por ejemplo, vuelca su journal).
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+
+    Returns:
+        True si se compactó correctamente, False en caso contrario
+    """
+    if _in_transaction(filename):
+        # La confirmación de la transacción ya reescribe la entidad completa
+        return True
+
+    entry = _get_cache_entry(filename)
+    if entry is None:
+        return False
+    try:
+        with _backend.locked([filename]):
+            _check_unchanged(filename, entry)
+            _backend.compact(filename, _live_records(entry))
+            entry["signature"] = _backend.signature(filename)
+    except StorageError as e:
+        _cache.pop(filename, None)
+        return False
+    _save_counters(filename, entry)
+    return True
+
+def set_journal_mode(enabled: bool) -> None:
+    """
+    Activa o desactiva el modo journal del backend JSON.
+
+    Al desactivarlo se compactan los journals pendientes, de modo que los
+    archivos JSON principales vuelven a reflejar todos los datos.
+
+    Args:
+        enabled: True para registrar mutaciones en el journal, False para
+                 reescribir el archivo completo en cada mutación
+    """
+    if not isinstance(_backend, JsonFileBackend):
+        return
+    if not enabled:
+        for filename in DATA_FILES:
+            compact_data(filename)
+    _backend.journal = enabled
+
+def is_journal_mode() -> bool:
+    """Indica si las mutaciones se registran en el journal."""
+    return isinstance(_backend, JsonFileBackend) and _backend.journal
+
+
+def _persist(filename: str, entry: Dict[str, Any], operation, *args) -> bool:
+    """
+    Persiste en el backend una mutación ya aplicada en la caché.
+
+    Dentro de una transacción sólo se marca la entidad como modificada.
+    Fuera de ella se escribe con la entidad bloqueada, y sólo si nadie la
+    modificó desde que se cargó la caché: la mutación se aplicó sobre esos
+    datos y, en los backends que reescriben la entidad entera, guardarla
+    pisaría los cambios de otro proceso. Si la escritura no se hace o el
+    backend falla se descarta la entrada de caché, para que la próxima
+    lectura refleje lo que realmente quedó guardado.
+    """
+    tx = _current_transaction()
+    if tx is not None:
+        tx.dirty.add(filename)
+        return True
+
+    try:
+        with _backend.locked([filename]):
+            _check_unchanged(filename, entry)
+            operation(filename, *args, _LiveRecords(entry["records"]))
+            entry["signature"] = _backend.signature(filename)
+    except StorageError as e:
+        _cache.pop(filename, None)
+        return False
+    _save_counters(filename, entry)
+    return True
+
+def _check_unchanged(filename: str, entry: Dict[str, Any]) -> None:
+    """
+    Verifica que la entidad no cambió en el almacenamiento desde que se cargó
+    la entrada; debe llamarse con la entidad bloqueada.
+
+    Raises:
+        StorageError: Si otro proceso la modificó
+    """
+    if _backend.signature(filename) != entry["signature"]:
+        raise StorageError(f"La entidad '{filename}' fue modificada por otro proceso")
+
+def insert_record(filename: str, record: Dict[str, Any]) -> bool:
+    """
+    Agrega un registro nuevo a una entidad.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        record: Registro a agregar (debe incluir su "id")
+
+    Returns:
+        True si se guardó correctamente, False en caso contrario
+    """
+    entry = _get_mutable_entry(filename)
+    if entry is None:
+        return False
+
+    record = copy_record(record)
+    if "positions" in entry:
+        entry["positions"][record.get("id")] = len(entry["records"])
+    entry["records"].append(record)
+    _index_add(filename, entry, record)
+    return _persist(filename, entry, _backend.insert, record)
+
+def update_record(filename: str, record_id: Any, record: Dict[str, Any]) -> bool:
+    """
+    Reemplaza un registro existente de una entidad.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        record_id: ID del registro a reemplazar
+        record: Nuevo contenido completo del registro
+
+    Returns:
+        True si se guardó correctamente, False si no existe o hubo un error
+    """
+    entry = _get_mutable_entry(filename)
+    if entry is None:
+        return False
+
+    position = _positions(entry).get(record_id)
+    if position is None:
+        return False
+
+    record = copy_record(record)
+    _index_remove(filename, entry, entry["records"][position])
+    entry["records"][position] = record
+    _index_add(filename, entry, record)
+    return _persist(filename, entry, _backend.update, record_id, record)
+
+def delete_record(filename: str, record_id: Any) -> bool:
+    """
+    Elimina un registro de una entidad.
+
+    Args:
+        filename: Nombre del archivo (sin extensión)
+        record_id: ID del registro a eliminar
+
+    Returns:
+        True si se eliminó correctamente, False si no existe o hubo un error
+    """
+    entry = _get_mutable_entry(filename)
+    if entry is None:
+        return False
+
+    positions = _positions(entry)
+    position = positions.pop(record_id, None)
+    if position is None:
+        return False
+
+    # Dejar un hueco en lugar de desplazar la lista; se compacta cuando
+    # los huecos superan la mitad de la lista
+    records = entry["records"]
+    _index_remove(filename, entry, records[position])
+    records[position] = None
+    entry["holes"] = entry.get("holes", 0) + 1
+    if entry["holes"] >= HOLE_COMPACTION_MIN and entry["holes"] * 2 > len(records):
+        _live_records(entry)
+    return _persist(filename, entry, _backend.delete, record_id)
+
+def import_json_to_sqlite(db_path: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Importa los archivos JSON actuales a una base SQLite en un solo paso.
+
+    Args:
+        db_path: Ruta de la base de datos (por defecto SQLITE_DB_PATH)
+
+    Returns:
+        Diccionario con la cantidad de registros importados por entidad
+    """
+    from modules.sqlite_storage import SqliteBackend, import_json_files
+    backend = SqliteBackend(db_path or SQLITE_DB_PATH, DATA_FILES.keys())
+    try:
+        return import_json_files(backend, DATA_FILES)
+    finally:
+        backend.close()
+
+def clear_cache(filename: Optional[str] = None) -> None:
+    """
+    Vacía la caché de datos.
+
+    Args:
+        filename: Entidad a invalidar, o None para vaciar toda la caché
+    """
+    if filename is None:
+        _cache.clear()
+    else:
+        _cache.pop(filename, None)
+
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Obtiene los contadores de uso de la caché.
+
+    Returns:
+        Diccionario con aciertos ("hits"), fallos ("misses") y
+        cantidad de entidades en caché ("entries")
+    """
+    return {
+        "hits": _cache_stats["hits"],
+        "misses": _cache_stats["misses"],
+        "entries": len(_cache)
+    }
+
+def reset_cache_stats() -> None:
+    """Reinicia los contadores de aciertos y fallos de la caché."""
+    _cache_stats["hits"] = 0
+    _cache_stats["misses"] = 0
+
+# Al arrancar, completar la última escritura de varias entidades si quedó a medias
+recover_storage()
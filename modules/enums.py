@@ -2,6 +2,33 @@
 Módulo con enumeraciones para valores constantes del sistema.
 """
 from enum import Enum
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def enum_values(enum_cls: type) -> frozenset:
+    """
+    Obtiene el conjunto de valores de una enumeración.
+
+    Se calcula una sola vez por enumeración, de modo que las verificaciones
+    de pertenencia son búsquedas en un frozenset.
+
+    Args:
+        enum_cls: Clase de la enumeración
+
+    Returns:
+        frozenset con los valores de sus miembros
+    """
+    return frozenset(member.value for member in enum_cls)
+
+
+def _is_member(enum_cls: type, value) -> bool:
+    """Verifica si un valor pertenece a una enumeración (False si no es hasheable)."""
+    try:
+        return value in enum_values(enum_cls)
+    except TypeError:
+        return False
+
 
 class UserType(Enum):
     """Tipos de usuario del sistema."""
@@ -17,7 +44,7 @@ class UserType(Enum):
     @classmethod
     def is_valid(cls, value: str) -> bool:
         """Verifica si un valor es válido."""
-        return value in cls.get_all_values()
+        return _is_member(cls, value)
 
 class ToolState(Enum):
     """Estados de herramientas y máquinas."""
@@ -34,7 +61,7 @@ class ToolState(Enum):
     @classmethod
     def is_valid(cls, value: str) -> bool:
         """Verifica si un valor es válido."""
-        return value in cls.get_all_values()
+        return _is_member(cls, value)
 
 class ToolType(Enum):
     """Tipos de herramientas y máquinas."""
@@ -52,7 +79,7 @@ class ToolType(Enum):
     @classmethod
     def is_valid(cls, value: str) -> bool:
         """Verifica si un valor es válido."""
-        return value in cls.get_all_values()
+        return _is_member(cls, value)
 
 class MaintenanceType(Enum):
     """Tipos de mantenimiento."""
@@ -67,7 +94,23 @@ class MaintenanceType(Enum):
     @classmethod
     def is_valid(cls, value: str) -> bool:
         """Verifica si un valor es válido."""
-        return value in cls.get_all_values()
+        return _is_member(cls, value)
+
+class MaintenanceStatus(Enum):
+    """Estados de un mantenimiento."""
+    PROGRAMADO = "Programado"
+    EN_CURSO = "En Curso"
+    COMPLETADO = "Completado"
+    
+    @classmethod
+    def get_all_values(cls) -> list[str]:
+        """Retorna todos los valores válidos."""
+        return [member.value for member in cls]
+    
+    @classmethod
+    def is_valid(cls, value: str) -> bool:
+        """Verifica si un valor es válido."""
+        return _is_member(cls, value)
 
 class AssignmentStatus(Enum):
     """Estados de asignación/devolución."""
@@ -85,4 +128,4 @@ class AssignmentStatus(Enum):
     @classmethod
     def is_valid(cls, value: str) -> bool:
         """Verifica si un valor es válido."""
-        return value in cls.get_all_values()
\ No newline at end of file
+        return _is_member(cls, value)
\ No newline at end of file
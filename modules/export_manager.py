@@ -0,0 +1,151 @@
+"""
+Módulo para exportación masiva de datos.
+Contiene funciones para volcar las entidades de DATA_FILES a archivos CSV o
+JSON Lines, recorriendo los registros de a uno sin armar el resultado en
+memoria.
+"""
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Iterator, Mapping, Union
+
+from modules.data_manager import DATA_FILES, iter_records, query_records
+from modules.tool_manager import TOOL_DATA_FILE, iter_search_tools
+from modules.user_manager import USER_DATA_FILE, CSV_LIST_SEPARATOR, iter_search_users
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+
+def iter_export_records(filename: str, filters: Optional[Dict[str, Any]] = None) -> Iterator[Mapping[str, Any]]:
+    """
+    Recorre los registros a exportar de una entidad.
+
+    Los filtros de usuarios y herramientas tienen la misma semántica que
+    search_users (search_term, user_type, course, role) y search_tools; en
+    el resto de las entidades se comparan por igualdad.
+
+    Args:
+        filename: Nombre de la entidad (clave de DATA_FILES)
+        filters: Filtros a aplicar (opcional)
+
+    Yields:
+        Registros que cumplen los filtros
+    """
+    if not filters:
+        yield from iter_records(filename)
+    elif filename == USER_DATA_FILE:
+        yield from iter_search_users(**filters)
+    elif filename == TOOL_DATA_FILE:
+        yield from iter_search_tools(filters)
+    else:
+        yield from query_records(filename, filters)
+
+
+def _csv_value(value: Any) -> Any:
+    """Convierte un valor a texto para una celda CSV (listas separadas por ';')."""
+    if isinstance(value, (list, tuple)):
+        return CSV_LIST_SEPARATOR.join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _collect_columns(filename: str, filters: Optional[Dict[str, Any]]) -> List[str]:
+    """Obtiene las columnas de todos los registros a exportar, en orden de aparición."""
+    columns = {}
+    for record in iter_export_records(filename, filters):
+        for key in record:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def export_entity(filename: str, output_path: Union[str, Path], export_format: str = "csv",
+                  columns: Optional[List[str]] = None,
+                  filters: Optional[Dict[str, Any]] = None) -> Tuple[bool, str, int]:
+    """
+    Exporta los registros de una entidad a un archivo CSV o JSON Lines.
+
+    Los registros se escriben a medida que se leen. En CSV sin columnas
+    indicadas se hace una primera pasada para reunir los campos de todos los
+    registros. El archivo se escribe en uno temporal y se reemplaza al
+    final, por lo que nunca queda una exportación a medias.
+
+    Args:
+        filename: Nombre de la entidad (clave de DATA_FILES)
+        output_path: Ruta del archivo a generar
+        export_format: "csv" o "jsonl"
+        columns: Campos a exportar, en orden (por defecto, todos)
+        filters: Filtros a aplicar (ver iter_export_records)
+
+    Returns:
+        Tupla (éxito, mensaje, cantidad de registros exportados)
+    """
+    if filename not in DATA_FILES:
+        return False, f"Entidad desconocida: {filename}", 0
+    if export_format not in EXPORT_FORMATS:
+        return False, f"Formato no soportado: {export_format}", 0
+
+    output_path = Path(output_path)
+    temp_path = output_path.with_name(output_path.name + ".tmp")
+    count = 0
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "w", newline="", encoding="utf-8") as file:
+            if export_format == "csv":
+                if columns is None:
+                    columns = _collect_columns(filename, filters)
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                for record in iter_export_records(filename, filters):
+                    writer.writerow([_csv_value(record.get(column, "")) for column in columns])
+                    count += 1
+            else:
+                for record in iter_export_records(filename, filters):
+                    if columns is not None:
+                        record = {column: record.get(column) for column in columns}
+                    file.write(json.dumps(dict(record), ensure_ascii=False))
+                    file.write("\n")
+                    count += 1
+        os.replace(temp_path, output_path)
+    except OSError as e:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        return False, f"Error al exportar {filename}: {e}", count
+
+    return True, f"{count} registros de {filename} exportados a {output_path}", count
+
+
+def export_all(output_dir: Union[str, Path], export_format: str = "csv",
+               columns: Optional[Dict[str, List[str]]] = None,
+               filters: Optional[Dict[str, Dict[str, Any]]] = None,
+               workers: Optional[int] = None) -> Dict[str, Tuple[bool, str, int]]:
+    """
+    Exporta todas las entidades en paralelo, un archivo por entidad.
+
+    Args:
+        output_dir: Directorio donde se generan los archivos (<entidad>.csv o .jsonl)
+        export_format: "csv" o "jsonl"
+        columns: Campos a exportar por entidad (opcional)
+        filters: Filtros por entidad (opcional)
+        workers: Cantidad de hilos (por defecto, uno por entidad)
+
+    Returns:
+        Diccionario entidad -> (éxito, mensaje, cantidad exportada)
+    """
+    output_dir = Path(output_dir)
+    columns = columns or {}
+    filters = filters or {}
+
+    with ThreadPoolExecutor(max_workers=workers or len(DATA_FILES)) as executor:
+        futures = {
+            filename: executor.submit(
+                export_entity, filename, output_dir / f"{filename}.{export_format}",
+                export_format, columns.get(filename), filters.get(filename)
+            )
+            for filename in DATA_FILES
+        }
+        return {filename: future.result() for filename, future in futures.items()}
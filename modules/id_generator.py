@@ -1,17 +1,167 @@
 """
 Módulo para generar IDs únicos autoincrementales.
+
+Los IDs se asignan desde una secuencia persistente por entidad
+(data/secuencias.json) que guarda el último ID entregado. Asignar un ID no
+depende de la cantidad de registros y nunca reutiliza IDs de registros
+eliminados. El archivo se bloquea durante cada reserva, por lo que varios
+procesos pueden asignar IDs a la vez sin repetirlos.
+
+Si el archivo está dañado no se descarta: se guarda una copia y se
+reconstruye a partir de lo que se pueda rescatar y de los datos.
 """
-from typing import Dict, Any, List
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Iterator, IO
+
+from modules.data_manager import DATA_DIR, DATA_FILES, ensure_data_directory, get_records_view
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SEQUENCE_FILE = DATA_DIR / "secuencias.json"
+
+# Entradas "entidad": número que se pueden rescatar de un archivo dañado
+_SEQUENCE_ENTRY = re.compile(r'"([^"\\]+)"\s*:\s*(\d+)')
+
+_sequence_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
 
 def get_next_id(data: List[Dict[str, Any]], id_field: str = "id") -> int:
     """
     Genera el siguiente ID único basado en los datos existentes.
-    
+
+    Recorre todos los registros; para asignar IDs a registros nuevos usar
+    allocate_id, que no depende del tamaño de los datos.
+
     Args:
         data: Lista de registros existentes
         id_field: Nombre del campo ID (por defecto "id")
-        
+
     Returns:
         Siguiente ID disponible
     """
-    return  max(record.get(id_field, 0) for record in data) + 1 if data else 1 
\ No newline at end of file
+    return  max(record.get(id_field, 0) for record in data) + 1 if data else 1
+
+def _lock_file(file: IO) -> None:
+    """Bloquea un archivo de forma exclusiva entre procesos."""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+def _unlock_file(file: IO) -> None:
+    """Libera el bloqueo de un archivo."""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def _locked_sequence_file() -> Iterator[IO]:
+    """Abre el archivo de secuencias bloqueado para este hilo y para otros procesos."""
+    ensure_data_directory()
+    with _sequence_lock:
+        fd = os.open(SEQUENCE_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+", encoding="utf-8") as file:
+            _lock_file(file)
+            try:
+                yield file
+            finally:
+                _unlock_file(file)
+
+def _repair_sequences(content: str) -> Dict[str, int]:
+    """
+    Reconstruye las secuencias a partir de un archivo dañado.
+
+    Guarda una copia del contenido dañado junto al archivo y rescata los
+    valores que todavía se pueden leer. Cada secuencia queda en el máximo
+    entre el valor rescatado y el mayor ID de los datos de la entidad, de
+    modo que no se vuelvan a entregar IDs ya usados por registros vigentes.
+
+    Args:
+        content: Contenido del archivo de secuencias
+
+    Returns:
+        Secuencias reconstruidas (entidad -> último ID entregado)
+    """
+    backup = SEQUENCE_FILE.with_name(SEQUENCE_FILE.name + ".corrupto")
+    with open(backup, "w", encoding="utf-8") as file:
+        file.write(content)
+
+    salvaged = {entity: int(value) for entity, value in _SEQUENCE_ENTRY.findall(content)}
+    sequences = dict(salvaged)
+    for entity in DATA_FILES:
+        sequences[entity] = max(salvaged.get(entity, 0), get_next_id(get_records_view(entity)) - 1)
+
+    logger.warning(
+        "Archivo de secuencias dañado (copia en %s); valores rescatados: %s; secuencias reconstruidas: %s",
+        backup, salvaged, sequences
+    )
+    return sequences
+
+def reserve_ids(entity: str, count: int = 1) -> range:
+    """
+    Reserva un bloque de IDs consecutivos para una entidad.
+
+    La primera vez que se usa la secuencia de una entidad se inicializa con
+    el mayor ID existente en sus datos.
+
+    Args:
+        entity: Nombre de la entidad (por ejemplo "usuarios")
+        count: Cantidad de IDs a reservar
+
+    Returns:
+        Rango con los IDs reservados
+
+    Raises:
+        ValueError: Si count no es positivo
+    """
+    if count < 1:
+        raise ValueError("La cantidad de IDs a reservar debe ser positiva")
+
+    with _locked_sequence_file() as file:
+        content = file.read()
+        try:
+            sequences = json.loads(content) if content.strip() else {}
+        except json.JSONDecodeError:
+            sequences = None
+        if not isinstance(sequences, dict) or not all(
+            isinstance(value, int) and not isinstance(value, bool) for value in sequences.values()
+        ):
+            sequences = _repair_sequences(content)
+
+        last_id = sequences.get(entity)
+        if last_id is None:
+            last_id = get_next_id(get_records_view(entity)) - 1
+
+        sequences[entity] = last_id + count
+        file.seek(0)
+        file.truncate()
+        json.dump(sequences, file, indent=2, ensure_ascii=False)
+        file.flush()
+        os.fsync(file.fileno())
+
+    return range(last_id + 1, last_id + count + 1)
+
+def allocate_id(entity: str) -> int:
+    """
+    Asigna el siguiente ID de una entidad.
+
+    Args:
+        entity: Nombre de la entidad (por ejemplo "usuarios")
+
+    Returns:
+        ID asignado
+    """
+    return reserve_ids(entity, 1)[0]
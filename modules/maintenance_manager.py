@@ -0,0 +1,406 @@
+"""
+Módulo para la gestión de mantenimientos
+Registra los mantenimientos preventivos y correctivos de las herramientas,
+mantiene la agenda de los programados en un índice de prioridad por fecha y
+el historial de cada herramienta ordenado por fecha
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from modules.data_manager import (
+    get_record, copy_record, insert_record, update_record, transaction,
+    register_index, find_records, register_heap_index, find_records_up_to,
+    register_sorted_index, find_records_in_range, get_range_span,
+    register_counter, get_count
+)
+from modules.enums import MaintenanceType, MaintenanceStatus, ToolState
+from modules.id_generator import allocate_id
+from modules.storage import StorageError
+from modules.tool_manager import TOOL_DATA_FILE, update_tool_state
+from modules.validators import validate_maintenance_data
+
+MAINTENANCE_DATA_FILE = "mantenimientos"
+
+# Días que abarca la consulta de vencimientos próximos
+DUE_WINDOW_DAYS = 7
+
+# Fecha como texto YYYY-MM-DD o como datetime.date
+DateLike = Union[str, date]
+
+
+def _iso_date(value: DateLike) -> str:
+    """
+    Convierte una fecha a texto YYYY-MM-DD, la forma en que se guarda
+
+    Las fechas así escritas se ordenan igual como texto que como fecha, por
+    lo que sirven directamente de prioridad en la agenda
+
+    Raises:
+        ValueError: Si el texto no es una fecha válida
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+
+
+def _agenda_date(maintenance: Dict[str, Any]) -> Optional[str]:
+    """Prioridad en la agenda: fecha de los mantenimientos programados (None para el resto)"""
+    if maintenance.get("estado") == MaintenanceStatus.PROGRAMADO.value:
+        return maintenance.get("fecha_programada")
+    return None
+
+
+def _history_date(maintenance: Dict[str, Any]) -> Optional[str]:
+    """Fecha del mantenimiento en el historial: la de realización o, si no se realizó, la programada"""
+    return maintenance.get("fecha_realizacion") or maintenance.get("fecha_programada")
+
+
+def _history_groups(maintenance: Dict[str, Any]) -> Tuple[tuple, ...]:
+    """Grupos del historial: (herramienta,), (herramienta, tipo) y (herramienta, tipo, estado)"""
+    tool_id = maintenance.get("herramienta_id")
+    maintenance_type = maintenance.get("tipo")
+    return (tool_id,), (tool_id, maintenance_type), (tool_id, maintenance_type, maintenance.get("estado"))
+
+
+def _cost_tool(maintenance: Dict[str, Any]) -> Optional[int]:
+    """Herramienta a la que se suma el costo de un mantenimiento completado (None si no corresponde)"""
+    if maintenance.get("estado") == MaintenanceStatus.COMPLETADO.value and maintenance.get("costo"):
+        return maintenance.get("herramienta_id")
+    return None
+
+
+def _cost_cents(maintenance: Dict[str, Any]) -> int:
+    """Costo en centavos, para que las sumas acumuladas sean exactas"""
+    return round(maintenance["costo"] * 100)
+
+
+register_index(MAINTENANCE_DATA_FILE, "herramienta_id")
+register_heap_index(MAINTENANCE_DATA_FILE, "agenda", _agenda_date)
+register_sorted_index(MAINTENANCE_DATA_FILE, "historial", _history_groups, _history_date)
+register_counter(MAINTENANCE_DATA_FILE, "costo_centavos", _cost_tool, amount=_cost_cents)
+
+
+def schedule_maintenance(tool_id: int, scheduled_date: DateLike,
+                         maintenance_type: str = MaintenanceType.PREVENTIVO.value,
+                         frequency_days: Optional[int] = None,
+                         description: str = "") -> Tuple[bool, str, Optional[int]]:
+    """
+    Programa un mantenimiento para una herramienta
+
+    Un mantenimiento con frecuencia es un plan preventivo: al completarlo se
+    programa automáticamente el siguiente
+
+    Args:
+        tool_id: ID de la herramienta
+        scheduled_date: Fecha programada
+        maintenance_type: "Preventivo" o "Correctivo"
+        frequency_days: Días entre un mantenimiento del plan y el siguiente (opcional)
+        description: Tareas a realizar
+
+    Returns:
+        Tupla (éxito, mensaje, id_mantenimiento_creado)
+    """
+    if get_record(TOOL_DATA_FILE, tool_id) is None:
+        return False, f"Herramienta con ID {tool_id} no encontrada", None
+    try:
+        scheduled_date = _iso_date(scheduled_date)
+    except (TypeError, ValueError):
+        return False, "Fecha programada: Formato de fecha inválido. Use YYYY-MM-DD", None
+
+    maintenance = {
+        'herramienta_id': tool_id,
+        'tipo': maintenance_type,
+        'estado': MaintenanceStatus.PROGRAMADO.value,
+        'fecha_programada': scheduled_date,
+        'frecuencia_dias': frequency_days,
+        'descripcion': description.strip(),
+        'fecha_inicio': None,
+        'fecha_realizacion': None,
+        'costo': None,
+        'observaciones': ''
+    }
+    is_valid, errors = validate_maintenance_data(maintenance)
+    if not is_valid:
+        return False, "Errores de validación: " + "; ".join(errors), None
+
+    maintenance_id = allocate_id(MAINTENANCE_DATA_FILE)
+    maintenance = {'id': maintenance_id, **maintenance,
+                   'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    if insert_record(MAINTENANCE_DATA_FILE, maintenance):
+        return True, f"Mantenimiento programado con ID {maintenance_id} para el {scheduled_date}", maintenance_id
+    return False, "Error al guardar el mantenimiento", None
+
+
+def get_maintenance_by_id(maintenance_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene un mantenimiento por su ID
+
+    Args:
+        maintenance_id: ID del mantenimiento
+
+    Returns:
+        Diccionario con datos del mantenimiento o None si no se encuentra
+    """
+    maintenance = get_record(MAINTENANCE_DATA_FILE, maintenance_id)
+    return copy_record(maintenance) if maintenance is not None else None
+
+
+def get_tool_maintenances(tool_id: int) -> List[Dict[str, Any]]:
+    """
+    Obtiene todos los mantenimientos de una herramienta
+
+    Args:
+        tool_id: ID de la herramienta
+
+    Returns:
+        Lista de mantenimientos de la herramienta
+    """
+    return [copy_record(maintenance) for maintenance in find_records(MAINTENANCE_DATA_FILE, "herramienta_id", tool_id)]
+
+
+def _history_group(tool_id: int, maintenance_type: Optional[str], status: Optional[str]) -> tuple:
+    """Grupo del historial que corresponde a los filtros"""
+    if maintenance_type is None:
+        return (tool_id,)
+    if status is None:
+        return (tool_id, maintenance_type)
+    return (tool_id, maintenance_type, status)
+
+
+def get_tool_history(tool_id: int, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                     maintenance_type: Optional[str] = None,
+                     status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Obtiene el historial de mantenimientos de una herramienta, ordenado por fecha
+
+    Se resuelve con búsqueda binaria sobre el historial de la herramienta,
+    sin recorrer el resto de los mantenimientos. Por ejemplo, los
+    correctivos de 2025: get_tool_history(id, "2025-01-01", "2025-12-31", "Correctivo")
+
+    Args:
+        tool_id: ID de la herramienta
+        start: Fecha desde, inclusive (opcional)
+        end: Fecha hasta, inclusive (opcional)
+        maintenance_type: "Preventivo" o "Correctivo" (opcional)
+        status: Estado del mantenimiento (opcional)
+
+    Returns:
+        Lista de mantenimientos ordenados por fecha de realización (o programada)
+    """
+    start = _iso_date(start) if start is not None else None
+    end = _iso_date(end) if end is not None else None
+    records = find_records_in_range(MAINTENANCE_DATA_FILE, "historial",
+                                    _history_group(tool_id, maintenance_type, status), start, end)
+    if maintenance_type is None and status is not None:
+        records = [maintenance for maintenance in records if maintenance.get('estado') == status]
+    return [copy_record(maintenance) for maintenance in records]
+
+
+def get_tool_maintenance_summary(tool_id: int) -> Dict[str, Any]:
+    """
+    Obtiene el resumen de mantenimientos de una herramienta
+
+    Las cantidades y fechas salen de los extremos del historial ordenado y
+    el costo de un contador que se actualiza con cada mantenimiento, por lo
+    que no se recorre el historial. El tiempo medio entre fallas (MTBF) se
+    calcula entre los mantenimientos correctivos completados
+
+    Args:
+        tool_id: ID de la herramienta
+
+    Returns:
+        Diccionario con cantidad de mantenimientos (total, preventivos y
+        correctivos), fecha del primero y del último, costo total y MTBF
+        en días (None con menos de dos fallas)
+    """
+    span = get_range_span(MAINTENANCE_DATA_FILE, "historial", (tool_id,))
+    preventive = get_range_span(MAINTENANCE_DATA_FILE, "historial", (tool_id, MaintenanceType.PREVENTIVO.value))
+    corrective = get_range_span(MAINTENANCE_DATA_FILE, "historial", (tool_id, MaintenanceType.CORRECTIVO.value))
+    failures = get_range_span(MAINTENANCE_DATA_FILE, "historial",
+                              (tool_id, MaintenanceType.CORRECTIVO.value, MaintenanceStatus.COMPLETADO.value))
+
+    mtbf = None
+    if failures is not None and failures[2] > 1:
+        first, last, count = failures
+        mtbf = (date.fromisoformat(last) - date.fromisoformat(first)).days / (count - 1)
+
+    return {
+        'mantenimientos': span[2] if span else 0,
+        'preventivos': preventive[2] if preventive else 0,
+        'correctivos': corrective[2] if corrective else 0,
+        'primera_fecha': span[0] if span else None,
+        'ultima_fecha': span[1] if span else None,
+        'costo_total': get_count(MAINTENANCE_DATA_FILE, "costo_centavos", tool_id) / 100,
+        'mtbf_dias': mtbf
+    }
+
+
+def get_due_maintenances(until: DateLike, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Obtiene los mantenimientos programados hasta una fecha, incluidos los atrasados
+
+    Se extraen de la agenda sólo los k mantenimientos vencidos, en O(k log n),
+    sin recorrer todas las herramientas
+
+    Args:
+        until: Fecha límite (inclusive)
+        limit: Cantidad máxima de mantenimientos a devolver (opcional)
+
+    Returns:
+        Lista de mantenimientos ordenados por fecha programada
+    """
+    return [copy_record(maintenance)
+            for maintenance in find_records_up_to(MAINTENANCE_DATA_FILE, "agenda", _iso_date(until), limit)]
+
+
+def get_due_this_week(today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Obtiene los mantenimientos que vencen en los próximos DUE_WINDOW_DAYS días o están atrasados
+
+    Args:
+        today: Fecha de referencia (por defecto, hoy)
+
+    Returns:
+        Lista de mantenimientos ordenados por fecha programada
+    """
+    today = today or date.today()
+    return get_due_maintenances(today + timedelta(days=DUE_WINDOW_DAYS))
+
+
+def reschedule_maintenance(maintenance_id: int, new_date: DateLike) -> Tuple[bool, str]:
+    """
+    Cambia la fecha de un mantenimiento programado
+
+    Args:
+        maintenance_id: ID del mantenimiento
+        new_date: Nueva fecha programada
+
+    Returns:
+        Tupla (éxito, mensaje)
+    """
+    maintenance = get_record(MAINTENANCE_DATA_FILE, maintenance_id)
+    if maintenance is None:
+        return False, f"Mantenimiento con ID {maintenance_id} no encontrado"
+    if maintenance['estado'] != MaintenanceStatus.PROGRAMADO.value:
+        return False, f"Sólo se pueden reprogramar mantenimientos en estado {MaintenanceStatus.PROGRAMADO.value}"
+    try:
+        new_date = _iso_date(new_date)
+    except (TypeError, ValueError):
+        return False, "Fecha programada: Formato de fecha inválido. Use YYYY-MM-DD"
+
+    updated = copy_record(maintenance)
+    updated['fecha_programada'] = new_date
+    if update_record(MAINTENANCE_DATA_FILE, maintenance_id, updated):
+        return True, f"Mantenimiento {maintenance_id} reprogramado para el {new_date}"
+    return False, "Error al guardar los cambios"
+
+
+def start_maintenance(maintenance_id: int, start_date: Optional[DateLike] = None) -> Tuple[bool, str]:
+    """
+    Inicia un mantenimiento programado y pasa la herramienta a "En Mantenimiento"
+
+    El mantenimiento y la herramienta se guardan juntos: si uno de los dos
+    cambios falla no se guarda ninguno. No se inicia sobre una herramienta
+    "Fuera de Servicio", que al completarse quedaría como "Disponible"
+
+    Args:
+        maintenance_id: ID del mantenimiento
+        start_date: Fecha de inicio (por defecto, hoy)
+
+    Returns:
+        Tupla (éxito, mensaje)
+    """
+    maintenance = get_record(MAINTENANCE_DATA_FILE, maintenance_id)
+    if maintenance is None:
+        return False, f"Mantenimiento con ID {maintenance_id} no encontrado"
+    if maintenance['estado'] != MaintenanceStatus.PROGRAMADO.value:
+        return False, f"El mantenimiento {maintenance_id} ya está {maintenance['estado']}"
+
+    try:
+        start_date = _iso_date(start_date or date.today())
+    except (TypeError, ValueError):
+        return False, "Fecha de inicio: Formato de fecha inválido. Use YYYY-MM-DD"
+
+    tool = get_record(TOOL_DATA_FILE, maintenance['herramienta_id'])
+    if tool is None:
+        return False, f"Herramienta con ID {maintenance['herramienta_id']} no encontrada"
+    if tool['estado'] == ToolState.FUERA_DE_SERVICIO.value:
+        return False, f"La herramienta {tool['id']} está {tool['estado']}; no se puede iniciar el mantenimiento"
+
+    started = copy_record(maintenance)
+    started['estado'] = MaintenanceStatus.EN_CURSO.value
+    started['fecha_inicio'] = start_date
+    try:
+        with transaction(MAINTENANCE_DATA_FILE, TOOL_DATA_FILE):
+            success, message = update_tool_state(started['herramienta_id'], ToolState.EN_MANTENIMIENTO.value)
+            if not success:
+                raise StorageError(message)
+            update_record(MAINTENANCE_DATA_FILE, maintenance_id, started)
+    except StorageError as e:
+        return False, f"Error al guardar los cambios: {e}"
+
+    return True, f"Mantenimiento {maintenance_id} iniciado; herramienta {started['herramienta_id']} en mantenimiento"
+
+
+def complete_maintenance(maintenance_id: int, cost: Optional[float] = None, notes: str = "",
+                         completion_date: Optional[DateLike] = None) -> Tuple[bool, str, Optional[int]]:
+    """
+    Completa un mantenimiento y devuelve la herramienta a "Disponible"
+
+    La herramienta sólo cambia de estado si estaba "En Mantenimiento". Si el
+    mantenimiento pertenece a un plan con frecuencia, se programa el
+    siguiente a partir de la fecha de realización. Todo se guarda junto
+
+    Args:
+        maintenance_id: ID del mantenimiento
+        cost: Costo del mantenimiento (opcional)
+        notes: Observaciones
+        completion_date: Fecha de realización (por defecto, hoy)
+
+    Returns:
+        Tupla (éxito, mensaje, id_del_siguiente_mantenimiento_programado)
+    """
+    maintenance = get_record(MAINTENANCE_DATA_FILE, maintenance_id)
+    if maintenance is None:
+        return False, f"Mantenimiento con ID {maintenance_id} no encontrado", None
+    if maintenance['estado'] == MaintenanceStatus.COMPLETADO.value:
+        return False, f"El mantenimiento {maintenance_id} ya está completado", None
+    try:
+        completion_date = _iso_date(completion_date or date.today())
+    except (TypeError, ValueError):
+        return False, "Fecha de realización: Formato de fecha inválido. Use YYYY-MM-DD", None
+
+    completed = copy_record(maintenance)
+    completed['estado'] = MaintenanceStatus.COMPLETADO.value
+    completed['fecha_inicio'] = completed.get('fecha_inicio') or completion_date
+    completed['fecha_realizacion'] = completion_date
+    completed['costo'] = cost
+    completed['observaciones'] = notes.strip()
+    is_valid, errors = validate_maintenance_data(completed)
+    if not is_valid:
+        return False, "Errores de validación: " + "; ".join(errors), None
+
+    tool_id = completed['herramienta_id']
+    next_id = None
+    try:
+        with transaction(MAINTENANCE_DATA_FILE, TOOL_DATA_FILE):
+            update_record(MAINTENANCE_DATA_FILE, maintenance_id, completed)
+            tool = get_record(TOOL_DATA_FILE, tool_id)
+            if tool is not None and tool['estado'] == ToolState.EN_MANTENIMIENTO.value:
+                update_tool_state(tool_id, ToolState.DISPONIBLE.value)
+            if completed.get('frecuencia_dias'):
+                next_date = date.fromisoformat(completion_date) + timedelta(days=completed['frecuencia_dias'])
+                success, message, next_id = schedule_maintenance(
+                    tool_id, next_date, completed['tipo'], completed['frecuencia_dias'],
+                    completed.get('descripcion', '')
+                )
+                if not success:
+                    raise StorageError(message)
+    except StorageError as e:
+        return False, f"Error al guardar los cambios: {e}", None
+
+    message = f"Mantenimiento {maintenance_id} completado"
+    if next_id is not None:
+        message += f"; próximo mantenimiento programado con ID {next_id}"
+    return True, message, next_id
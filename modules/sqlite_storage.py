@@ -0,0 +1,246 @@
+"""
+Backend de almacenamiento sobre SQLite (biblioteca estándar sqlite3).
+
+Cada entidad se guarda en su propia tabla con el registro completo en una
+columna JSON y los campos más consultados copiados a columnas indexadas,
+de modo que las búsquedas por igualdad se resuelven con SQL en lugar de
+recorrer todos los registros.
+
+Uso como script para importar los archivos JSON existentes:
+
+    python -m modules.sqlite_storage [ruta_base_de_datos]
+"""
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Mapping, Iterable, Iterator
+
+from modules.storage import StorageBackend, StorageError, JsonFileBackend
+
+# Columnas indexadas por entidad (además de "id", que es la clave primaria)
+INDEXED_COLUMNS = {
+    "usuarios": ("documento", "tipo_usuario"),
+    "herramientas": ("estado", "tipo"),
+    "mantenimientos": ("tipo",),
+    "asignaciones": ("estado",)
+}
+
+# Cantidad de filas leídas por consulta al recorrer una tabla
+ITER_BATCH_SIZE = 500
+
+
+class SqliteBackend(StorageBackend):
+    """Backend que guarda cada entidad en una tabla SQLite."""
+
+    name = "sqlite"
+    supports_streaming = True
+    supports_query = True
+
+    def __init__(self, db_path: Path, entities: Iterable[str]):
+        self.db_path = Path(db_path)
+        self.entities = list(entities)
+        self._lock = threading.RLock()
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._create_schema()
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+
+    def _columns(self, filename: str) -> tuple:
+        if filename not in self.entities:
+            raise StorageError(f"Entidad desconocida: {filename}")
+        return INDEXED_COLUMNS.get(filename, ())
+
+    def _create_schema(self) -> None:
+        """Crea las tablas, índices y la tabla de versiones si no existen."""
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS _versiones (entidad TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            for filename in self.entities:
+                columns = self._columns(filename)
+                column_defs = "".join(f", {column} TEXT" for column in columns)
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {filename} "
+                    f"(id INTEGER PRIMARY KEY{column_defs}, datos TEXT NOT NULL)"
+                )
+                for column in columns:
+                    self._connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{filename}_{column} ON {filename} ({column})"
+                    )
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO _versiones (entidad, version) VALUES (?, 0)", (filename,)
+                )
+
+    def _row(self, filename: str, record: Mapping[str, Any]) -> tuple:
+        """Convierte un registro en la tupla de valores de su fila."""
+        values = [record.get("id")]
+        values.extend(record.get(column) for column in self._columns(filename))
+        values.append(json.dumps(dict(record), ensure_ascii=False))
+        return tuple(values)
+
+    def _insert_sql(self, filename: str) -> str:
+        columns = ("id",) + self._columns(filename) + ("datos",)
+        placeholders = ", ".join("?" for _ in columns)
+        return f"INSERT OR REPLACE INTO {filename} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    def _bump_version(self, filename: str) -> None:
+        self._connection.execute(
+            "UPDATE _versiones SET version = version + 1 WHERE entidad = ?", (filename,)
+        )
+
+    def _write(self, filename: str, statements: List[tuple]) -> None:
+        """Ejecuta sentencias de escritura sobre una entidad en una única transacción."""
+        self._write_many({filename: statements})
+
+    def _write_many(self, statements_by_entity: Mapping[str, List[tuple]]) -> None:
+        """Ejecuta sentencias de escritura sobre varias entidades en una única transacción."""
+        for filename in statements_by_entity:
+            self._columns(filename)
+        with self._lock:
+            try:
+                with self._connection:
+                    for filename, statements in statements_by_entity.items():
+                        for sql, params in statements:
+                            if isinstance(params, list):
+                                self._connection.executemany(sql, params)
+                            else:
+                                self._connection.execute(sql, params)
+                        self._bump_version(filename)
+            except sqlite3.Error as e:
+                raise StorageError(str(e)) from e
+
+    def signature(self, filename: str) -> Any:
+        self._columns(filename)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version FROM _versiones WHERE entidad = ?", (filename,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load(self, filename: str) -> List[Dict[str, Any]]:
+        self._columns(filename)
+        with self._lock:
+            rows = self._connection.execute(f"SELECT datos FROM {filename} ORDER BY id").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_records(self, filename: str) -> Iterator[Dict[str, Any]]:
+        """Recorre la tabla por bloques ordenados por ID, sin cargarla completa."""
+        self._columns(filename)
+        last_id = None
+        while True:
+            with self._lock:
+                if last_id is None:
+                    rows = self._connection.execute(
+                        f"SELECT id, datos FROM {filename} ORDER BY id LIMIT ?", (ITER_BATCH_SIZE,)
+                    ).fetchall()
+                else:
+                    rows = self._connection.execute(
+                        f"SELECT id, datos FROM {filename} WHERE id > ? ORDER BY id LIMIT ?",
+                        (last_id, ITER_BATCH_SIZE)
+                    ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row[1])
+            last_id = rows[-1][0]
+
+    def _replace_statements(self, filename: str, records: Iterable[Dict[str, Any]]) -> List[tuple]:
+        return [
+            (f"DELETE FROM {filename}", ()),
+            (self._insert_sql(filename), [self._row(filename, record) for record in records])
+        ]
+
+    def save(self, filename: str, records: Iterable[Dict[str, Any]]) -> None:
+        self._write(filename, self._replace_statements(filename, records))
+
+    def save_many(self, records_by_entity: Mapping[str, Iterable[Dict[str, Any]]]) -> None:
+        self._write_many({
+            filename: self._replace_statements(filename, records)
+            for filename, records in records_by_entity.items()
+        })
+
+    def insert(self, filename: str, record: Dict[str, Any], records: Iterable[Dict[str, Any]]) -> None:
+        self._write(filename, [(self._insert_sql(filename), self._row(filename, record))])
+
+    def update(self, filename: str, record_id: Any, record: Dict[str, Any],
+               records: Iterable[Dict[str, Any]]) -> None:
+        self._write(filename, [(self._insert_sql(filename), self._row(filename, record))])
+
+    def delete(self, filename: str, record_id: Any, records: Iterable[Dict[str, Any]]) -> None:
+        self._write(filename, [(f"DELETE FROM {filename} WHERE id = ?", (record_id,))])
+
+    def query(self, filename: str, filters: Mapping[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        indexed = ("id",) + self._columns(filename)
+        sql_filters = {field: value for field, value in filters.items() if field in indexed}
+        if not sql_filters:
+            return None
+
+        where = " AND ".join(f"{field} = ?" for field in sql_filters)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT datos FROM {filename} WHERE {where} ORDER BY id", tuple(sql_filters.values())
+            ).fetchall()
+
+        records = [json.loads(row[0]) for row in rows]
+        remaining = {field: value for field, value in filters.items() if field not in sql_filters}
+        if remaining:
+            records = [
+                record for record in records
+                if all(record.get(field) == value for field, value in remaining.items())
+            ]
+        return records
+
+    def page_by_id(self, filename: str, after_id: Any, limit: int) -> Optional[List[Dict[str, Any]]]:
+        self._columns(filename)
+        with self._lock:
+            if after_id is None:
+                rows = self._connection.execute(
+                    f"SELECT datos FROM {filename} ORDER BY id LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self._connection.execute(
+                    f"SELECT datos FROM {filename} WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+                ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def import_json_files(backend: SqliteBackend, data_files: Dict[str, Path]) -> Dict[str, int]:
+    """
+    Importa los archivos JSON existentes (incluido su journal) a SQLite.
+
+    Reemplaza el contenido de cada tabla por el del archivo correspondiente.
+
+    Args:
+        backend: Backend SQLite de destino
+        data_files: Registro de archivos JSON por entidad
+
+    Returns:
+        Diccionario con la cantidad de registros importados por entidad
+    """
+    source = JsonFileBackend(data_files)
+    imported = {}
+    for filename in backend.entities:
+        if filename not in data_files:
+            continue
+        records = source.load(filename)
+        backend.save(filename, records)
+        imported[filename] = len(records)
+    return imported
+
+
+if __name__ == "__main__":
+    from modules.data_manager import DATA_FILES, SQLITE_DB_PATH
+
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else SQLITE_DB_PATH
+    sqlite_backend = SqliteBackend(db_path, DATA_FILES.keys())
+    for entity, count in import_json_files(sqlite_backend, DATA_FILES).items():
+        print(f"{entity}: {count} registros importados")
+    sqlite_backend.close()
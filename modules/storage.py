@@ -0,0 +1,859 @@
+"""
+Módulo con los backends de almacenamiento de las entidades del sistema.
+
+Define la interfaz StorageBackend que usa data_manager, su implementación
+por defecto sobre archivos JSON con journal de mutaciones y la variante en
+formato JSON Lines (un registro por línea), que permite recorrer los datos
+sin cargarlos completos en memoria.
+
+Ambos backends JSON pueden guardar los campos de enumeraciones en formato
+compacto (ver CodeTable): el archivo lleva una cabecera con la tabla de
+códigos y cada valor se reemplaza por su posición en ella.
+
+Las escrituras que abarcan varias entidades se confirman con una marca de
+confirmación (ver JsonFileBackend.save_many) y se completan al arrancar si
+una interrupción las dejó a medio publicar.
+"""
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, ExitStack
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Any, Optional, Set, Tuple, Mapping, Iterator, Iterable, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class StorageError(Exception):
+    """Error de lectura o escritura en un backend de almacenamiento."""
+
+
+# Archivo que marca una escritura de varias entidades ya confirmada
+COMMIT_MARKER_NAME = "confirmacion.json"
+# Archivo de bloqueo de las escrituras (archivos completos y journals)
+WRITE_LOCK_NAME = "escritura.lock"
+
+_write_thread_lock = threading.RLock()
+# Directorios cuyo bloqueo ya tiene el hilo que posee _write_thread_lock
+_held_write_locks: Set[Path] = set()
+
+# Versión del formato compacto (cabecera con tabla de códigos)
+CODE_TABLE_FORMAT = "codigos"
+CODE_TABLE_VERSION = 1
+
+
+class CodeTable:
+    """
+    Tabla de códigos de los campos de enumeraciones de una entidad.
+
+    Cada valor se guarda como su posición en la lista del campo
+    ("Estudiante" -> 0). La tabla viaja en la cabecera del archivo, por lo
+    que un archivo se decodifica siempre con la tabla con que fue escrito,
+    aunque después cambien las enumeraciones. Los textos que no están en la
+    tabla se guardan tal cual; cualquier otro valor (salvo None) se envuelve
+    como {"valor": ...}, de modo que los enteros del archivo son siempre
+    códigos.
+    """
+
+    __slots__ = ("fields", "_codes")
+
+    def __init__(self, fields: Mapping[str, Sequence[str]]):
+        self.fields = {field: list(values) for field, values in fields.items()}
+        self._codes = {
+            field: {value: code for code, value in enumerate(values)}
+            for field, values in self.fields.items()
+        }
+
+    def header(self) -> Dict[str, Any]:
+        """Cabecera que se escribe al principio del archivo."""
+        return {"formato": CODE_TABLE_FORMAT, "version": CODE_TABLE_VERSION, "campos": self.fields}
+
+    @classmethod
+    def from_header(cls, header: Mapping[str, Any]) -> "CodeTable":
+        """
+        Reconstruye la tabla a partir de la cabecera de un archivo.
+
+        Raises:
+            StorageError: Si la versión del formato no es soportada
+        """
+        if header.get("version") != CODE_TABLE_VERSION:
+            raise StorageError(f"Versión de tabla de códigos no soportada: {header.get('version')}")
+        return cls(header.get("campos", {}))
+
+    def encode(self, record: Mapping[str, Any]) -> Dict[str, Any]:
+        """Devuelve una copia del registro con los valores de enumeraciones codificados."""
+        encoded = dict(record)
+        for field, codes in self._codes.items():
+            value = encoded.get(field)
+            if isinstance(value, str):
+                if value in codes:
+                    encoded[field] = codes[value]
+            elif value is not None:
+                encoded[field] = {"valor": value}
+        return encoded
+
+    def decode(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reemplaza en el lugar los códigos del registro por sus valores.
+
+        Raises:
+            StorageError: Si un código no está en la tabla
+        """
+        for field, values in self.fields.items():
+            code = record.get(field)
+            if type(code) is int:
+                if not 0 <= code < len(values):
+                    raise _invalid_code(field, code)
+                record[field] = values[code]
+            elif isinstance(code, dict):
+                record[field] = code["valor"]
+        return record
+
+    def decode_all(self, records: Sequence[Dict[str, Any]]) -> None:
+        """
+        Reemplaza en el lugar los códigos de todos los registros, campo por campo.
+
+        Raises:
+            StorageError: Si un código no está en la tabla
+        """
+        for field, values in self.fields.items():
+            size = len(values)
+            for record in records:
+                code = record.get(field)
+                if type(code) is int:
+                    if not 0 <= code < size:
+                        raise _invalid_code(field, code)
+                    record[field] = values[code]
+                elif isinstance(code, dict):
+                    record[field] = code["valor"]
+
+
+def _invalid_code(field: str, code: int) -> StorageError:
+    return StorageError(f"Código {code} fuera de la tabla del campo '{field}'")
+
+
+def fsync_directory(directory: Path) -> None:
+    """
+    Asegura en disco las altas, bajas y renombres de archivos de un directorio.
+
+    En los sistemas que no permiten abrir directorios (Windows) no hace nada.
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def write_lock(directory: Path) -> Iterator[None]:
+    """
+    Bloquea las escrituras en un directorio de datos, entre hilos y entre
+    procesos (mediante el archivo WRITE_LOCK_NAME).
+
+    Es reentrante dentro de un mismo hilo: quien ya tiene el bloqueo (por
+    ejemplo, para verificar una firma antes de escribir) puede llamar a
+    funciones que vuelven a pedirlo.
+    """
+    with _write_thread_lock:
+        if directory in _held_write_locks:
+            yield
+            return
+        fd = os.open(directory / WRITE_LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+") as file:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            _held_write_locks.add(directory)
+            try:
+                yield
+            finally:
+                _held_write_locks.discard(directory)
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def is_code_table_header(data: Any) -> bool:
+    """Indica si un objeto leído del archivo es una cabecera de tabla de códigos."""
+    return isinstance(data, dict) and data.get("formato") == CODE_TABLE_FORMAT
+
+
+class StorageBackend(ABC):
+    """
+    Interfaz de almacenamiento para las entidades registradas en DATA_FILES.
+
+    Los métodos de mutación reciben, además del registro afectado, un
+    iterable con todos los registros con la mutación ya aplicada, para los
+    backends que sólo saben reescribir la entidad entera.
+    """
+
+    name = "base"
+    # Indica si iter_records recorre el almacenamiento sin cargarlo completo
+    supports_streaming = False
+    # Indica si query resuelve consultas en el almacenamiento (ver query)
+    supports_query = False
+
+    @abstractmethod
+    def signature(self, filename: str) -> Any:
+        """Firma que cambia cada vez que la entidad se modifica en el almacenamiento."""
+
+    @abstractmethod
+    def load(self, filename: str) -> List[Dict[str, Any]]:
+        """Carga todos los registros de una entidad."""
+
+    def iter_records(self, filename: str) -> Iterator[Dict[str, Any]]:
+        """Recorre los registros de una entidad (por defecto, cargándolos todos)."""
+        yield from self.load(filename)
+
+    @abstractmethod
+    def save(self, filename: str, records: Iterable[Dict[str, Any]]) -> None:
+        """Reemplaza todos los registros de una entidad."""
+
+    def save_many(self, records_by_entity: Mapping[str, Iterable[Dict[str, Any]]]) -> None:
+        """
+        Reemplaza los registros de varias entidades de una vez.
+
+        Los backends que lo permiten preparan todas las escrituras antes de
+        publicarlas, para reducir la ventana en la que sólo una parte de las
+        entidades quedó guardada.
+        """
+        for filename, records in records_by_entity.items():
+            self.save(filename, records)
+
+    def recover(self) -> List[str]:
+        """
+        Completa o descarta las escrituras que una interrupción dejó a medias.
+
+        Returns:
+            Entidades cuyos datos cambiaron al recuperar
+        """
+        return []
+
+    @contextmanager
+    def locked(self, filenames: Iterable[str]) -> Iterator[None]:
+        """
+        Bloquea las escrituras de otros procesos sobre las entidades indicadas.
+
+        Mientras dura el bloqueo la firma de las entidades sólo cambia por
+        escrituras propias, así que se puede verificar que nadie las
+        modificó y escribir sin que otro proceso se cuele en el medio. Por
+        defecto no bloquea nada.
+        """
+        yield
+
+    def insert(self, filename: str, record: Dict[str, Any], records: Iterable[Dict[str, Any]]) -> None:
+        """Persiste el alta de un registro."""
+        self.save(filename, records)
+
+    def update(self, filename: str, record_id: Any, record: Dict[str, Any],
+               records: Iterable[Dict[str, Any]]) -> None:
+        """Persiste la modificación de un registro."""
+        self.save(filename, records)
+
+    def delete(self, filename: str, record_id: Any, records: Iterable[Dict[str, Any]]) -> None:
+        """Persiste la baja de un registro."""
+        self.save(filename, records)
+
+    def compact(self, filename: str, records: Iterable[Dict[str, Any]]) -> None:
+        """Compacta el almacenamiento de una entidad (no hace nada por defecto)."""
+
+    def query(self, filename: str, filters: Mapping[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Resuelve una consulta por igualdad de campos en el propio almacenamiento.
+
+        Returns:
+            Lista de registros, o None si el backend no puede resolverla y
+            hay que filtrar los registros en memoria
+        """
+        return None
+
+    def page_by_id(self, filename: str, after_id: Any, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Obtiene, en orden de ID, hasta limit registros con ID mayor que after_id.
+
+        Args:
+            filename: Nombre del archivo (sin extensión)
+            after_id: Último ID de la página anterior (None para la primera)
+            limit: Cantidad máxima de registros
+
+        Returns:
+            Lista de registros, o None si el backend no puede resolverlo y
+            hay que paginar sobre los registros en memoria
+        """
+        return None
+
+    def close(self) -> None:
+        """Libera los recursos del backend."""
+
+
+def file_signature(file_path: Optional[Path]) -> Optional[Tuple[int, int]]:
+    """
+    Obtiene la firma (mtime en nanosegundos, tamaño) de un archivo.
+
+    Args:
+        file_path: Ruta del archivo
+
+    Returns:
+        Tupla (mtime_ns, tamaño) o None si el archivo no existe
+    """
+    if file_path is None:
+        return None
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_journal(journal_path: Path) -> List[Dict[str, Any]]:
+    """
+    Lee las entradas de un journal.
+
+    Las líneas que no se pueden decodificar (por ejemplo, una última línea
+    incompleta por una escritura interrumpida) se descartan con un aviso.
+
+    Args:
+        journal_path: Ruta del journal
+
+    Returns:
+        Lista de entradas en orden de escritura
+    """
+    entries = []
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as file:
+            for number, line in enumerate(file, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Journal %s: se descarta la línea %d, que no se puede leer", journal_path, number)
+    except IOError:
+        return []
+    return entries
+
+
+def truncate_torn_line(file: BinaryIO, journal_path: Path) -> None:
+    """
+    Corta la última línea de un journal si quedó sin terminar.
+
+    Una escritura interrumpida deja una línea sin salto de línea final; si
+    la entrada siguiente se agregara a continuación, las dos quedarían en
+    una sola línea ilegible y se perdería también la nueva.
+
+    Args:
+        file: Journal abierto en modo binario de lectura y escritura
+        journal_path: Ruta del journal (para el aviso)
+    """
+    end = file.seek(0, os.SEEK_END)
+    if end == 0:
+        return
+    file.seek(end - 1)
+    if file.read(1) == b"\n":
+        return
+
+    position = end
+    while position > 0:
+        start = max(0, position - 4096)
+        file.seek(start)
+        newline = file.read(position - start).rfind(b"\n")
+        if newline != -1:
+            position = start + newline + 1
+            break
+        position = start
+    logger.warning("Journal %s: se descarta una última línea incompleta de %d bytes", journal_path, end - position)
+    file.truncate(position)
+
+
+def apply_journal(records: List[Dict[str, Any]], entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Aplica las entradas de un journal sobre una lista de registros.
+
+    Las operaciones son idempotentes por ID, por lo que volver a aplicar un
+    journal ya volcado al archivo principal no altera el resultado.
+
+    Args:
+        records: Registros del archivo principal
+        entries: Entradas del journal
+
+    Returns:
+        Lista de registros con las mutaciones aplicadas
+    """
+    if not entries:
+        return records
+
+    positions = {record.get("id"): i for i, record in enumerate(records)}
+    for entry in entries:
+        op = entry.get("op")
+        record_id = entry.get("id")
+        if op in ("insert", "update"):
+            position = positions.get(record_id)
+            if position is None:
+                positions[record_id] = len(records)
+                records.append(entry["record"])
+            else:
+                records[position] = entry["record"]
+        elif op == "delete":
+            position = positions.pop(record_id, None)
+            if position is not None:
+                records[position] = None
+
+    return [record for record in records if record is not None]
+
+
+class JsonFileBackend(StorageBackend):
+    """
+    Backend sobre archivos JSON, uno por entidad.
+
+    En modo journal, las mutaciones de registros individuales se agregan como
+    una línea al journal de la entidad (por ejemplo data/usuarios.journal) y
+    se aplican al cargar. Cuando el journal alcanza compaction_threshold
+    entradas, se vuelca al archivo JSON principal.
+
+    Con code_tables, el archivo principal de esas entidades se escribe como
+    {"cabecera": ..., "registros": [...]} con los campos de enumeraciones
+    codificados; el journal guarda siempre los registros sin codificar. Los
+    archivos se leen en cualquiera de los dos formatos.
+    """
+
+    name = "json"
+    journal_suffix = ".journal"
+
+    def __init__(self, data_files: Dict[str, Path], journal: bool = True,
+                 compaction_threshold: int = 500,
+                 code_tables: Optional[Mapping[str, Mapping[str, Sequence[str]]]] = None):
+        self.data_files = data_files
+        self.journal = journal
+        self.compaction_threshold = compaction_threshold
+        self._journal_entries: Dict[str, int] = {}
+        self.code_tables = {
+            filename: CodeTable(fields) for filename, fields in (code_tables or {}).items()
+        }
+
+    def _path(self, filename: str) -> Path:
+        file_path = self.data_files.get(filename)
+        if file_path is None:
+            raise StorageError(f"Entidad desconocida: {filename}")
+        return file_path
+
+    def journal_path(self, filename: str) -> Path:
+        """Obtiene la ruta del journal de una entidad."""
+        return self._path(filename).with_suffix(self.journal_suffix)
+
+    def pending_journal_entries(self, filename: str) -> int:
+        """Cantidad de entradas del journal aún no volcadas al archivo principal."""
+        return self._journal_entries.get(filename, 0)
+
+    def signature(self, filename: str) -> Any:
+        return file_signature(self._path(filename)), file_signature(self.journal_path(filename))
+
+    def read_file(self, filename: str) -> List[Dict[str, Any]]:
+        """Lee el archivo principal de una entidad, sin aplicar el journal."""
+        file_path = self._path(filename)
+        if not file_path.exists():
+            return []
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (json.JSONDecodeError, IOError) as e:
+            return []
+        if isinstance(data, dict) and is_code_table_header(data.get("cabecera")):
+            records = data.get("registros", [])
+            CodeTable.from_header(data["cabecera"]).decode_all(records)
+            return records
+        return data
+
+    def load(self, filename: str) -> List[Dict[str, Any]]:
+        records = self.read_file(filename)
+        journal_path = self.journal_path(filename)
+        entries = read_journal(journal_path) if journal_path.exists() else []
+        self._journal_entries[filename] = len(entries)
+        return apply_journal(records, entries)
+
+    def save(self, filename: str, records: Iterable[Dict[str, Any]]) -> None:
+        self.save_many({filename: records})
+
+    def save_many(self, records_by_entity: Mapping[str, Iterable[Dict[str, Any]]]) -> None:
+        """
+        Reemplaza el archivo principal de una o más entidades.
+
+        Primero se escriben (y se llevan a disco) todos los archivos
+        temporales y recién después se reemplazan los originales, de modo que
+        una interrupción nunca deja un archivo a medio escribir. Los journals
+        de las entidades se descartan.
+
+        Con más de una entidad, entre ambos pasos se escribe la marca de
+        confirmación con los archivos a publicar: si la escritura se
+        interrumpe antes de la marca no se publica nada, y si se interrumpe
+        después recover() termina de publicarla, por lo que las entidades
+        nunca quedan guardadas a medias.
+
+        Toda la escritura se hace con el directorio bloqueado (ver
+        write_lock), así que las escrituras de distintos procesos no se
+        mezclan y recover() nunca descarta una que está en curso.
+
+        Raises:
+            StorageError: Si falla la escritura. Si la marca ya estaba
+                escrita y tampoco se pudo terminar de publicar, se completa
+                en la próxima recuperación
+        """
+        if not records_by_entity:
+            return
+        directory = self._path(next(iter(records_by_entity))).parent
+        temp_paths = {}
+        marker_path = None
+        try:
+            directory.mkdir(exist_ok=True)
+            with write_lock(directory):
+                try:
+                    for filename, records in records_by_entity.items():
+                        temp_paths[filename] = self.temp_path(filename)
+                        self.write_temp_file(filename, records)
+                    if len(temp_paths) > 1:
+                        marker_path = self._write_commit_marker(temp_paths)
+                    for filename, temp_path in temp_paths.items():
+                        self._publish(temp_path, self._path(filename), self.journal_path(filename))
+                        self._journal_entries[filename] = 0
+                    if marker_path is not None:
+                        self._remove_commit_marker(marker_path)
+                except (IOError, OSError):
+                    if marker_path is None:
+                        for temp_path in temp_paths.values():
+                            if temp_path.exists():
+                                temp_path.unlink()
+                        raise
+                    # Ya confirmada: se intenta terminar de publicarla ahora
+                    # para no seguir trabajando sobre archivos a medias
+                    self._recover_directory(directory)
+        except (IOError, OSError, ValueError, KeyError, TypeError) as e:
+            raise StorageError(str(e)) from e
+
+    @staticmethod
+    def _publish(temp_path: Path, file_path: Path, journal_path: Path) -> None:
+        """Reemplaza un archivo principal por su temporal y descarta su journal."""
+        if temp_path.exists():
+            os.replace(temp_path, file_path)
+        if journal_path.exists():
+            journal_path.unlink()
+
+    def _write_commit_marker(self, temp_paths: Mapping[str, Path]) -> Path:
+        """
+        Escribe la marca de confirmación de una escritura de varias entidades.
+
+        Guarda las rutas (no sólo las entidades) para que la recuperación no
+        dependa del backend con que se vuelva a abrir el directorio ni del
+        proceso que escribió los temporales.
+
+        Returns:
+            Ruta de la marca
+        """
+        files = [
+            {"entidad": filename, "temporal": str(temp_path),
+             "destino": str(self._path(filename)), "journal": str(self.journal_path(filename))}
+            for filename, temp_path in temp_paths.items()
+        ]
+        marker_path = self._path(next(iter(temp_paths))).parent / COMMIT_MARKER_NAME
+        temp_marker = marker_path.with_name(marker_path.name + ".tmp")
+        with open(temp_marker, 'w', encoding='utf-8') as file:
+            json.dump({"archivos": files}, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_marker, marker_path)
+        fsync_directory(marker_path.parent)
+        return marker_path
+
+    @staticmethod
+    def _remove_commit_marker(marker_path: Path) -> None:
+        """Elimina la marca una vez publicados (y llevados a disco) sus archivos."""
+        directory = marker_path.parent
+        fsync_directory(directory)
+        marker_path.unlink()
+        fsync_directory(directory)
+
+    def _recover_directory(self, directory: Path) -> List[str]:
+        """
+        Recupera un directorio de datos; debe llamarse con write_lock tomado.
+
+        Returns:
+            Entidades cuyos archivos se publicaron
+        """
+        recovered = []
+        marker_path = directory / COMMIT_MARKER_NAME
+        if marker_path.exists():
+            with open(marker_path, 'r', encoding='utf-8') as file:
+                files = json.load(file)["archivos"]
+            for item in files:
+                self._publish(Path(item["temporal"]), Path(item["destino"]), Path(item["journal"]))
+                self._journal_entries.pop(item["entidad"], None)
+                recovered.append(item["entidad"])
+            self._remove_commit_marker(marker_path)
+
+        # Con el bloqueo tomado ninguna escritura está en curso: los
+        # temporales que quedan son de escrituras que no se confirmaron
+        for filename in self.data_files:
+            file_path = self._path(filename)
+            if file_path.parent == directory:
+                for temp_path in directory.glob(file_path.name + "*.tmp"):
+                    temp_path.unlink()
+        temp_marker = directory / (COMMIT_MARKER_NAME + ".tmp")
+        if temp_marker.exists():
+            temp_marker.unlink()
+        return recovered
+
+    def recover(self) -> List[str]:
+        """
+        Termina de publicar la escritura confirmada que haya quedado a medias
+        y elimina los temporales de las que no llegaron a confirmarse.
+
+        Publicar es idempotente: los temporales que ya se renombraron se
+        omiten y los journals se descartan igual, porque son anteriores a la
+        escritura confirmada. Cada directorio se recupera con write_lock
+        tomado, por lo que espera a las escrituras de otros procesos.
+
+        Returns:
+            Entidades cuyos archivos se publicaron al recuperar
+
+        Raises:
+            StorageError: Si no se puede completar la publicación
+        """
+        recovered = []
+        directories = {self._path(filename).parent for filename in self.data_files}
+        try:
+            for directory in directories:
+                if not directory.is_dir():
+                    continue
+                with write_lock(directory):
+                    recovered.extend(self._recover_directory(directory))
+        except (IOError, OSError, ValueError, KeyError, TypeError) as e:
+            raise StorageError(f"No se pudo recuperar la última escritura: {e}") from e
+        return recovered
+
+    @contextmanager
+    def locked(self, filenames: Iterable[str]) -> Iterator[None]:
+        """Toma write_lock de los directorios de las entidades indicadas."""
+        directories = sorted({self._path(filename).parent for filename in filenames})
+        with ExitStack() as stack:
+            try:
+                for directory in directories:
+                    directory.mkdir(exist_ok=True)
+                    stack.enter_context(write_lock(directory))
+            except OSError as e:
+                raise StorageError(str(e)) from e
+            yield
+
+    def temp_path(self, filename: str) -> Path:
+        """
+        Obtiene la ruta del archivo temporal de una entidad, junto al
+        principal. Lleva el PID para que cada proceso escriba el suyo.
+        """
+        file_path = self._path(filename)
+        return file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+
+    def write_temp_file(self, filename: str, records: Iterable[Dict[str, Any]]) -> Path:
+        """
+        Escribe los registros de una entidad en un archivo temporal y lo
+        lleva a disco.
+
+        Returns:
+            Ruta del archivo temporal, junto al archivo principal
+        """
+        temp_path = self.temp_path(filename)
+        code_table = self.code_tables.get(filename)
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            if code_table is None:
+                json.dump(list(records), file, indent=2, ensure_ascii=False)
+            else:
+                # Un registro por línea: la indentación anidada anularía el ahorro
+                file.write('{"cabecera": ' + json.dumps(code_table.header(), ensure_ascii=False))
+                file.write(',\n"registros": [')
+                separator = "\n"
+                for record in records:
+                    file.write(separator + json.dumps(code_table.encode(record), ensure_ascii=False))
+                    separator = ",\n"
+                file.write("\n]}\n")
+            file.flush()
+            os.fsync(file.fileno())
+        return temp_path
+
+    def _append(self, filename: str, entry: Dict[str, Any], records: Iterable[Dict[str, Any]]) -> None:
+        """Agrega una mutación al journal, o reescribe la entidad si el journal está desactivado."""
+        if not self.journal:
+            self.save(filename, records)
+            return
+
+        # Con el directorio bloqueado, un save_many de otro proceso no puede
+        # publicar el archivo principal y descartar el journal en medio del
+        # agregado (la entrada quedaría en un journal ya eliminado)
+        journal_path = self.journal_path(filename)
+        with self.locked([filename]):
+            try:
+                with open(journal_path, 'a+b') as file:
+                    truncate_torn_line(file, journal_path)
+                    file.write((json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8'))
+                    file.flush()
+                    os.fsync(file.fileno())
+            except (IOError, OSError) as e:
+                raise StorageError(str(e)) from e
+
+            self._journal_entries[filename] = self._journal_entries.get(filename, 0) + 1
+            if self._journal_entries[filename] >= self.compaction_threshold:
+                self.save(filename, records)
+
+    def insert(self, filename: str, record: Dict[str, Any], records: Iterable[Dict[str, Any]]) -> None:
+        self._append(filename, {"op": "insert", "id": record.get("id"), "record": record}, records)
+
+    def update(self, filename: str, record_id: Any, record: Dict[str, Any],
+               records: Iterable[Dict[str, Any]]) -> None:
+        self._append(filename, {"op": "update", "id": record_id, "record": record}, records)
+
+    def delete(self, filename: str, record_id: Any, records: Iterable[Dict[str, Any]]) -> None:
+        self._append(filename, {"op": "delete", "id": record_id}, records)
+
+    def compact(self, filename: str, records: Iterable[Dict[str, Any]]) -> None:
+        with self.locked([filename]):
+            if self.pending_journal_entries(filename) or self.journal_path(filename).exists():
+                self.save(filename, records)
+
+
+def _pending_journal_state(entries: List[Dict[str, Any]]) -> Dict[Any, Optional[Dict[str, Any]]]:
+    """
+    Resume un journal en el estado final de cada ID afectado.
+
+    Returns:
+        Diccionario ID -> registro final, o None si el registro fue eliminado
+    """
+    pending = {}
+    for entry in entries:
+        op = entry.get("op")
+        if op in ("insert", "update"):
+            pending[entry.get("id")] = entry["record"]
+        elif op == "delete":
+            pending[entry.get("id")] = None
+    return pending
+
+
+class JsonLinesBackend(JsonFileBackend):
+    """
+    Backend sobre archivos JSON Lines (.jsonl), un registro por línea.
+
+    Comparte el journal de mutaciones con JsonFileBackend. Si una entidad
+    todavía sólo existe como .json se convierte automáticamente la primera
+    vez que se accede; el archivo original se conserva como .json.bak.
+
+    En formato compacto la primera línea es la cabecera con la tabla de
+    códigos.
+    """
+
+    name = "jsonl"
+    supports_streaming = True
+
+    def __init__(self, data_files: Dict[str, Path], journal: bool = True,
+                 compaction_threshold: int = 500,
+                 code_tables: Optional[Mapping[str, Mapping[str, Sequence[str]]]] = None):
+        super().__init__(data_files, journal, compaction_threshold, code_tables)
+        self._converted = set()
+
+    def _path(self, filename: str) -> Path:
+        return super()._path(filename).with_suffix(".jsonl")
+
+    def _ensure_converted(self, filename: str) -> None:
+        """Convierte el archivo .json de una entidad a .jsonl si hace falta."""
+        if filename in self._converted:
+            return
+
+        jsonl_path = self._path(filename)
+        json_path = self.data_files[filename]
+        if not jsonl_path.exists() and json_path.exists():
+            records = JsonFileBackend(self.data_files).load(filename)
+            self.save(filename, records)
+            try:
+                os.replace(json_path, json_path.with_suffix(".json.bak"))
+            except OSError as e:
+                raise StorageError(str(e)) from e
+        self._converted.add(filename)
+
+    def signature(self, filename: str) -> Any:
+        self._ensure_converted(filename)
+        return super().signature(filename)
+
+    def read_file(self, filename: str) -> List[Dict[str, Any]]:
+        return list(self._iter_file(filename))
+
+    def _iter_file(self, filename: str) -> Iterator[Dict[str, Any]]:
+        """Recorre las líneas del archivo principal (sin journal)."""
+        self._ensure_converted(filename)
+        decode = None
+        try:
+            with open(self._path(filename), 'r', encoding='utf-8') as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if decode is not None:
+                        yield decode(record)
+                    elif is_code_table_header(record):
+                        decode = CodeTable.from_header(record).decode
+                    else:
+                        yield record
+        except FileNotFoundError:
+            return
+
+    def write_temp_file(self, filename: str, records: Iterable[Dict[str, Any]]) -> Path:
+        temp_path = self.temp_path(filename)
+        code_table = self.code_tables.get(filename)
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            if code_table is not None:
+                file.write(json.dumps(code_table.header(), ensure_ascii=False) + "\n")
+                records = map(code_table.encode, records)
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        return temp_path
+
+    def iter_records(self, filename: str) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los registros de una entidad línea por línea.
+
+        El journal pendiente (normalmente pequeño) se resume en memoria y se
+        aplica a medida que se leen los registros del archivo principal.
+        """
+        self._ensure_converted(filename)
+        journal_path = self.journal_path(filename)
+        pending = _pending_journal_state(read_journal(journal_path)) if journal_path.exists() else {}
+
+        seen = set()
+        for record in self._iter_file(filename):
+            record_id = record.get("id")
+            if record_id in pending:
+                seen.add(record_id)
+                record = pending[record_id]
+                if record is None:
+                    continue
+            yield record
+
+        for record_id, record in pending.items():
+            if record_id not in seen and record is not None:
+                yield record
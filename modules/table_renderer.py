@@ -0,0 +1,162 @@
+"""
+Módulo para mostrar listados en forma de tabla.
+Contiene un renderizador por columnas para usuarios y herramientas que arma
+cada página completa en memoria y la escribe en la terminal de una sola vez.
+"""
+import sys
+from itertools import islice
+from typing import Any, Callable, Iterable, List, Mapping, Optional, TextIO, Tuple, Union
+
+# Una columna es (encabezado, campo) o (encabezado, función registro -> valor)
+Column = Tuple[str, Union[str, Callable[[Mapping[str, Any]], Any]]]
+
+USER_COLUMNS: List[Column] = [
+    ("ID", "id"),
+    ("Apellido", "apellido"),
+    ("Nombre", "nombre"),
+    ("Documento", "documento"),
+    ("Tipo", "tipo_usuario"),
+    ("Curso/Rol", lambda user: user.get("curso") or user.get("rol")),
+    ("Email", "email")
+]
+
+TOOL_COLUMNS: List[Column] = [
+    ("ID", "id"),
+    ("Nombre", "nombre"),
+    ("Tipo", "tipo"),
+    ("Marca", "marca"),
+    ("Estado", "estado"),
+    ("Ubicación", "ubicacion")
+]
+
+MAINTENANCE_COLUMNS: List[Column] = [
+    ("ID", "id"),
+    ("Herramienta", "herramienta_id"),
+    ("Tipo", "tipo"),
+    ("Estado", "estado"),
+    ("Fecha", "fecha_programada"),
+    ("Frecuencia (días)", "frecuencia_dias"),
+    ("Descripción", "descripcion")
+]
+
+# Cantidad de registros que se miran para calcular el ancho de las columnas
+SAMPLE_SIZE = 100
+# Ancho máximo de una columna; los valores más largos se recortan
+MAX_COLUMN_WIDTH = 30
+COLUMN_SEPARATOR = " | "
+
+
+def _cell(value: Any) -> str:
+    """Convierte un valor en el texto de una celda."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+
+class TableRenderer:
+    """
+    Renderizador de tablas de ancho fijo.
+
+    Los anchos se calculan una vez, a partir de una muestra acotada de
+    registros, y se compila el formato de fila; después cada fila se arma
+    con una sola llamada a str.format.
+    """
+
+    def __init__(self, columns: List[Column], sample: Iterable[Mapping[str, Any]] = (),
+                 max_width: int = MAX_COLUMN_WIDTH):
+        self._getters = [
+            field if callable(field) else (lambda record, field=field: record.get(field))
+            for _, field in columns
+        ]
+        headers = [header for header, _ in columns]
+        widths = [len(header) for header in headers]
+        for record in islice(sample, SAMPLE_SIZE):
+            for i, value in enumerate(self._cells(record)):
+                widths[i] = max(widths[i], len(value))
+        widths = [min(width, max_width) for width in widths]
+
+        # La última columna no se rellena, para no dejar espacios al final de la línea
+        cells = [f"{{:<{width}.{width}}}" for width in widths[:-1]] + [f"{{:.{widths[-1]}}}"]
+        self._row_format = COLUMN_SEPARATOR.join(cells)
+        self._header = self._row_format.format(*headers) + "\n" + "-+-".join("-" * width for width in widths)
+
+    def _cells(self, record: Mapping[str, Any]) -> List[str]:
+        return [_cell(getter(record)) for getter in self._getters]
+
+    def render(self, records: Iterable[Mapping[str, Any]], header: bool = True) -> str:
+        """
+        Arma el texto de la tabla.
+
+        Args:
+            records: Registros a mostrar
+            header: Si se incluye la fila de encabezados
+
+        Returns:
+            Texto de la tabla, terminado en salto de línea
+        """
+        row_format = self._row_format.format
+        lines = [self._header] if header else []
+        lines.extend(row_format(*self._cells(record)) for record in records)
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write(self, records: Iterable[Mapping[str, Any]], header: bool = True,
+              stream: Optional[TextIO] = None) -> None:
+        """
+        Escribe la tabla en la salida con una única escritura.
+
+        Args:
+            records: Registros a mostrar
+            header: Si se incluye la fila de encabezados
+            stream: Salida (por defecto, sys.stdout)
+        """
+        stream = stream or sys.stdout
+        stream.write(self.render(records, header))
+        stream.flush()
+
+
+def write_table(records: List[Mapping[str, Any]], columns: List[Column],
+                stream: Optional[TextIO] = None) -> None:
+    """
+    Escribe una página de registros como tabla, con anchos calculados sobre ella.
+
+    Args:
+        records: Registros de la página
+        columns: Columnas a mostrar (por ejemplo USER_COLUMNS)
+        stream: Salida (por defecto, sys.stdout)
+    """
+    TableRenderer(columns, records).write(records, stream=stream)
+
+
+def write_table_stream(records: Iterable[Mapping[str, Any]], columns: List[Column],
+                       chunk_size: int = SAMPLE_SIZE, stream: Optional[TextIO] = None) -> int:
+    """
+    Escribe como tabla una secuencia de registros de largo desconocido.
+
+    Los anchos se calculan con el primer bloque y se reutilizan para el
+    resto; cada bloque se escribe de una vez.
+
+    Args:
+        records: Registros a mostrar (se recorren una sola vez)
+        columns: Columnas a mostrar
+        chunk_size: Registros por escritura
+        stream: Salida (por defecto, sys.stdout)
+
+    Returns:
+        Cantidad de registros escritos
+    """
+    records = iter(records)
+    chunk = list(islice(records, chunk_size))
+    if not chunk:
+        return 0
+
+    renderer = TableRenderer(columns, chunk)
+    renderer.write(chunk, stream=stream)
+    count = len(chunk)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return count
+        renderer.write(chunk, header=False, stream=stream)
+        count += len(chunk)
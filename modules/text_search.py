@@ -0,0 +1,61 @@
+"""
+Módulo de utilidades para búsqueda de texto.
+Contiene la normalización de texto y la generación de n-gramas usadas por
+los índices de búsqueda por subcadena.
+"""
+import unicodedata
+from typing import Any, Iterable, Set
+
+# Largo de los n-gramas indexados (trigramas)
+NGRAM_SIZE = 3
+
+
+def normalize_text(value: Any) -> str:
+    """
+    Normaliza un texto para compararlo sin distinguir mayúsculas ni acentos.
+
+    Args:
+        value: Valor a normalizar (None se trata como texto vacío)
+
+    Returns:
+        Texto en minúsculas y sin tildes ni diéresis ("González" -> "gonzalez")
+    """
+    if value is None:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value).casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> Set[str]:
+    """
+    Obtiene los n-gramas de un texto ya normalizado.
+
+    Args:
+        text: Texto normalizado
+        size: Largo de cada n-grama
+
+    Returns:
+        Conjunto de n-gramas (vacío si el texto es más corto que size)
+    """
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def record_ngrams(record: Any, fields: Iterable[str], size: int = NGRAM_SIZE) -> Set[str]:
+    """
+    Obtiene los n-gramas de varios campos de un registro.
+
+    Los campos se procesan por separado, de modo que no se generan n-gramas
+    que crucen de un campo a otro.
+
+    Args:
+        record: Registro a indexar
+        fields: Campos de texto a incluir
+        size: Largo de cada n-grama
+
+    Returns:
+        Conjunto de n-gramas de todos los campos
+    """
+    grams = set()
+    for field in fields:
+        grams |= ngrams(normalize_text(record.get(field)), size)
+    return grams
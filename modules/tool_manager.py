@@ -3,13 +3,22 @@ Módulo para la gestión de herramientas y máquinas
 Maneja las operaciones CRUD y lógica de negocio relacionada con herramientas
 """
 
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
 import json
 import os
 
-from modules.data_manager import load_json_data, save_json_data
-from modules.id_generator import get_next_id
+from modules.data_manager import (
+    load_json_data, iter_records, query_records, get_record, copy_record, get_backend,
+    insert_record, update_record, delete_record, page_records,
+    register_index, find_records, find_records_by_conditions, get_index_keys,
+    register_counter, get_counts, verify_counters, transaction,
+    register_inverted_index, find_records_by_any_key, count_records_by_keys, get_index_sample
+)
+from modules.enums import ToolState, ToolType
+from modules.text_search import normalize_text
+from modules.id_generator import allocate_id
+from modules.storage import StorageError
 from modules.validators import validate_required_fields, validate_tool_data, validate_tool_state
 
 # Constantes para estados válidos
@@ -20,6 +29,132 @@ VALID_TYPES = ["Herramienta Manual", "Máquina Eléctrica",
 
 TOOL_DATA_FILE = "herramientas"
 
+# Filtros que entiende search_tools
+SEARCH_FILTERS = ("nombre", "tipo", "estado", "marca", "ubicacion")
+
+
+def _normalize_brand(brand: Any) -> str:
+    """Normaliza una marca para el índice (en minúsculas, para búsqueda parcial)."""
+    return "" if brand is None else str(brand).lower()
+
+
+# Índices de los filtros de search_tools; se mantienen en cada alta, cambio y baja
+register_index(TOOL_DATA_FILE, "estado")
+register_index(TOOL_DATA_FILE, "tipo")
+register_index(TOOL_DATA_FILE, "marca", _normalize_brand)
+
+
+# Separador entre los niveles de "ubicacion" (taller - mueble - lugar)
+LOCATION_SEPARATOR = " - "
+
+# Forma de indicar una ubicación: texto completo o lista de niveles
+Location = Union[str, Sequence[str]]
+
+
+def parse_location(location: Optional[Location]) -> Tuple[str, ...]:
+    """
+    Separa una ubicación en sus niveles (taller, mueble, lugar...).
+
+    Args:
+        location: Ubicación como texto ("Taller de Carpintería - Estante A")
+                  o como lista de niveles
+
+    Returns:
+        Tupla con los niveles, sin espacios sobrantes ni niveles vacíos
+    """
+    if not location:
+        return ()
+    segments = location.split(LOCATION_SEPARATOR) if isinstance(location, str) else location
+    return tuple(segment.strip() for segment in segments if segment and segment.strip())
+
+
+def _location_path(location: Optional[Location]) -> Tuple[str, ...]:
+    """Niveles normalizados (sin mayúsculas ni acentos) de una ubicación."""
+    return tuple(normalize_text(segment) for segment in parse_location(location))
+
+
+def _location_prefixes(tool: Dict[str, Any]) -> List[Tuple[str, ...]]:
+    """Claves del árbol de ubicaciones: cada prefijo de la ruta de la herramienta."""
+    path = _location_path(tool.get('ubicacion'))
+    return [path[:depth] for depth in range(1, len(path) + 1)]
+
+
+def _normalize_location(location: Any) -> str:
+    """Normaliza una ubicación para el índice (en minúsculas, para búsqueda parcial)."""
+    return "" if location is None else str(location).lower()
+
+
+# Árbol de ubicaciones: cada nodo (prefijo de la ruta) agrupa a todas las
+# herramientas de su subárbol, por lo que consultar o contar un nodo es O(1)
+register_inverted_index(TOOL_DATA_FILE, "ubicacion_arbol", _location_prefixes)
+register_index(TOOL_DATA_FILE, "ubicacion", _normalize_location)
+
+
+def normalize_serial(serial: Any) -> str:
+    """
+    Normaliza un número de serie para compararlo.
+
+    Ignora mayúsculas, espacios, guiones y demás separadores, de modo que
+    "flk117-2024 005" y "FLK1172024005" se consideran el mismo número.
+
+    Args:
+        serial: Número de serie tal como se ingresó o se leyó del código de barras
+
+    Returns:
+        Número de serie normalizado (vacío si no tiene)
+    """
+    return "" if serial is None else "".join(char for char in str(serial).upper() if char.isalnum())
+
+
+def _serial_keys(tool: Dict[str, Any]) -> Tuple[str, ...]:
+    """Clave del índice de números de serie (las herramientas sin número no se indexan)."""
+    serial = normalize_serial(tool.get('numero_serie'))
+    return (serial,) if serial else ()
+
+
+def _brand_model_keys(tool: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """Clave del índice marca + modelo."""
+    return ((normalize_text(tool.get('marca')), normalize_text(tool.get('modelo'))),)
+
+
+# Número de serie -> herramienta, para rechazar duplicados y buscar por
+# código de barras en O(1); y marca + modelo -> herramientas
+register_inverted_index(TOOL_DATA_FILE, "numero_serie", _serial_keys)
+register_inverted_index(TOOL_DATA_FILE, "marca_modelo", _brand_model_keys)
+
+
+def _find_serial_owner(serial: Any, exclude_id: Optional[int] = None) -> Optional[int]:
+    """Obtiene el ID de otra herramienta con el mismo número de serie, si existe."""
+    normalized = normalize_serial(serial)
+    if not normalized:
+        return None
+    for tool in find_records_by_any_key(TOOL_DATA_FILE, "numero_serie", [normalized]):
+        if tool['id'] != exclude_id:
+            return tool['id']
+    return None
+
+
+def get_workshop(tool: Dict[str, Any]) -> Optional[str]:
+    """
+    Obtiene el taller de una herramienta (el primer nivel de su ubicación).
+
+    Args:
+        tool: Diccionario con datos de la herramienta
+
+    Returns:
+        Nombre del taller o None si la herramienta no tiene ubicación
+    """
+    path = parse_location(tool.get('ubicacion'))
+    return path[0] if path else None
+
+
+# Contadores de inventario; se actualizan en cada alta, cambio y baja y se
+# guardan junto a herramientas.json
+register_counter(TOOL_DATA_FILE, "estado", lambda tool: tool.get('estado'))
+register_counter(TOOL_DATA_FILE, "tipo", lambda tool: tool.get('tipo'))
+register_counter(TOOL_DATA_FILE, "taller", get_workshop)
+register_counter(TOOL_DATA_FILE, "taller_estado", lambda tool: (get_workshop(tool), tool.get('estado')))
+
 def get_all_tools() -> List[Dict[str, Any]]:
     """
     Carga las herramientas
@@ -46,28 +181,30 @@ def create_tool(data: Dict) -> Tuple[bool, str, Optional[int]]:
         error_msg = "Errores de validación: " + "; ".join(errors)
         return False, error_msg, None
 
-    # Cargar herramientas existentes
-    tools = get_all_tools()
-    tool_id = get_next_id(tools)
+    # Verificar que el número de serie no esté duplicado
+    owner_id = _find_serial_owner(data.get('numero_serie'))
+    if owner_id is not None:
+        return False, f"Ya existe una herramienta con número de serie {data['numero_serie']} (ID {owner_id})", None
+
+    # Asignar ID
+    tool_id = allocate_id(TOOL_DATA_FILE)
     # Crear nueva herramienta
     new_tool = {
         'id': tool_id,
-        'name': data['name'].strip(),
-        'type': data['type'],
-        'brand': data.get('brand', '').strip(),
-        'model': data.get('model', '').strip(),
-        'serial_number': data.get('serial_number', '').strip(),
-        'state': data['state'],
-        'location': data['location'].strip(),
-        'acquisition_date': data.get('acquisition_date', ''),
-        'notes': data.get('notes', '').strip(),
+        'nombre': data['nombre'].strip(),
+        'tipo': data['tipo'],
+        'marca': data.get('marca', '').strip(),
+        'modelo': data.get('modelo', '').strip(),
+        'numero_serie': data.get('numero_serie', '').strip(),
+        'estado': data['estado'],
+        'ubicacion': data['ubicacion'].strip(),
+        'fecha_adquisicion': data.get('fecha_adquisicion', ''),
+        'observaciones': data.get('observaciones', '').strip(),
         'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
 
     # Agregar y guardar
-    tools.append(new_tool)
-
-    if save_json_data(TOOL_DATA_FILE, tools):
+    if insert_record(TOOL_DATA_FILE, new_tool):
         return True, f"Herramienta creada exitosamente con ID {tool_id}", tool_id
     else:
         return False, "Error al guardar herramienta", None
@@ -83,11 +220,57 @@ def get_tool_by_id(tool_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Diccionario con datos de la herramienta o None si no se encuentra
     """
-    tools = get_all_tools()
-    for tool in tools:
-        if tool.get("id") == tool_id:
-            return tool
-    return None
+    tool = get_record(TOOL_DATA_FILE, tool_id)
+    return copy_record(tool) if tool is not None else None
+
+
+def get_tool_by_serial(serial: str) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene una herramienta por su número de serie (por ejemplo, leído con un lector de códigos)
+
+    Args:
+        serial: Número de serie a buscar (se ignoran mayúsculas y separadores)
+
+    Returns:
+        Diccionario con datos de la herramienta o None si no se encuentra
+    """
+    normalized = normalize_serial(serial)
+    if not normalized:
+        return None
+    tool = get_index_sample(TOOL_DATA_FILE, "numero_serie", normalized)
+    return copy_record(tool) if tool is not None else None
+
+
+def get_tools_by_brand_model(brand: str, model: str) -> List[Dict[str, Any]]:
+    """
+    Obtiene las herramientas de una marca y modelo (sin distinguir mayúsculas ni acentos)
+
+    Args:
+        brand: Marca
+        model: Modelo
+
+    Returns:
+        Lista de herramientas de esa marca y modelo
+    """
+    key = (normalize_text(brand), normalize_text(model))
+    return [copy_record(tool) for tool in find_records_by_any_key(TOOL_DATA_FILE, "marca_modelo", [key])]
+
+
+def find_duplicate_serials() -> Dict[str, List[int]]:
+    """
+    Detecta herramientas ya guardadas que comparten número de serie
+
+    Recorre sólo las claves del índice, sin comparar herramientas entre sí
+
+    Returns:
+        Diccionario número de serie normalizado -> IDs de las herramientas que lo comparten
+    """
+    duplicates = {}
+    for serial in get_index_keys(TOOL_DATA_FILE, "numero_serie"):
+        if count_records_by_keys(TOOL_DATA_FILE, "numero_serie", [serial]) > 1:
+            tools = find_records_by_any_key(TOOL_DATA_FILE, "numero_serie", [serial])
+            duplicates[serial] = [tool['id'] for tool in tools]
+    return duplicates
 
 
 def update_tool(tool_id: int, data: Dict[str, Any]) -> Tuple[bool, str]:
@@ -101,18 +284,12 @@ def update_tool(tool_id: int, data: Dict[str, Any]) -> Tuple[bool, str]:
     Returns:
          Tupla (éxito, mensaje)
     """
-    tools = get_all_tools()
     # Buscar herramienta
-    tool_index = None
-    for i, tool in enumerate(tools):
-        if tool.get("id") == tool_index:
-            tool_index = i
-            break
-
-    if tool_index is None:
+    tool = get_record(TOOL_DATA_FILE, tool_id)
+    if tool is None:
         return False, f'Herramienta con ID {tool_id} no encontrada'
     # Crear datos actualizados manteniendo el ID original
-    current_tool = tools[tool_index].copy()
+    current_tool = copy_record(tool)
     current_tool.update(data)
     current_tool["id"] = tool_id  # Asegurar que el ID no cambie
     # Validar datos
@@ -121,11 +298,13 @@ def update_tool(tool_id: int, data: Dict[str, Any]) -> Tuple[bool, str]:
         error_msg = "Errores de validación: " + "; ".join(errors)
         return False, error_msg
 
-    # Actualizar usuario
-    tools[tool_index] = current_tool
+    # Verificar número de serie duplicado (excluyendo la herramienta actual)
+    owner_id = _find_serial_owner(current_tool.get('numero_serie'), exclude_id=tool_id)
+    if owner_id is not None:
+        return False, f"Ya existe otra herramienta con número de serie {current_tool['numero_serie']} (ID {owner_id})"
 
-    # Guardar cambios
-    if save_json_data(TOOL_DATA_FILE, tools):
+    # Actualizar y guardar herramienta
+    if update_record(TOOL_DATA_FILE, tool_id, current_tool):
         return True, f"Herramienta {tool_id} actualizada exitosamente"
     else:
         return False, "Error al guardar los cambios"
@@ -141,16 +320,12 @@ def delete_tool(tool_id: int) -> Tuple[bool, str]:
     Returns:
          Tupla (éxito, mensaje)
     """
-    tools = get_all_tools()
-
-    # Buscar y eliminar herramienta
-    original_count = len(tools)
-    tools = [tool for tool in tools if tool.get("id") != tool_id]
-
-    if len(tools) == original_count:
+    # Buscar herramienta
+    if get_record(TOOL_DATA_FILE, tool_id) is None:
         return False, f"Herramienta con ID {tool_id} no encontrado"
 
-    if save_json_data(TOOL_DATA_FILE, tools):
+    # Eliminar y guardar cambios
+    if delete_record(TOOL_DATA_FILE, tool_id):
         return True, f"Herramienta {tool_id} eliminado exitosamente"
     else:
         return False, "Error al guardar los cambios"
@@ -171,81 +346,206 @@ def update_tool_state(tool_id: int, new_state: str) -> Tuple[bool, str]:
     if not is_valid:
         return is_valid, message
 
-    tools = get_all_tools()
-
     # Buscar herramienta
-    for i, tool in enumerate(tools):
-        if tool['id'] == tool_id:
-            tools[i]['estado'] = new_state
+    tool = get_record(TOOL_DATA_FILE, tool_id)
+    if tool is None:
+        return False, f"Herramienta con ID {tool_id} no encontrada"
 
-            if save_json_data(TOOL_DATA_FILE, tools):
-                return True, f'Estado actualizado a: {new_state}'
-            return False, 'Error al guardar los cambios'
-    return False, f"Herramienta con ID {tool_id} no encontrada"
+    updated_tool = copy_record(tool)
+    updated_tool['estado'] = new_state
 
+    if update_record(TOOL_DATA_FILE, tool_id, updated_tool):
+        return True, f'Estado actualizado a: {new_state}'
+    return False, 'Error al guardar los cambios'
 
-def search_tools(filters: Dict) -> List[Dict[str, Any]]:
+
+def update_tool_states(ids_or_filter: Union[Iterable[int], Dict[str, Any]],
+                       new_state: str) -> Tuple[bool, str, Dict[str, List[Any]]]:
     """
-    Busca herramientas según filtros especificados
+    Cambia el estado de varias herramientas con una sola escritura
 
     Args:
-        filters: Diccionario con filtros de búsqueda
+        ids_or_filter: Lista de IDs, o diccionario de filtros con la misma
+                       semántica que search_tools
+        new_state: Nuevo estado de las herramientas
 
     Returns:
-        Lista de herramientas que coinciden con los filtros
+         Tupla (éxito, mensaje, reporte). El reporte tiene las listas de IDs
+         "actualizadas", "sin_cambios" (ya estaban en ese estado),
+         "no_encontradas" y "rechazadas" (IDs que no son números enteros)
     """
-    tools = get_all_tools()
+    report = {"actualizadas": [], "sin_cambios": [], "no_encontradas": [], "rechazadas": []}
 
-    if not filters:
-        return tools
+    is_valid, message = validate_tool_state(new_state)
+    if not is_valid:
+        return False, message, report
+    if isinstance(ids_or_filter, dict):
+        unknown = [key for key in ids_or_filter if key not in SEARCH_FILTERS]
+        if unknown:
+            return False, f'Filtros no válidos: {", ".join(map(str, unknown))}. Use: {", ".join(SEARCH_FILTERS)}', report
+        if not any(ids_or_filter.values()):
+            return False, 'Debe indicar al menos un filtro', report
+
+    try:
+        with transaction(TOOL_DATA_FILE):
+            if isinstance(ids_or_filter, dict):
+                tools = list(iter_search_tools(ids_or_filter))
+            else:
+                tools = []
+                for tool_id in ids_or_filter:
+                    if not isinstance(tool_id, int) or isinstance(tool_id, bool):
+                        report["rechazadas"].append(tool_id)
+                        continue
+                    tool = get_record(TOOL_DATA_FILE, tool_id)
+                    if tool is None:
+                        report["no_encontradas"].append(tool_id)
+                    else:
+                        tools.append(tool)
+
+            for tool in tools:
+                if tool.get('estado') == new_state:
+                    report["sin_cambios"].append(tool['id'])
+                    continue
+                updated_tool = copy_record(tool)
+                updated_tool['estado'] = new_state
+                update_record(TOOL_DATA_FILE, tool['id'], updated_tool)
+                report["actualizadas"].append(tool['id'])
+    except StorageError as e:
+        report["actualizadas"] = []
+        return False, f'Error al guardar los cambios: {e}', report
+
+    return True, f'{len(report["actualizadas"])} herramientas actualizadas a: {new_state}', report
+
+
+def list_tools(cursor: Optional[str] = None, limit: int = 20,
+               sort_key: str = "id") -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Obtiene una página de herramientas ordenadas
+
+    Args:
+        cursor: Cursor devuelto por la página anterior (None para la primera)
+        limit: Cantidad máxima de herramientas por página
+        sort_key: Campo por el que se ordena (por ejemplo "id" o "nombre")
 
-    filtered_tools = []
+    Returns:
+        Tupla (herramientas de la página, cursor de la página siguiente o None)
+
+    Raises:
+        ValueError: Si limit no es positivo o el cursor no es válido
+    """
+    tools, next_cursor = page_records(TOOL_DATA_FILE, cursor, limit, sort_key)
+    return [copy_record(tool) for tool in tools], next_cursor
 
-    for tool in tools:
-        match = True
 
+def iter_tools() -> Iterator[Dict[str, Any]]:
+    """
+    Recorre todas las herramientas de forma perezosa
+
+    Yields:
+        Copia de cada herramienta, a medida que se lee
+    """
+    for tool in iter_records(TOOL_DATA_FILE):
+        yield copy_record(tool)
+
+
+def iter_search_tools(filters: Dict) -> Iterator[Dict[str, Any]]:
+    """
+    Busca herramientas según filtros especificados, entregando los resultados a medida que aparecen
+
+    Si el backend resuelve consultas (SQLite), los filtros por estado y
+    tipo se le delegan y el resto se verifica sobre su resultado. Si no,
+    los filtros por estado, tipo, marca y ubicación se resuelven
+    intersectando sus índices en memoria (marca y ubicación son búsquedas
+    parciales sobre los valores distintos indexados); el de nombre se
+    verifica sólo sobre las herramientas que quedan.
+
+    Args:
+        filters: Diccionario con filtros de búsqueda
+
+    Yields:
+        Herramientas que coinciden con los filtros
+    """
+    if not filters:
+        yield from iter_tools()
+        return
+
+    exact_filters = {field: filters[field] for field in ('estado', 'tipo') if filters.get(field)}
+    if exact_filters and get_backend().supports_query:
+        yield from _filter_tools(query_records(TOOL_DATA_FILE, exact_filters), filters)
+        return
+
+    conditions = []
+    if filters.get('estado'):
+        conditions.append(('estado', [filters['estado']]))
+    if filters.get('tipo'):
+        conditions.append(('tipo', [filters['tipo']]))
+    if filters.get('marca'):
+        # Búsqueda parcial: todas las marcas indexadas que contienen el texto
+        brand = filters['marca'].lower()
+        conditions.append(('marca', [key for key in get_index_keys(TOOL_DATA_FILE, 'marca') if brand in key]))
+    if filters.get('ubicacion'):
+        # Búsqueda parcial: todas las ubicaciones indexadas que contienen el texto
+        location = filters['ubicacion'].lower()
+        conditions.append(('ubicacion', [key for key in get_index_keys(TOOL_DATA_FILE, 'ubicacion') if location in key]))
+
+    if conditions:
+        tools = find_records_by_conditions(TOOL_DATA_FILE, conditions)
+    else:
+        tools = iter_records(TOOL_DATA_FILE)
+
+    for tool in tools:
         # Filtro por nombre (búsqueda parcial, insensible a mayúsculas)
         if filters.get('nombre'):
             if filters['nombre'].lower() not in tool['nombre'].lower():
-                match = False
+                continue
 
-        # Filtro por tipo
-        if filters.get('tipo'):
-            if tool['tipo'] != filters['tipo']:
-                match = False
+        yield copy_record(tool)
 
-        # Filtro por estado
-        if filters.get('estado'):
-            if tool['estado'] != filters['estado']:
-                match = False
 
-        # Filtro por ubicación (búsqueda parcial, insensible a mayúsculas)
-        if filters.get('ubicacion'):
-            if filters['ubicacion'].lower() not in tool['ubicacion'].lower():
-                match = False
+def _filter_tools(tools: Iterable[Dict[str, Any]], filters: Dict) -> Iterator[Dict[str, Any]]:
+    """Aplica los filtros parciales (nombre, marca, ubicación) a herramientas ya filtradas por igualdad"""
+    name = (filters.get('nombre') or '').lower()
+    brand = (filters.get('marca') or '').lower()
+    location = (filters.get('ubicacion') or '').lower()
+    for tool in tools:
+        if name and name not in tool['nombre'].lower():
+            continue
+        if brand and brand not in _normalize_brand(tool.get('marca')):
+            continue
+        if location and location not in _normalize_location(tool.get('ubicacion')):
+            continue
+        yield copy_record(tool)
 
-        # Filtro por marca (búsqueda parcial, insensible a mayúsculas)
-        if filters.get('marca'):
-            if filters['marca'].lower() not in tool.get('marca', '').lower():
-                match = False
 
-        if match:
-            filtered_tools.append(tool)
+def search_tools(filters: Dict) -> List[Dict[str, Any]]:
+    """
+    Busca herramientas según filtros especificados
+
+    Args:
+        filters: Diccionario con filtros de búsqueda
 
-    return filtered_tools
+    Returns:
+        Lista de herramientas que coinciden con los filtros
+    """
+    return list(iter_search_tools(filters))
 
 
 def get_tools_by_state(state: str) -> List[Dict]:
     """
     Obtiene todas las herramientas con un estado específico
 
+    Si el backend resuelve consultas (SQLite) se le delega; si no, se usa
+    el índice de estado en memoria
+
     Args:
         state: Estado a filtrar
 
     Returns:
         Lista de herramientas con el estado especificado
     """
-    return search_tools({'estado': state})
+    if get_backend().supports_query:
+        return [copy_record(tool) for tool in query_records(TOOL_DATA_FILE, {'estado': state})]
+    return [copy_record(tool) for tool in find_records(TOOL_DATA_FILE, 'estado', state)]
 
 
 def get_available_tools() -> List[Dict]:
@@ -256,3 +556,154 @@ def get_available_tools() -> List[Dict]:
         Lista de herramientas disponibles
     """
     return get_tools_by_state('Disponible')
+
+
+def get_inventory_counts() -> Dict[str, Dict[str, int]]:
+    """
+    Obtiene la cantidad de herramientas por estado, por tipo y por taller
+
+    Usa los contadores mantenidos, sin recorrer las herramientas
+
+    Returns:
+        Diccionario {"estado": {...}, "tipo": {...}, "taller": {...}}; los
+        estados y tipos válidos aparecen siempre, aunque estén en cero
+    """
+    states = get_counts(TOOL_DATA_FILE, "estado")
+    types = get_counts(TOOL_DATA_FILE, "tipo")
+    return {
+        "estado": {**{state: 0 for state in ToolState.get_all_values()}, **states},
+        "tipo": {**{tool_type: 0 for tool_type in ToolType.get_all_values()}, **types},
+        "taller": get_counts(TOOL_DATA_FILE, "taller")
+    }
+
+
+def get_state_counts_by_workshop() -> Dict[str, Dict[str, int]]:
+    """
+    Obtiene la cantidad de herramientas en cada estado, por taller
+
+    Returns:
+        Diccionario taller -> {estado: cantidad}
+    """
+    counts = {}
+    for (workshop, state), count in get_counts(TOOL_DATA_FILE, "taller_estado").items():
+        if workshop is None:
+            continue
+        workshop_counts = counts.setdefault(workshop, {state: 0 for state in ToolState.get_all_values()})
+        workshop_counts[state] = count
+    return counts
+
+
+def verify_inventory_counts() -> Tuple[bool, str]:
+    """
+    Verifica los contadores de inventario contra un recuento completo
+
+    Si no coinciden, se corrigen con el recuento
+
+    Returns:
+         Tupla (coinciden, mensaje)
+    """
+    is_valid, differences = verify_counters(TOOL_DATA_FILE)
+    if is_valid:
+        return True, 'Los contadores de inventario coinciden con los datos'
+    details = "; ".join(
+        f"{name} {key}: {maintained} -> {actual}"
+        for name, diff in differences.items()
+        for key, (maintained, actual) in diff.items()
+    )
+    return False, f'Contadores corregidos: {details}'
+
+
+def get_tools_in_location(location: Location) -> List[Dict[str, Any]]:
+    """
+    Obtiene las herramientas de una ubicación y de todo lo que contiene
+
+    Por ejemplo, "Taller de Carpintería" incluye las herramientas de todos
+    sus estantes. Los niveles se comparan sin distinguir mayúsculas ni acentos
+
+    Args:
+        location: Ubicación como texto o lista de niveles
+
+    Returns:
+        Lista de herramientas del subárbol
+    """
+    path = _location_path(location)
+    if not path:
+        return []
+    return [copy_record(tool) for tool in find_records_by_any_key(TOOL_DATA_FILE, "ubicacion_arbol", [path])]
+
+
+def count_tools_in_location(location: Location) -> int:
+    """
+    Cuenta las herramientas de una ubicación y de todo lo que contiene
+
+    Args:
+        location: Ubicación como texto o lista de niveles
+
+    Returns:
+        Cantidad de herramientas del subárbol
+    """
+    path = _location_path(location)
+    if not path:
+        return 0
+    return count_records_by_keys(TOOL_DATA_FILE, "ubicacion_arbol", [path])
+
+
+def get_location_children(location: Optional[Location] = None) -> Dict[str, int]:
+    """
+    Obtiene los niveles que cuelgan de una ubicación, con su cantidad de herramientas
+
+    Args:
+        location: Ubicación como texto o lista de niveles (None para los talleres)
+
+    Returns:
+        Diccionario nombre del nivel -> cantidad de herramientas en su subárbol
+    """
+    path = _location_path(location)
+    depth = len(path)
+    children = {}
+    for key in get_index_keys(TOOL_DATA_FILE, "ubicacion_arbol"):
+        if len(key) != depth + 1 or key[:depth] != path:
+            continue
+        sample = get_index_sample(TOOL_DATA_FILE, "ubicacion_arbol", key)
+        name = parse_location(sample.get('ubicacion'))[depth]
+        children[name] = count_records_by_keys(TOOL_DATA_FILE, "ubicacion_arbol", [key])
+    return dict(sorted(children.items(), key=lambda item: normalize_text(item[0])))
+
+
+def relocate_tools(old_location: Location, new_location: Location) -> Tuple[bool, str, int]:
+    """
+    Mueve todas las herramientas de una ubicación (y lo que contiene) a otra
+
+    Se reemplazan los niveles iniciales de cada ubicación y se conservan
+    los más específicos: mover "Taller A - Estante 1" a "Taller B - Estante 4"
+    convierte "Taller A - Estante 1 - Caja 2" en "Taller B - Estante 4 - Caja 2".
+    Todas las herramientas se guardan con una sola escritura
+
+    Args:
+        old_location: Ubicación de origen
+        new_location: Ubicación de destino
+
+    Returns:
+         Tupla (éxito, mensaje, cantidad de herramientas movidas)
+    """
+    old_path = _location_path(old_location)
+    new_segments = parse_location(new_location)
+    if not old_path or not new_segments:
+        return False, 'Debe indicar la ubicación de origen y la de destino', 0
+
+    moved = 0
+    try:
+        with transaction(TOOL_DATA_FILE):
+            tools = find_records_by_any_key(TOOL_DATA_FILE, "ubicacion_arbol", [old_path])
+            for tool in tools:
+                segments = parse_location(tool.get('ubicacion'))
+                updated_tool = copy_record(tool)
+                updated_tool['ubicacion'] = LOCATION_SEPARATOR.join(new_segments + segments[len(old_path):])
+                update_record(TOOL_DATA_FILE, tool['id'], updated_tool)
+                moved += 1
+    except StorageError as e:
+        return False, f'Error al guardar los cambios: {e}', 0
+
+    if not moved:
+        return False, 'No hay herramientas en la ubicación indicada', 0
+    return True, f'{moved} herramientas movidas a {LOCATION_SEPARATOR.join(new_segments)}', moved
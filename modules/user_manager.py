@@ -2,44 +2,141 @@
 Módulo para gestión de usuarios.
 Contiene funciones CRUD para el manejo de usuarios del sistema.
 """
-from typing import Dict, Any, List, Optional, Tuple
-from modules.data_manager import load_json_data, save_json_data
-from modules.id_generator import get_next_id
-from modules.validators import validate_user_data
+import csv
+from itertools import tee
+from pathlib import Path
+from typing import Dict, Any, List, Mapping, Optional, Tuple, Iterator, Union
+from modules.data_manager import (
+    load_json_data, iter_records, query_records, get_record, copy_record,
+    insert_record, update_record, delete_record, register_index,
+    register_inverted_index, find_records_by_keys, find_records_by_any_key,
+    count_records_by_keys, get_index_keys, get_records_view, transaction, page_records
+)
+from modules.id_generator import allocate_id, reserve_ids
+from modules.storage import StorageError
+from modules.text_search import NGRAM_SIZE, normalize_text, ngrams, record_ngrams
+from modules.validators import validate_user_data, validate_records
 
 USER_DATA_FILE = "usuarios"
 
-def create_user(user_data: Dict[str, Any]) -> Tuple[bool, str, Optional[int]]:
+# Filas por bloque que valida cada proceso en una importación masiva
+IMPORT_CHUNK_SIZE = 500
+# Separador de los talleres inscritos dentro de una celda del CSV
+CSV_LIST_SEPARATOR = ";"
+
+
+def _normalize_document(document: Any) -> str:
+    """Normaliza un número de documento para compararlo (sin espacios, como texto)."""
+    return "" if document is None else str(document).strip()
+
+
+# Campos en los que busca el término de search_users
+SEARCH_FIELDS = ("nombre", "apellido", "documento")
+
+
+def _search_ngrams(user: Dict[str, Any]) -> set:
+    """Obtiene los trigramas normalizados de los campos de búsqueda de un usuario."""
+    return record_ngrams(user, SEARCH_FIELDS)
+
+
+def _course_keys(user: Dict[str, Any]) -> tuple:
+    """Clave del índice de cursos: sólo los estudiantes, por curso en minúsculas."""
+    if user.get("tipo_usuario") != "Estudiante":
+        return ()
+    return ((user.get("curso") or "").lower(),)
+
+
+def _role_keys(user: Dict[str, Any]) -> tuple:
+    """Clave del índice de roles: sólo el personal, por rol en minúsculas."""
+    if user.get("tipo_usuario") != "Personal":
+        return ()
+    return ((user.get("rol") or "").lower(),)
+
+
+# Índice documento -> usuario para verificar duplicados y buscar por DNI en O(1)
+register_index(USER_DATA_FILE, "documento", _normalize_document)
+# Índice trigrama -> usuarios para buscar por subcadena sin recorrer todos
+register_inverted_index(USER_DATA_FILE, "busqueda", _search_ngrams)
+# Índices secundarios para los filtros de search_users
+register_index(USER_DATA_FILE, "tipo_usuario")
+register_inverted_index(USER_DATA_FILE, "curso", _course_keys)
+register_inverted_index(USER_DATA_FILE, "rol", _role_keys)
+
+
+def _other_types(user_type: str) -> List[Tuple[str, List[Any]]]:
+    """Partes de un plan que cubren a los usuarios de cualquier tipo salvo user_type."""
+    types = [key for key in get_index_keys(USER_DATA_FILE, "tipo_usuario") if key != user_type]
+    return [("tipo_usuario", types)]
+
+
+def _plan_search(user_type: str, course: str, role: str) -> List[List[Tuple[str, List[Any]]]]:
     """
-    Crea un nuevo usuario en el sistema.
+    Arma los conjuntos de candidatos que aporta cada filtro indexado.
+
+    Cada conjunto es una unión de claves de índices (índice, claves) que
+    contiene a todos los usuarios que pueden cumplir el filtro. El filtro de
+    curso sólo descarta estudiantes y el de rol sólo descarta personal, por
+    lo que sin tipo de usuario sus conjuntos incluyen a los demás tipos.
 
     Args:
-        user_data: Diccionario con los datos del usuario
+        user_type: Filtro por tipo de usuario
+        course: Filtro por curso
+        role: Filtro por rol (subcadena)
 
     Returns:
-        Tupla (éxito, mensaje, id_usuario_creado)
+        Lista de conjuntos de candidatos, uno por filtro restrictivo
     """
-    # Validar datos de entrada
-    is_valid, errors = validate_user_data(user_data)
-    if not is_valid:
-        error_msg = "Errores de validación: " + "; ".join(errors)
-        return False, error_msg, None
-
-    users = get_all_users()
-
-    # Verificar que el documento no esté duplicado
-    document = str(user_data["documento"]).strip()
-    if any(str(user.get("documento", "")).strip() == document for user in users):
-        return False, f"Ya existe un usuario con documento {document}", None
+    plans = []
+    if user_type:
+        plans.append([("tipo_usuario", [user_type])])
+
+    if course and user_type in ("", "Estudiante"):
+        plan = [("curso", [course.lower()])]
+        if not user_type:
+            plan += _other_types("Estudiante")
+        plans.append(plan)
+
+    if role and user_type in ("", "Personal"):
+        role_lower = role.lower()
+        roles = [key for key in get_index_keys(USER_DATA_FILE, "rol") if role_lower in key]
+        plan = [("rol", roles)]
+        if not user_type:
+            plan += _other_types("Personal")
+        plans.append(plan)
+
+    return plans
+
+
+def _plan_size(plan: List[Tuple[str, List[Any]]]) -> int:
+    return sum(count_records_by_keys(USER_DATA_FILE, name, keys) for name, keys in plan)
+
+
+def _plan_records(plan: List[Tuple[str, List[Any]]]) -> List[Mapping[str, Any]]:
+    if len(plan) == 1:
+        name, keys = plan[0]
+        return find_records_by_any_key(USER_DATA_FILE, name, keys)
+    records = {}
+    for name, keys in plan:
+        for record in find_records_by_any_key(USER_DATA_FILE, name, keys):
+            records[record["id"]] = record
+    return sorted(records.values(), key=lambda record: record["id"])
+
+def _build_user_record(user_data: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    """
+    Arma el registro a guardar de un usuario ya validado.
 
-    user_id = get_next_id(users, "id")
+    Args:
+        user_data: Diccionario con los datos del usuario
+        user_id: ID asignado al usuario
 
-    # Crear registro de usuario
+    Returns:
+        Registro del usuario con los campos de su tipo
+    """
     new_user = {
         "id": user_id,
         "nombre": user_data["nombre"].strip(),
         "apellido": user_data["apellido"].strip(),
-        "documento": document,
+        "documento": str(user_data["documento"]).strip(),
         "tipo_usuario": user_data["tipo_usuario"],
         "email": user_data.get("email", "").strip() if user_data.get("email") else ""
     }
@@ -56,11 +153,37 @@ def create_user(user_data: Dict[str, Any]) -> Tuple[bool, str, Optional[int]]:
             "departamento": user_data.get("departamento", "").strip()
         })
 
-    # Agregar usuario a la lista
-    users.append(new_user)
+    return new_user
+
+
+def create_user(user_data: Dict[str, Any]) -> Tuple[bool, str, Optional[int]]:
+    """
+    Crea un nuevo usuario en el sistema.
+
+    Args:
+        user_data: Diccionario con los datos del usuario
+
+    Returns:
+        Tupla (éxito, mensaje, id_usuario_creado)
+    """
+    # Validar datos de entrada
+    is_valid, errors = validate_user_data(user_data)
+    if not is_valid:
+        error_msg = "Errores de validación: " + "; ".join(errors)
+        return False, error_msg, None
+
+    # Verificar que el documento no esté duplicado
+    document = str(user_data["documento"]).strip()
+    if query_records(USER_DATA_FILE, {"documento": document}):
+        return False, f"Ya existe un usuario con documento {document}", None
+
+    user_id = allocate_id(USER_DATA_FILE)
+
+    # Crear registro de usuario
+    new_user = _build_user_record(user_data, user_id)
 
-    # Guardar datos
-    if save_json_data(USER_DATA_FILE, users):
+    # Agregar y guardar usuario
+    if insert_record(USER_DATA_FILE, new_user):
         return True, f"Usuario creado exitosamente con ID {user_id}", user_id
     else:
         return False, "Error al guardar el usuario", None
@@ -76,8 +199,8 @@ def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Diccionario con datos del usuario o None si no existe
     """
-    users = get_all_users()
-    return next((user for user in users if user.get("id") == user_id), None)
+    user = get_record(USER_DATA_FILE, user_id)
+    return copy_record(user) if user is not None else None
 
 
 def get_user_by_document(document: str) -> Optional[Dict[str, Any]]:
@@ -90,9 +213,9 @@ def get_user_by_document(document: str) -> Optional[Dict[str, Any]]:
     Returns:
         Diccionario con datos del usuario o None si no existe
     """
-    users = get_all_users()
     document = str(document).strip()
-    return next((user for user in users if str(user.get("documento", "")).strip() == document), None)
+    users = query_records(USER_DATA_FILE, {"documento": document})
+    return copy_record(users[0]) if users else None
 
 
 def get_all_users() -> List[Dict[str, Any]]:
@@ -105,9 +228,46 @@ def get_all_users() -> List[Dict[str, Any]]:
     return load_json_data(USER_DATA_FILE)
 
 
-def search_users(search_term: str = "", user_type: str = "", course: str = "", role: str = "") -> List[Dict[str, Any]]:
+def list_users(cursor: Optional[str] = None, limit: int = 20,
+               sort_key: str = "id") -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
-    Busca usuarios con filtros específicos.
+    Obtiene una página de usuarios ordenados.
+
+    Args:
+        cursor: Cursor devuelto por la página anterior (None para la primera)
+        limit: Cantidad máxima de usuarios por página
+        sort_key: Campo por el que se ordena (por ejemplo "id" o "apellido")
+
+    Returns:
+        Tupla (usuarios de la página, cursor de la página siguiente o None)
+
+    Raises:
+        ValueError: Si limit no es positivo o el cursor no es válido
+    """
+    users, next_cursor = page_records(USER_DATA_FILE, cursor, limit, sort_key)
+    return [copy_record(user) for user in users], next_cursor
+
+
+def iter_users() -> Iterator[Dict[str, Any]]:
+    """
+    Recorre todos los usuarios del sistema de forma perezosa.
+
+    Yields:
+        Copia de cada usuario, a medida que se lee
+    """
+    for user in iter_records(USER_DATA_FILE):
+        yield copy_record(user)
+
+
+def iter_search_users(search_term: str = "", user_type: str = "", course: str = "", role: str = "") -> Iterator[Dict[str, Any]]:
+    """
+    Busca usuarios con filtros específicos, entregando los resultados a medida que aparecen.
+
+    El término se busca como subcadena sin distinguir mayúsculas ni acentos
+    ("gonzalez" encuentra "González"). Los candidatos se obtienen del índice
+    más selectivo entre el de trigramas (términos de tres o más caracteres)
+    y los de tipo de usuario, curso y rol; el resto de los filtros se
+    verifica sólo sobre esos candidatos.
 
     Args:
         search_term: Término de búsqueda (nombre, apellido o documento)
@@ -115,22 +275,31 @@ def search_users(search_term: str = "", user_type: str = "", course: str = "", r
         course: Filtro por curso (solo estudiantes)
         role: Filtro por rol (solo personal)
 
-    Returns:
-        Lista de usuarios que coinciden con los criterios
+    Yields:
+        Usuarios que coinciden con los criterios
     """
-    users = get_all_users()
-    filtered_users = []
+    search_text = normalize_text(search_term)
+
+    # Partir del conjunto de candidatos más chico entre los filtros indexados;
+    # el resto de los filtros se verifica sólo sobre esos candidatos
+    candidates = None
+    if len(search_text) >= NGRAM_SIZE:
+        candidates = find_records_by_keys(USER_DATA_FILE, "busqueda", ngrams(search_text))
+
+    plans = _plan_search(user_type, course, role)
+    if plans and (candidates is None or len(candidates) > 0):
+        best = min(plans, key=_plan_size)
+        if candidates is None or _plan_size(best) < len(candidates):
+            candidates = _plan_records(best)
+
+    users = iter_records(USER_DATA_FILE) if candidates is None else candidates
 
     for user in users:
-        # Filtro por término de búsqueda
-        if search_term:
-            search_lower = search_term.lower()
-            name_match = search_lower in user.get("nombre", "").lower()
-            lastname_match = search_lower in user.get("apellido", "").lower()
-            document_match = search_term in str(user.get("documento", ""))
-
-            if not (name_match or lastname_match or document_match):
-                continue
+        # Filtro por término de búsqueda (sin distinguir mayúsculas ni acentos)
+        if search_text and not any(
+            search_text in normalize_text(user.get(field)) for field in SEARCH_FIELDS
+        ):
+            continue
 
         # Filtro por tipo de usuario
         if user_type and user.get("tipo_usuario") != user_type:
@@ -146,9 +315,23 @@ def search_users(search_term: str = "", user_type: str = "", course: str = "", r
             if role.lower() not in user.get("rol", "").lower():
                 continue
 
-        filtered_users.append(user)
+        yield copy_record(user)
+
+
+def search_users(search_term: str = "", user_type: str = "", course: str = "", role: str = "") -> List[Dict[str, Any]]:
+    """
+    Busca usuarios con filtros específicos.
+
+    Args:
+        search_term: Término de búsqueda (nombre, apellido o documento)
+        user_type: Filtro por tipo de usuario
+        course: Filtro por curso (solo estudiantes)
+        role: Filtro por rol (solo personal)
 
-    return filtered_users
+    Returns:
+        Lista de usuarios que coinciden con los criterios
+    """
+    return list(iter_search_users(search_term, user_type, course, role))
 
 
 def update_user(user_id: int, updated_data: Dict[str, Any]) -> Tuple[bool, str]:
@@ -162,21 +345,13 @@ def update_user(user_id: int, updated_data: Dict[str, Any]) -> Tuple[bool, str]:
     Returns:
         Tupla (éxito, mensaje)
     """
-    # Cargar usuarios
-    users = get_all_users()
-
     # Buscar usuario
-    user_index = None
-    for i, user in enumerate(users):
-        if user.get("id") == user_id:
-            user_index = i
-            break
-
-    if user_index is None:
+    user = get_record(USER_DATA_FILE, user_id)
+    if user is None:
         return False, f"Usuario con ID {user_id} no encontrado"
 
     # Crear datos actualizados manteniendo el ID original
-    current_user = users[user_index].copy()
+    current_user = copy_record(user)
     current_user.update(updated_data)
     current_user["id"] = user_id  # Asegurar que el ID no cambie
 
@@ -188,15 +363,12 @@ def update_user(user_id: int, updated_data: Dict[str, Any]) -> Tuple[bool, str]:
 
     # Verificar documento duplicado (excluyendo el usuario actual)
     document = str(current_user["documento"]).strip()
-    for i, user in enumerate(users):
-        if i != user_index and str(user.get("documento", "")).strip() == document:
-            return False, f"Ya existe otro usuario con documento {document}"
-
-    # Actualizar usuario
-    users[user_index] = current_user
+    if any(user.get("id") != user_id for user in query_records(USER_DATA_FILE, {"documento": document})):
+        return False, f"Ya existe otro usuario con documento {document}"
+    current_user["documento"] = document
 
-    # Guardar cambios
-    if save_json_data(USER_DATA_FILE, users):
+    # Actualizar y guardar usuario
+    if update_record(USER_DATA_FILE, user_id, current_user):
         return True, f"Usuario {user_id} actualizado exitosamente"
     else:
         return False, "Error al guardar los cambios"
@@ -212,23 +384,106 @@ def delete_user(user_id: int) -> Tuple[bool, str]:
     Returns:
         Tupla (éxito, mensaje)
     """
-    # Cargar usuarios
-    users = get_all_users()
-
-    # Buscar y eliminar usuario
-    original_count = len(users)
-    users = [user for user in users if user.get("id") != user_id]
-
-    if len(users) == original_count:
+    # Buscar usuario
+    if get_record(USER_DATA_FILE, user_id) is None:
         return False, f"Usuario con ID {user_id} no encontrado"
 
-    # Guardar cambios
-    if save_json_data(USER_DATA_FILE, users):
+    # Eliminar y guardar cambios
+    if delete_record(USER_DATA_FILE, user_id):
         return True, f"Usuario {user_id} eliminado exitosamente"
     else:
         return False, "Error al guardar los cambios"
 
 
+def _csv_row_to_user(row: Dict[Optional[str], Any]) -> Dict[str, Any]:
+    """Convierte una fila del CSV en un diccionario de datos de usuario."""
+    user = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+    workshops = user.get("talleres_inscritos", "")
+    user["talleres_inscritos"] = [
+        workshop.strip() for workshop in workshops.split(CSV_LIST_SEPARATOR) if workshop.strip()
+    ]
+    return user
+
+
+def _read_csv_rows(csv_path: Union[str, Path]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Lee las filas del CSV como (número de línea, datos del usuario)."""
+    with open(csv_path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, _csv_row_to_user(row)
+
+
+def _validated_rows(rows: Iterator[Tuple[int, Dict[str, Any]]], workers: Optional[int],
+                    chunk_size: int) -> Iterator[Tuple[int, Dict[str, Any], bool, List[str]]]:
+    """
+    Valida las filas con validate_records, conservando el orden.
+
+    Yields:
+        Tuplas (línea, usuario, es_válido, errores)
+    """
+    rows, users = tee(rows)
+    results = validate_records(USER_DATA_FILE, (user for _, user in users), workers, chunk_size)
+    for (line, user), (is_valid, errors) in zip(rows, results):
+        yield line, user, is_valid, errors
+
+
+def import_users_from_csv(csv_path: Union[str, Path], workers: Optional[int] = None,
+                          chunk_size: int = IMPORT_CHUNK_SIZE) -> Tuple[bool, str, List[Dict[str, Any]]]:
+    """
+    Importa usuarios de forma masiva desde un archivo CSV.
+
+    El archivo debe tener encabezados con los nombres de los campos
+    (nombre, apellido, documento, tipo_usuario, email, curso,
+    talleres_inscritos, rol, departamento); los talleres se separan con ";".
+    Las filas se validan con validate_records (por bloques en un pool de
+    procesos si el archivo es grande), los documentos
+    se verifican contra los usuarios existentes y contra el resto del
+    archivo, los IDs se reservan en un solo bloque y usuarios.json se
+    escribe una única vez. Las filas con errores no se importan.
+
+    Args:
+        csv_path: Ruta del archivo CSV
+        workers: Cantidad de procesos de validación (por defecto, uno por CPU)
+        chunk_size: Filas por bloque de validación
+
+    Returns:
+        Tupla (éxito, mensaje, reporte de errores). El reporte tiene una
+        entrada {"fila", "documento", "errores"} por cada fila rechazada.
+    """
+    report = []
+    imported = 0
+    try:
+        with transaction(USER_DATA_FILE):
+            existing = {_normalize_document(user.get("documento")) for user in get_records_view(USER_DATA_FILE)}
+            seen = set()
+            valid_users = []
+
+            for line, user, is_valid, errors in _validated_rows(_read_csv_rows(csv_path), workers, chunk_size):
+                if is_valid:
+                    document = _normalize_document(user["documento"])
+                    if document in existing:
+                        errors = [f"Ya existe un usuario con documento {document}"]
+                    elif document in seen:
+                        errors = [f"Documento {document} repetido en el archivo"]
+                    else:
+                        seen.add(document)
+                        valid_users.append(user)
+                        continue
+                report.append({"fila": line, "documento": user.get("documento", ""), "errores": errors})
+
+            if valid_users:
+                user_ids = reserve_ids(USER_DATA_FILE, len(valid_users))
+                for user_id, user in zip(user_ids, valid_users):
+                    insert_record(USER_DATA_FILE, _build_user_record(user, user_id))
+            imported = len(valid_users)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        return False, f"Error al leer el archivo: {e}", report
+    except StorageError as e:
+        return False, f"Error al guardar los usuarios: {e}", report
+
+    return True, f"{imported} usuarios importados, {len(report)} filas con errores", report
+
+
 def format_user_info(user: Dict[str, Any]) -> str:
     """
     Formatea la información de un usuario para mostrar.
@@ -1,11 +1,35 @@
 """
 Módulo de validación de datos actualizado con enums.
-Contiene funciones para validar diferentes tipos de datos de entrada.
+Contiene funciones para validar diferentes tipos de datos de entrada y los
+esquemas de usuarios y herramientas, que se compilan una sola vez al
+importar el módulo.
 """
+import os
 import re
-from typing import Dict, Any, List, Tuple, Optional
-from datetime import datetime
-from modules.enums import UserType, ToolState, ToolType, MaintenanceType, AssignmentStatus
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, tee
+from typing import Dict, Any, List, Tuple, Optional, Callable, Mapping, Sequence, Iterable, Iterator
+from datetime import date, datetime
+from modules.enums import UserType, ToolState, ToolType, MaintenanceType, MaintenanceStatus, AssignmentStatus
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Forma habitual de las fechas (YYYY-MM-DD con ceros a la izquierda); las
+# demás se siguen resolviendo con strptime
+ISO_DATE_PATTERN = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})')
+
+# Registros por bloque enviado a cada proceso en la validación masiva
+VALIDATION_CHUNK_SIZE = 2000
+# Por debajo de esta cantidad de registros no conviene levantar procesos
+PARALLEL_MIN_RECORDS = 10000
+
+# Mensajes de error de las enumeraciones, armados una sola vez
+_USER_TYPE_ERROR = f"Tipo de usuario debe ser uno de: {', '.join(UserType.get_all_values())}"
+_TOOL_STATE_ERROR = f"Estado debe ser uno de: {', '.join(ToolState.get_all_values())}"
+_TOOL_TYPE_ERROR = f"Tipo debe ser uno de: {', '.join(ToolType.get_all_values())}"
+_MAINTENANCE_TYPE_ERROR = f"Tipo de mantenimiento debe ser: {', '.join(MaintenanceType.get_all_values())}"
+_MAINTENANCE_STATUS_ERROR = f"Estado de mantenimiento debe ser uno de: {', '.join(MaintenanceStatus.get_all_values())}"
+_ASSIGNMENT_STATUS_ERROR = f"Estado debe ser uno de: {', '.join(AssignmentStatus.get_all_values())}"
 
 
 def validate_required_fields(data: Dict[str, Any], required_fields: List[str]) -> Tuple[bool, List[str]]:
@@ -43,8 +67,7 @@ def validate_email(email: str) -> bool:
     if not email:
         return True  # Email es opcional
 
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 
 def validate_document_number(document: str) -> Tuple[bool, str]:
@@ -85,8 +108,7 @@ def validate_user_type(user_type: str) -> Tuple[bool, str]:
         Tupla (es_válido, mensaje_error)
     """
     if not UserType.is_valid(user_type):
-        valid_types = ", ".join(UserType.get_all_values())
-        return False, f"Tipo de usuario debe ser uno de: {valid_types}"
+        return False, _USER_TYPE_ERROR
 
     return True, ""
 
@@ -102,8 +124,7 @@ def validate_tool_state(state: str) -> Tuple[bool, str]:
         Tuple (es_válido, mensaje_error)
     """
     if not ToolState.is_valid(state):
-        valid_states = ", ".join(ToolState.get_all_values())
-        return False, f"Estado debe ser uno de: {valid_states}"
+        return False, _TOOL_STATE_ERROR
 
     return True, ""
 
@@ -119,8 +140,7 @@ def validate_tool_type(tool_type: str) -> Tuple[bool, str]:
         Tupla (es_válido, mensaje_error)
     """
     if not ToolType.is_valid(tool_type):
-        valid_types = ", ".join(ToolType.get_all_values())
-        return False, f"Tipo debe ser uno de: {valid_types}"
+        return False, _TOOL_TYPE_ERROR
 
     return True, ""
 
@@ -136,8 +156,23 @@ def validate_maintenance_type(maintenance_type: str) -> Tuple[bool, str]:
         Tupla (es_válido, mensaje_error)
     """
     if not MaintenanceType.is_valid(maintenance_type):
-        valid_types = ", ".join(MaintenanceType.get_all_values())
-        return False, f"Tipo de mantenimiento debe ser: {valid_types}"
+        return False, _MAINTENANCE_TYPE_ERROR
+
+    return True, ""
+
+
+def validate_maintenance_status(status: str) -> Tuple[bool, str]:
+    """
+    Valida estado de mantenimiento usando enum.
+
+    Args:
+        status: Estado a validar
+
+    Returns:
+        Tupla (es_válido, mensaje_error)
+    """
+    if not MaintenanceStatus.is_valid(status):
+        return False, _MAINTENANCE_STATUS_ERROR
 
     return True, ""
 
@@ -153,8 +188,7 @@ def validate_assignment_status(status: str) -> Tuple[bool, str]:
         Tupla (es_válido, mensaje_error)
     """
     if not AssignmentStatus.is_valid(status):
-        valid_statuses = ", ".join(AssignmentStatus.get_all_values())
-        return False, f"Estado debe ser uno de: {valid_statuses}"
+        return False, _ASSIGNMENT_STATUS_ERROR
 
     return True, ""
 
@@ -173,7 +207,12 @@ def validate_date_format(date_str: str) -> Tuple[bool, str]:
         return False, "Fecha es requerida"
 
     try:
-        datetime.strptime(date_str, "%Y-%m-%d")
+        match = ISO_DATE_PATTERN.fullmatch(date_str)
+        if match:
+            year, month, day = match.groups()
+            date(int(year), int(month), int(day))
+        else:
+            datetime.strptime(date_str, "%Y-%m-%d")
         return True, ""
     except ValueError:
         return False, "Formato de fecha inválido. Use YYYY-MM-DD"
@@ -199,9 +238,137 @@ def validate_positive_number(value: Any, field_name: str) -> Tuple[bool, str]:
         return False, f"{field_name} debe ser un número válido"
 
 
+def _validate_email_field(email: str) -> Tuple[bool, str]:
+    """Adapta validate_email a la forma (es_válido, mensaje_error) de los esquemas."""
+    if not validate_email(email):
+        return False, "Formato de email inválido"
+    return True, ""
+
+
+def _validate_optional_days(days: Any) -> Tuple[bool, str]:
+    """Valida una frecuencia en días: vacía o un entero mayor que cero."""
+    if days is None or days == "":
+        return True, ""
+    if isinstance(days, bool) or not isinstance(days, int) or days <= 0:
+        return False, "La frecuencia debe ser una cantidad de días mayor que cero"
+    return True, ""
+
+
+def _validate_optional_cost(cost: Any) -> Tuple[bool, str]:
+    """Valida un costo: vacío o un número no negativo."""
+    if cost is None or cost == "":
+        return True, ""
+    if isinstance(cost, bool) or not isinstance(cost, (int, float)):
+        return False, "Costo debe ser un número válido"
+    return validate_positive_number(cost, "Costo")
+
+
+def _required_messages(field: str) -> Tuple[str, str, str]:
+    """Arma los mensajes de un campo requerido: (campo, ausente, vacío)."""
+    return field, f"Campo requerido '{field}' no está presente", f"Campo requerido '{field}' está vacío"
+
+
+def _check_required(data: Mapping[str, Any], required: Sequence[Tuple[str, str, str]],
+                    errors: List[str]) -> None:
+    """Agrega a errors los mensajes de los campos requeridos ausentes o vacíos."""
+    for field, missing, empty in required:
+        if field not in data:
+            errors.append(missing)
+        else:
+            value = data[field]
+            if not value or str(value).strip() == "":
+                errors.append(empty)
+
+
+def compile_schema(schema: Mapping[str, Any]) -> Callable[[Mapping[str, Any]], Tuple[bool, List[str]]]:
+    """
+    Compila un esquema de entidad en una función de validación.
+
+    El esquema tiene las claves:
+        required: Campos requeridos, en orden
+        fields: Tuplas (campo, validador, prefijo); el validador devuelve
+            (es_válido, mensaje_error) y se aplica si el campo está presente
+        required_by: Tupla (campo, {valor: campos requeridos}) con los
+            campos que pasan a ser requeridos según el valor de otro
+
+    Los mensajes y tablas se arman aquí una sola vez; la función resultante
+    solo recorre tuplas ya preparadas.
+
+    Args:
+        schema: Esquema a compilar
+
+    Returns:
+        Función registro -> (es_válido, lista_de_errores)
+    """
+    required = tuple(_required_messages(field) for field in schema.get("required", ()))
+    fields = tuple(schema.get("fields", ()))
+    condition_field, required_by = schema.get("required_by", (None, {}))
+    required_by = {
+        value: tuple(_required_messages(field) for field in value_fields)
+        for value, value_fields in required_by.items()
+    }
+
+    def validate(data: Mapping[str, Any]) -> Tuple[bool, List[str]]:
+        errors = []
+        _check_required(data, required, errors)
+
+        for field, validator, prefix in fields:
+            if field in data:
+                is_valid, error = validator(data[field])
+                if not is_valid:
+                    errors.append(prefix + error)
+
+        if required_by and condition_field in data:
+            value = data[condition_field]
+            if isinstance(value, str) and value in required_by:
+                _check_required(data, required_by[value], errors)
+
+        return len(errors) == 0, errors
+
+    return validate
+
+
+USER_SCHEMA: Dict[str, Any] = {
+    "required": ("nombre", "apellido", "documento", "tipo_usuario"),
+    "fields": (
+        ("documento", validate_document_number, ""),
+        ("tipo_usuario", validate_user_type, ""),
+        ("email", _validate_email_field, "")
+    ),
+    "required_by": ("tipo_usuario", {
+        UserType.ESTUDIANTE.value: ("curso",),
+        UserType.PERSONAL.value: ("rol",)
+    })
+}
+
+TOOL_SCHEMA: Dict[str, Any] = {
+    "required": ("nombre", "tipo", "marca", "estado", "ubicacion", "fecha_adquisicion"),
+    "fields": (
+        ("tipo", validate_tool_type, ""),
+        ("estado", validate_tool_state, ""),
+        ("fecha_adquisicion", validate_date_format, "Fecha de adquisición: ")
+    )
+}
+
+MAINTENANCE_SCHEMA: Dict[str, Any] = {
+    "required": ("herramienta_id", "tipo", "estado", "fecha_programada"),
+    "fields": (
+        ("tipo", validate_maintenance_type, ""),
+        ("estado", validate_maintenance_status, ""),
+        ("fecha_programada", validate_date_format, "Fecha programada: "),
+        ("frecuencia_dias", _validate_optional_days, ""),
+        ("costo", _validate_optional_cost, "")
+    )
+}
+
+_validate_user = compile_schema(USER_SCHEMA)
+_validate_tool = compile_schema(TOOL_SCHEMA)
+_validate_maintenance = compile_schema(MAINTENANCE_SCHEMA)
+
+
 def validate_user_data(user_data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     """
-    Valida datos completos de un usuario.
+    Valida datos completos de un usuario según USER_SCHEMA.
 
     Args:
         user_data: Diccionario con datos del usuario
@@ -209,53 +376,12 @@ def validate_user_data(user_data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     Returns:
         Tupla (es_válido, lista_de_errores)
     """
-    errors = []
-
-    # Campos básicos requeridos
-    basic_required = ["nombre", "apellido", "documento", "tipo_usuario"]
-    is_valid, field_errors = validate_required_fields(
-        user_data, basic_required)
-    errors.extend(field_errors)
-
-    # Validar documento
-    if "documento" in user_data:
-        is_valid_doc, doc_error = validate_document_number(
-            user_data["documento"])
-        if not is_valid_doc:
-            errors.append(doc_error)
-
-    # Validar tipo de usuario usando enum
-    if "tipo_usuario" in user_data:
-        is_valid_type, type_error = validate_user_type(
-            user_data["tipo_usuario"])
-        if not is_valid_type:
-            errors.append(type_error)
-
-    # Validar email si está presente
-    if "email" in user_data and user_data["email"]:
-        if not validate_email(user_data["email"]):
-            errors.append("Formato de email inválido")
-
-    # Validaciones específicas por tipo de usuario
-    if "tipo_usuario" in user_data:
-        if user_data["tipo_usuario"] == UserType.ESTUDIANTE.value:
-            student_required = ["curso"]
-            _, student_errors = validate_required_fields(
-                user_data, student_required)
-            errors.extend(student_errors)
-
-        elif user_data["tipo_usuario"] == UserType.PERSONAL.value:
-            staff_required = ["rol"]
-            _, staff_errors = validate_required_fields(
-                user_data, staff_required)
-            errors.extend(staff_errors)
-
-    return len(errors) == 0, errors
+    return _validate_user(user_data)
 
 
 def validate_tool_data(tool_data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     """
-    Valida datos completos de una herramienta.
+    Valida datos completos de una herramienta según TOOL_SCHEMA.
 
     Args:
         tool_data: Diccionario con datos de la herramienta
@@ -263,32 +389,118 @@ def validate_tool_data(tool_data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     Returns:
         Tupla (es_válido, lista_de_errores)
     """
-    errors = []
+    return _validate_tool(tool_data)
 
-    # Campos básicos requeridos
-    required_fields = ["nombre", "tipo", "marca",
-                       "estado", "ubicacion", "fecha_adquisicion"]
-    is_valid, field_errors = validate_required_fields(
-        tool_data, required_fields)
-    errors.extend(field_errors)
-
-    # Validar tipo de herramienta
-    if "tipo" in tool_data:
-        is_valid_type, type_error = validate_tool_type(tool_data["tipo"])
-        if not is_valid_type:
-            errors.append(type_error)
-
-    # Validar estado
-    if "estado" in tool_data:
-        is_valid_state, state_error = validate_tool_state(tool_data["estado"])
-        if not is_valid_state:
-            errors.append(state_error)
-
-    # Validar fecha de adquisición
-    if "fecha_adquisicion" in tool_data:
-        is_valid_date, date_error = validate_date_format(
-            tool_data["fecha_adquisicion"])
-        if not is_valid_date:
-            errors.append(f"Fecha de adquisición: {date_error}")
 
-    return len(errors) == 0, errors
+def validate_maintenance_data(maintenance_data: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """
+    Valida datos completos de un mantenimiento según MAINTENANCE_SCHEMA.
+
+    Args:
+        maintenance_data: Diccionario con datos del mantenimiento
+
+    Returns:
+        Tupla (es_válido, lista_de_errores)
+    """
+    return _validate_maintenance(maintenance_data)
+
+
+# Validador de cada entidad (clave de DATA_FILES) para la validación masiva
+ENTITY_VALIDATORS: Dict[str, Callable[[Mapping[str, Any]], Tuple[bool, List[str]]]] = {
+    "usuarios": validate_user_data,
+    "herramientas": validate_tool_data,
+    "mantenimientos": validate_maintenance_data
+}
+
+
+def _validate_chunk(entity: str, records: List[Mapping[str, Any]]) -> List[Tuple[bool, List[str]]]:
+    """Valida un bloque de registros (se ejecuta en un proceso del pool)."""
+    validator = ENTITY_VALIDATORS[entity]
+    return [validator(record) for record in records]
+
+
+def _iter_validation(entity: str, records: Iterable[Mapping[str, Any]], workers: Optional[int],
+                     chunk_size: int) -> Iterator[Tuple[bool, List[str]]]:
+    """Generador de validate_records (la entidad ya está verificada)."""
+    records = iter(records)
+    head = list(islice(records, max(PARALLEL_MIN_RECORDS, chunk_size)))
+    if len(head) < PARALLEL_MIN_RECORDS or workers == 1:
+        validator = ENTITY_VALIDATORS[entity]
+        for record in head:
+            yield validator(record)
+        for record in records:
+            yield validator(record)
+        return
+
+    # Los bloques viajan a otros procesos: las vistas de sólo lectura
+    # (MappingProxyType, como las de iter_records) no se pueden serializar
+    head = list(map(dict, head))
+    records = map(dict, records)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        chunk = head[:chunk_size]
+        head = head[chunk_size:]
+        while chunk:
+            pending.append(executor.submit(_validate_chunk, entity, chunk))
+            if head:
+                chunk, head = head[:chunk_size], head[chunk_size:]
+            else:
+                chunk = list(islice(records, chunk_size))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def validate_records(entity: str, records: Iterable[Mapping[str, Any]], workers: Optional[int] = None,
+                     chunk_size: int = VALIDATION_CHUNK_SIZE) -> Iterator[Tuple[bool, List[str]]]:
+    """
+    Valida una secuencia de registros de una entidad, en paralelo si es grande.
+
+    Los registros se reparten en bloques entre un pool de procesos, con a lo
+    sumo dos bloques por proceso en vuelo, de modo que la entrada se consume
+    a medida que avanza la validación. Con menos de PARALLEL_MIN_RECORDS
+    registros, o workers igual a 1, se valida en el proceso actual.
+
+    Args:
+        entity: Entidad a validar (clave de ENTITY_VALIDATORS)
+        records: Registros a validar (se recorren una sola vez)
+        workers: Cantidad de procesos (por defecto, uno por CPU)
+        chunk_size: Registros por bloque
+
+    Returns:
+        Iterador de tuplas (es_válido, lista_de_errores), en el orden de records
+
+    Raises:
+        ValueError: Si la entidad no tiene validador
+    """
+    if entity not in ENTITY_VALIDATORS:
+        raise ValueError(f"Entidad sin validador: {entity}")
+    return _iter_validation(entity, records, workers, chunk_size)
+
+
+def validate_many(entity: str, records: Iterable[Mapping[str, Any]], workers: Optional[int] = None,
+                  chunk_size: int = VALIDATION_CHUNK_SIZE) -> Iterator[Tuple[Any, List[str]]]:
+    """
+    Valida registros guardados contra las reglas vigentes de su entidad.
+
+    Pensada para revisar periódicamente todos los datos cuando cambian las
+    reglas; ver validate_records para el reparto entre procesos.
+
+    Args:
+        entity: Entidad a validar (clave de ENTITY_VALIDATORS)
+        records: Registros a validar, por ejemplo iter_records(entity)
+        workers: Cantidad de procesos (por defecto, uno por CPU)
+        chunk_size: Registros por bloque
+
+    Returns:
+        Iterador de tuplas (id, lista_de_errores), una por registro y en el
+        mismo orden; la lista está vacía si el registro es válido
+
+    Raises:
+        ValueError: Si la entidad no tiene validador
+    """
+    records, originals = tee(records)
+    results = validate_records(entity, records, workers, chunk_size)
+    return ((record.get("id"), errors) for record, (_, errors) in zip(originals, results))
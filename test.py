@@ -2,16 +2,38 @@
 from modules.tool_manager import (
     create_tool, get_all_tools, get_tool_by_id, update_tool, delete_tool,
     update_tool_state, search_tools, get_available_tools,
-    get_tools_by_state, VALID_STATES, VALID_TYPES
+    get_tools_by_state, list_tools, VALID_STATES, VALID_TYPES,
+    get_tools_in_location, count_tools_in_location, get_location_children, relocate_tools
 )
 from modules.data_manager import load_json_data, save_json_data
 from modules.id_generator import get_next_id
-from modules.validators import validate_user_data
+from modules.validators import validate_user_data, validate_many
 from modules.user_manager import (
     create_user, get_user_by_id, get_all_users,
-    search_users, update_user, delete_user, format_user_info
+    search_users, update_user, delete_user, format_user_info, import_users_from_csv
+)
+from modules.maintenance_manager import (
+    schedule_maintenance, get_due_this_week, start_maintenance,
+    complete_maintenance, reschedule_maintenance, get_tool_history, get_tool_maintenance_summary
 )
 from modules.enums import UserType, ToolState, ToolType
+from modules.export_manager import export_all
+from modules.table_renderer import USER_COLUMNS, TOOL_COLUMNS, MAX_COLUMN_WIDTH, write_table, write_table_stream
+from datetime import date, timedelta
+from contextlib import contextmanager
+from pathlib import Path
+import csv
+import io
+import json
+import multiprocessing
+import tempfile
+
+import modules.data_manager as data_manager
+import modules.id_generator as id_generator
+import modules.validators as validators
+from modules.data_manager import transaction, find_records, insert_record, iter_records, TransactionAborted
+from modules.storage import StorageError, JsonFileBackend, COMMIT_MARKER_NAME
+from modules.tool_manager import TOOL_DATA_FILE, update_tool_states, verify_inventory_counts, get_inventory_counts
 
 
 """
@@ -19,82 +41,854 @@ Test del módulo de gestión de herramientas.
 """
 
 
+@contextmanager
+def temporary_data():
+    """
+    Redirige los datos a un directorio temporal, con un backend JSON nuevo,
+    y restaura los originales al terminar.
+    """
+    original_files = dict(data_manager.DATA_FILES)
+    original_sequence = id_generator.SEQUENCE_FILE
+    original_backend = data_manager.get_backend()
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        for name in original_files:
+            data_manager.DATA_FILES[name] = directory / f"{name}.json"
+        id_generator.SEQUENCE_FILE = directory / "secuencias.json"
+        data_manager.set_backend(data_manager.create_backend("json"))
+        try:
+            yield directory
+        finally:
+            data_manager.DATA_FILES.update(original_files)
+            id_generator.SEQUENCE_FILE = original_sequence
+            data_manager.set_backend(original_backend)
+
+
+def _sample_tool(number: int, **fields) -> dict:
+    """Datos válidos de una herramienta de prueba."""
+    return {
+        "nombre": f"Herramienta {number}",
+        "tipo": "Herramienta Manual",
+        "marca": "Stanley",
+        "modelo": f"M{number}",
+        "numero_serie": f"SN{number:04d}",
+        "estado": "Disponible",
+        "ubicacion": "Taller de Electrónica - Armario 3",
+        "fecha_adquisicion": "2024-02-20",
+        **fields
+    }
+
+
+def _sample_user(number: int, **fields) -> dict:
+    """Datos válidos de un usuario de prueba (estudiante, salvo que se indique otro tipo)."""
+    return {
+        "nombre": f"Nombre{number}",
+        "apellido": f"Apellido{number}",
+        "documento": str(30000000 + number),
+        "tipo_usuario": UserType.ESTUDIANTE.value,
+        "email": f"usuario{number}@example.com",
+        "curso": "5A",
+        **fields
+    }
+
+
+def test_transaction_keeps_indexes():
+    """Los índices y contadores ya construidos sobreviven a confirmar o descartar una transacción."""
+    print("=== Prueba de Índices y Contadores en Transacciones ===\n")
+
+    with temporary_data():
+        ids = [create_tool(_sample_tool(number))[2] for number in range(1, 4)]
+        assert find_records(TOOL_DATA_FILE, "estado", "Disponible")
+        assert get_inventory_counts()["estado"]["Disponible"] == 3
+        entry = data_manager._cache[TOOL_DATA_FILE]
+        index_names = set(entry["indexes"])
+        assert "counters" in entry
+
+        success, message, report = update_tool_states(ids[:2], "En Uso")
+        assert success, message
+        entry = data_manager._cache[TOOL_DATA_FILE]
+        assert set(entry["indexes"]) == index_names, set(entry["indexes"])
+        assert "positions" in entry and "counters" in entry
+        assert entry["counters"]["estado"] == {"En Uso": 2, "Disponible": 1}
+        assert sorted(tool["id"] for tool in find_records(TOOL_DATA_FILE, "estado", "En Uso")) == ids[:2]
+
+        with transaction(TOOL_DATA_FILE) as tx:
+            update_tool_state(ids[2], "Fuera de Servicio")
+            tx.rollback()
+        assert [tool["id"] for tool in find_records(TOOL_DATA_FILE, "estado", "Disponible")] == [ids[2]]
+        assert not find_records(TOOL_DATA_FILE, "estado", "Fuera de Servicio")
+        assert get_inventory_counts()["estado"]["Fuera de Servicio"] == 0
+        assert verify_inventory_counts()[0]
+
+    print("Índices y contadores conservados: OK\n")
+
+
+def test_transaction_rollback_and_conflict():
+    """Una transacción descartada no escribe nada y una con conflicto no sobrescribe cambios ajenos."""
+    print("=== Prueba de Transacciones ===\n")
+
+    with temporary_data():
+        tool_id = create_tool(_sample_tool(1))[2]
+
+        with transaction(TOOL_DATA_FILE) as tx:
+            assert update_tool_state(tool_id, "En Uso")[0]
+            assert get_tool_by_id(tool_id)['estado'] == "En Uso"
+            tx.rollback()
+        assert get_tool_by_id(tool_id)['estado'] == "Disponible"
+
+        try:
+            with transaction(TOOL_DATA_FILE):
+                update_tool_state(tool_id, "Fuera de Servicio")
+                raise RuntimeError("falla dentro de la transacción")
+        except RuntimeError:
+            pass
+        assert get_tool_by_id(tool_id)['estado'] == "Disponible"
+
+        # Descartar desde un bloque anidado descarta también el exterior, que
+        # no puede terminar como si hubiera guardado
+        try:
+            with transaction(TOOL_DATA_FILE):
+                assert create_tool(_sample_tool(2))[0]
+                try:
+                    with transaction(TOOL_DATA_FILE) as inner:
+                        update_tool_state(tool_id, "En Uso")
+                        inner.rollback()
+                except TransactionAborted:
+                    pass
+            raise AssertionError("La transacción exterior debía abortar")
+        except TransactionAborted as e:
+            print(f"Transacción abortada: {e}")
+        assert [tool['id'] for tool in get_all_tools()] == [tool_id]
+        assert get_tool_by_id(tool_id)['estado'] == "Disponible"
+
+        # Una excepción capturada dentro del bloque exterior también lo aborta
+        try:
+            with transaction(TOOL_DATA_FILE):
+                assert create_tool(_sample_tool(4))[0]
+                try:
+                    with transaction(TOOL_DATA_FILE):
+                        raise RuntimeError("falla en el bloque anidado")
+                except RuntimeError:
+                    pass
+            raise AssertionError("La transacción exterior debía abortar")
+        except TransactionAborted:
+            pass
+        assert [tool['id'] for tool in get_all_tools()] == [tool_id]
+
+        # Otro proceso modifica la entidad mientras la transacción está abierta
+        other_process = JsonFileBackend(data_manager.DATA_FILES, journal=False)
+        external = [dict(get_tool_by_id(tool_id), estado="En Mantenimiento")]
+        try:
+            with transaction(TOOL_DATA_FILE):
+                update_tool_state(tool_id, "En Uso")
+                other_process.save(TOOL_DATA_FILE, external)
+            raise AssertionError("La transacción debía fallar por modificación concurrente")
+        except StorageError as e:
+            print(f"Conflicto detectado: {e}")
+        assert get_tool_by_id(tool_id)['estado'] == "En Mantenimiento"
+
+    print("Rollback y conflicto: OK\n")
+
+
+def test_journal_replay():
+    """Las mutaciones del journal se recuperan tras una interrupción, incluso con una línea a medias."""
+    print("=== Prueba de Recuperación del Journal ===\n")
+
+    with temporary_data():
+        ids = [create_tool(_sample_tool(number))[2] for number in range(1, 4)]
+        assert update_tool_state(ids[0], "En Uso")[0]
+        assert delete_tool(ids[2])[0]
+        journal_path = data_manager.get_backend().journal_path(TOOL_DATA_FILE)
+        assert journal_path.exists() and not data_manager.DATA_FILES[TOOL_DATA_FILE].exists()
+
+        # Interrupción: el proceso muere a mitad de una línea del journal y
+        # se pierde todo lo que estaba en memoria
+        with open(journal_path, "a", encoding="utf-8") as file:
+            file.write('{"op": "update", "id": 2, "rec')
+        data_manager.set_backend(data_manager.create_backend("json"))
+
+        tools = {tool['id']: tool for tool in get_all_tools()}
+        assert sorted(tools) == ids[:2], sorted(tools)
+        assert tools[ids[0]]['estado'] == "En Uso"
+        assert tools[ids[1]]['estado'] == "Disponible"
+
+        # La siguiente entrada no debe quedar pegada a la línea incompleta
+        success, message, new_id = create_tool(_sample_tool(4))
+        assert success, message
+        assert journal_path.read_bytes().endswith(b"\n")
+        data_manager.set_backend(data_manager.create_backend("json"))
+        assert sorted(tool['id'] for tool in get_all_tools()) == [*ids[:2], new_id]
+
+        assert data_manager.compact_data(TOOL_DATA_FILE)
+        assert not journal_path.exists()
+        data_manager.clear_cache()
+        assert sorted(tool['id'] for tool in get_all_tools()) == [*ids[:2], new_id]
+
+    print("Journal reproducido: OK\n")
+
+
+def test_duplicate_serial_rejected():
+    """No se aceptan dos herramientas con el mismo número de serie (normalizado)."""
+    print("=== Prueba de Números de Serie Únicos ===\n")
+
+    with temporary_data():
+        success, message, tool_id = create_tool(_sample_tool(1, numero_serie="ABC-123"))
+        assert success, message
+        success, message, _ = create_tool(_sample_tool(2, numero_serie=" abc-123 "))
+        assert not success and f"ID {tool_id}" in message, message
+        print(f"Duplicado rechazado: {message}")
+
+        other_id = create_tool(_sample_tool(3, numero_serie="XYZ-9"))[2]
+        success, message = update_tool(other_id, {"numero_serie": "ABC-123"})
+        assert not success, message
+        assert get_tool_by_id(other_id)['numero_serie'] == "XYZ-9"
+        assert len(get_all_tools()) == 2
+
+    print("Números de serie únicos: OK\n")
+
+
+def test_inventory_counters():
+    """Los contadores de inventario siguen a cada alta, cambio y baja, y se conservan al volver a leerlos."""
+    print("=== Prueba de Contadores de Inventario ===\n")
+
+    with temporary_data():
+        ids = [create_tool(_sample_tool(number))[2] for number in range(1, 5)]
+        assert update_tool_state(ids[0], "En Uso")[0]
+        assert update_tool(ids[1], {"tipo": "Máquina Eléctrica"})[0]
+        assert delete_tool(ids[3])[0]
+
+        counts = get_inventory_counts()
+        assert counts["estado"]["Disponible"] == 2 and counts["estado"]["En Uso"] == 1, counts
+        assert counts["tipo"]["Herramienta Manual"] == 2 and counts["tipo"]["Máquina Eléctrica"] == 1, counts
+        is_valid, message = verify_inventory_counts()
+        assert is_valid, message
+
+        # Los contadores guardados también coinciden al volver a leerlos
+        data_manager.clear_cache()
+        assert get_inventory_counts() == counts
+        assert verify_inventory_counts()[0]
+
+    print("Contadores de inventario: OK\n")
+
+
+def test_bulk_state_update():
+    """El cambio de estado masivo informa cada herramienta y deja los contadores coherentes."""
+    print("=== Prueba de Cambio de Estado Masivo ===\n")
+
+    with temporary_data():
+        ids = [create_tool(_sample_tool(number))[2] for number in range(1, 6)]
+        success, message, report = update_tool_states(ids[:3], "En Uso")
+        assert success and report["actualizadas"] == ids[:3], report
+        success, message, report = update_tool_states({"estado": "En Uso"}, "Fuera de Servicio")
+        assert success and sorted(report["actualizadas"]) == ids[:3], report
+        success, message, report = update_tool_states([ids[0], 999, "x"], "Disponible")
+        assert report["no_encontradas"] == [999] and report["rechazadas"] == ["x"], report
+
+        # Un filtro desconocido no debe tomarse como "todas las herramientas"
+        success, message, report = update_tool_states({"estados": "Disponible"}, "En Uso")
+        assert not success and "estados" in message and not report["actualizadas"], message
+        assert not get_tools_by_state("En Uso")
+
+        counts = get_inventory_counts()["estado"]
+        assert counts["Disponible"] == 3 and counts["Fuera de Servicio"] == 2 and counts["En Uso"] == 0, counts
+        is_valid, message = verify_inventory_counts()
+        assert is_valid, message
+
+    print("Cambio de estado masivo: OK\n")
+
+
+def test_compact_round_trip():
+    """Los datos se leen igual en formato normal y compacto, en ambos sentidos y en JSON y JSON Lines."""
+    print("=== Prueba del Formato Compacto ===\n")
+
+    with temporary_data() as directory:
+        for number in range(1, 4):
+            create_tool(_sample_tool(number, estado=VALID_STATES[number % len(VALID_STATES)]))
+        expected = get_all_tools()
+
+        for kind in ("json", "jsonl"):
+            data_manager.set_backend(data_manager.create_backend(kind, compact=True))
+            assert data_manager.save_json_data(TOOL_DATA_FILE, expected)
+            data_manager.clear_cache()
+            assert get_all_tools() == expected
+
+            file_path = directory / f"{TOOL_DATA_FILE}.{kind}"
+            if kind == "json":
+                stored = json.loads(file_path.read_text(encoding="utf-8"))["registros"]
+            else:
+                stored = [json.loads(line) for line in file_path.read_text(encoding="utf-8").splitlines()[1:]]
+            assert all(isinstance(tool["estado"], int) for tool in stored), stored
+
+            # Un backend sin formato compacto lee el archivo compacto y lo
+            # vuelve a escribir en formato normal
+            data_manager.set_backend(data_manager.create_backend(kind))
+            assert get_all_tools() == expected
+            assert data_manager.save_json_data(TOOL_DATA_FILE, expected)
+            assert '"formato"' not in file_path.read_text(encoding="utf-8")
+            data_manager.clear_cache()
+            assert get_all_tools() == expected
+
+        # Un archivo compacto que no se puede decodificar no se sobrescribe
+        data_manager.set_backend(data_manager.create_backend("jsonl", compact=True))
+        assert data_manager.save_json_data(TOOL_DATA_FILE, expected)
+        file_path = directory / f"{TOOL_DATA_FILE}.jsonl"
+        header, *lines = file_path.read_text(encoding="utf-8").splitlines()
+        file_path.write_text("\n".join([header.replace('"version": 1', '"version": 99'), *lines]) + "\n",
+                             encoding="utf-8")
+        damaged = file_path.read_text(encoding="utf-8")
+        data_manager.clear_cache()
+        assert get_all_tools() == []
+        assert not insert_record(TOOL_DATA_FILE, {"id": 99, "nombre": "X"})
+        assert file_path.read_text(encoding="utf-8") == damaged
+        try:
+            data_manager.get_backend().load(TOOL_DATA_FILE)
+            raise AssertionError("La versión desconocida debía rechazarse")
+        except StorageError as e:
+            print(f"Archivo rechazado: {e}")
+
+    print("Formato compacto: OK\n")
+
+
+def _concurrent_tool_writer(directory: str, prefix: str, count: int) -> None:
+    """Proceso que da de alta herramientas en el mismo directorio de datos que otros."""
+    for name in data_manager.DATA_FILES:
+        data_manager.DATA_FILES[name] = Path(directory) / f"{name}.json"
+    id_generator.SEQUENCE_FILE = Path(directory) / "secuencias.json"
+    backend = data_manager.create_backend("json")
+    backend.compaction_threshold = 5
+    data_manager.set_backend(backend)
+    for number in range(count):
+        # Un alta sobre datos que otro proceso cambió se rechaza y se reintenta
+        for _ in range(1000):
+            if create_tool(_sample_tool(number, numero_serie=f"{prefix}-{number}"))[0]:
+                break
+        else:
+            raise RuntimeError("No se pudo dar de alta la herramienta")
+
+
+def test_concurrent_journal_writers():
+    """Varios procesos que agregan al journal y lo compactan no pierden altas."""
+    print("=== Prueba de Escrituras Concurrentes ===\n")
+
+    with temporary_data() as directory:
+        writers = [
+            multiprocessing.Process(target=_concurrent_tool_writer, args=(str(directory), prefix, 40))
+            for prefix in ("A", "B", "C")
+        ]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+            assert writer.exitcode == 0, writer.exitcode
+
+        data_manager.clear_cache()
+        tools = get_all_tools()
+        assert len(tools) == 120 and len({tool['id'] for tool in tools}) == 120, len(tools)
+
+    print("Escrituras concurrentes: OK\n")
+
+
+def test_commit_marker_recovery():
+    """recover() termina una escritura confirmada y descarta los temporales de una sin confirmar."""
+    print("=== Prueba de Recuperación de Escrituras ===\n")
+
+    with temporary_data() as directory:
+        backend = data_manager.get_backend()
+        assert data_manager.save_json_data(TOOL_DATA_FILE, [{"id": 1, "estado": "Disponible"}])
+        assert data_manager.save_json_data("mantenimientos", [])
+
+        # Escritura de dos entidades interrumpida después de la marca y de
+        # publicar sólo una de ellas
+        new_tools = [{"id": 1, "estado": "En Mantenimiento"}]
+        new_maintenances = [{"id": 1, "herramienta_id": 1, "estado": "En Curso"}]
+        temp_paths = {}
+        for filename, records in ((TOOL_DATA_FILE, new_tools), ("mantenimientos", new_maintenances)):
+            temp_paths[filename] = backend.write_temp_file(filename, records)
+        backend._write_commit_marker(temp_paths)
+        temp_paths[TOOL_DATA_FILE].replace(data_manager.DATA_FILES[TOOL_DATA_FILE])
+        assert (directory / COMMIT_MARKER_NAME).exists()
+
+        # Al arrancar (o cambiar de backend) se completa la escritura
+        data_manager.set_backend(data_manager.create_backend("json"))
+        assert not (directory / COMMIT_MARKER_NAME).exists()
+        assert data_manager.load_json_data(TOOL_DATA_FILE) == new_tools
+        assert data_manager.load_json_data("mantenimientos") == new_maintenances
+
+        # Un temporal sin marca es de una escritura que no se confirmó
+        orphan = data_manager.get_backend().write_temp_file(TOOL_DATA_FILE, [{"id": 7}])
+        assert data_manager.recover_storage() == []
+        assert not orphan.exists()
+        assert data_manager.load_json_data(TOOL_DATA_FILE) == new_tools
+        assert not list(directory.glob("*.tmp"))
+
+    print("Recuperación de escrituras: OK\n")
+
+
+def test_lookup_by_id_on_sqlite():
+    """Con SQLite, buscar por ID consulta sólo ese registro, sin cargar la entidad en caché."""
+    print("=== Prueba de Búsqueda por ID en SQLite ===\n")
+
+    with temporary_data() as directory:
+        backend = data_manager.create_backend("sqlite", directory / "datos.db")
+        data_manager.set_backend(backend)
+        try:
+            tool_id = create_tool(_sample_tool(1))[2]
+            success, message, user_id = create_user({
+                "nombre": "Ana", "apellido": "Pérez", "documento": "30111222",
+                "tipo_usuario": UserType.ESTUDIANTE.value, "email": "ana@example.com", "curso": "5A"
+            })
+            assert success, message
+            data_manager.clear_cache()
+
+            assert get_tool_by_id(tool_id)['numero_serie'] == "SN0001"
+            assert get_tool_by_id(999) is None
+            assert get_user_by_id(user_id)['documento'] == "30111222"
+            assert TOOL_DATA_FILE not in data_manager._cache and "usuarios" not in data_manager._cache
+
+            # Dentro de una transacción se ve la copia de trabajo
+            with transaction(TOOL_DATA_FILE):
+                update_tool_state(tool_id, "En Uso")
+                assert get_tool_by_id(tool_id)['estado'] == "En Uso"
+            assert get_tool_by_id(tool_id)['estado'] == "En Uso"
+        finally:
+            backend.close()
+
+    print("Búsqueda por ID en SQLite: OK\n")
+
+
+def test_tool_search_on_sqlite():
+    """Con SQLite, los filtros por estado y tipo se resuelven en la base, sin cargar la entidad."""
+    print("=== Prueba de Búsqueda de Herramientas en SQLite ===\n")
+
+    with temporary_data() as directory:
+        backend = data_manager.create_backend("sqlite", directory / "datos.db")
+        data_manager.set_backend(backend)
+        try:
+            ids = [
+                create_tool(_sample_tool(1, marca="Bosch", tipo="Máquina Eléctrica"))[2],
+                create_tool(_sample_tool(2, marca="Bosch"))[2],
+                create_tool(_sample_tool(3, marca="Stanley", ubicacion="Depósito - Estante B"))[2],
+            ]
+            assert update_tool_state(ids[1], "En Uso")[0]
+            data_manager.clear_cache()
+
+            assert [tool['id'] for tool in get_tools_by_state("Disponible")] == [ids[0], ids[2]]
+            assert [tool['id'] for tool in search_tools({"estado": "Disponible", "marca": "bos"})] == [ids[0]]
+            assert [tool['id'] for tool in search_tools({"tipo": "Herramienta Manual", "ubicacion": "depósito"})] == [ids[2]]
+            assert [tool['id'] for tool in search_tools({"estado": "En Uso", "nombre": "herramienta 2"})] == [ids[1]]
+            assert TOOL_DATA_FILE not in data_manager._cache
+        finally:
+            backend.close()
+
+    print("Búsqueda de herramientas en SQLite: OK\n")
+
+
+def test_accent_insensitive_user_search():
+    """La búsqueda de usuarios ignora mayúsculas y acentos y sigue a las altas, cambios y bajas."""
+    print("=== Prueba de Búsqueda de Usuarios sin Acentos ===\n")
+
+    with temporary_data():
+        jose = create_user(_sample_user(1, nombre="José", apellido="González"))[2]
+        maria = create_user(_sample_user(2, nombre="María", apellido="Gonzalo"))[2]
+        create_user(_sample_user(3, nombre="Pedro", apellido="Ramírez"))
+
+        assert [user['id'] for user in search_users("gonzalez")] == [jose]
+        assert [user['id'] for user in search_users("GONZÁ")] == [jose, maria]
+        assert [user['id'] for user in search_users("jose gon")] == []
+        assert [user['id'] for user in search_users("30000002")] == [maria]
+        # Términos más cortos que un trigrama se buscan recorriendo los usuarios
+        assert [user['id'] for user in search_users("SÉ")] == [jose]
+
+        assert update_user(jose, {"apellido": "Pérez"})[0]
+        assert search_users("gonzalez") == []
+        assert [user['id'] for user in search_users("perez")] == [jose]
+        assert delete_user(maria)[0]
+        assert search_users("maría") == []
+
+    print("Búsqueda sin acentos: OK\n")
+
+
+def test_user_search_planner():
+    """Cualquier combinación de filtros da lo mismo que verificarlos sobre todos los usuarios."""
+    print("=== Prueba del Planificador de Búsqueda de Usuarios ===\n")
+
+    def expected(search_term, user_type, course, role):
+        return [
+            user['id'] for user in get_all_users()
+            if (not search_term or any(search_term in str(user.get(field, "")).lower()
+                                       for field in ("nombre", "apellido", "documento")))
+            and (not user_type or user['tipo_usuario'] == user_type)
+            and (not course or user['tipo_usuario'] != "Estudiante" or user['curso'].lower() == course.lower())
+            and (not role or user['tipo_usuario'] != "Personal" or role.lower() in user['rol'].lower())
+        ]
+
+    with temporary_data():
+        for number in range(1, 31):
+            if number % 3 == 0:
+                fields = {"tipo_usuario": "Personal", "rol": ("Pañolero", "Preceptor")[number % 2]}
+            elif number % 5 == 0:
+                fields = {"tipo_usuario": "Administrador"}
+            else:
+                fields = {"curso": ("5A", "6B")[number % 2]}
+            assert create_user(_sample_user(number, **fields))[0]
+
+        combinations = 0
+        for search_term in ("", "nombre1", "apellido"):
+            for user_type in ("", "Estudiante", "Personal", "Administrador"):
+                for course in ("", "6b", "7C"):
+                    for role in ("", "pañol", "director"):
+                        result = [user['id'] for user in search_users(search_term, user_type, course, role)]
+                        assert result == expected(search_term, user_type, course, role), \
+                            (search_term, user_type, course, role, result)
+                        combinations += 1
+        print(f"Combinaciones verificadas: {combinations}")
+
+    print("Planificador de búsqueda: OK\n")
+
+
+def test_csv_import_error_rows():
+    """La importación CSV guarda las filas válidas e informa las rechazadas con su número de línea."""
+    print("=== Prueba de Importación CSV ===\n")
+
+    with temporary_data() as directory:
+        existing_id = create_user(_sample_user(1))[2]
+        csv_path = directory / "usuarios.csv"
+        csv_path.write_text(
+            "nombre,apellido,documento,tipo_usuario,email,curso,talleres_inscritos,rol\n"
+            "Ana,Pérez,40000001,Estudiante,ana@example.com,5A,Carpintería; Electrónica,\n"
+            "Luis,Gómez,12ab,Estudiante,luis@example.com,5A,,\n"
+            "Otra,Persona,30000001,Estudiante,otra@example.com,6B,,\n"
+            "Juan,Díaz,40000002,Personal,juan@example.com,,,Pañolero\n"
+            "Ana,Repetida,40000001,Estudiante,ana2@example.com,5A,,\n"
+            "Sin,Curso,40000003,Estudiante,sincurso@example.com,,,\n",
+            encoding="utf-8"
+        )
+
+        success, message, report = import_users_from_csv(csv_path, workers=1)
+        assert success, message
+        print(message)
+        assert [row["fila"] for row in report] == [3, 4, 6, 7], report
+        assert "Ya existe" in report[1]["errores"][0] and "repetido" in report[2]["errores"][0], report
+        assert all(row["errores"] for row in report)
+
+        users = {user['documento']: user for user in get_all_users()}
+        assert sorted(users) == ["30000001", "40000001", "40000002"], sorted(users)
+        assert users["30000001"]['id'] == existing_id
+        assert users["40000001"]['talleres_inscritos'] == ["Carpintería", "Electrónica"]
+        assert users["40000002"]['rol'] == "Pañolero"
+        assert users["40000002"]['id'] == users["40000001"]['id'] + 1
+
+        success, message, report = import_users_from_csv(directory / "no_existe.csv")
+        assert not success and report == [], message
+
+    print("Importación CSV: OK\n")
+
+
+def test_export_all():
+    """export_all genera un archivo por entidad con los registros filtrados, en CSV y JSON Lines."""
+    print("=== Prueba de Exportación ===\n")
+
+    with temporary_data() as directory:
+        create_user(_sample_user(1, talleres_inscritos=["Carpintería", "Electrónica"]))
+        create_user(_sample_user(2, tipo_usuario="Personal", rol="Pañolero"))
+        tool_ids = [create_tool(_sample_tool(number))[2] for number in range(1, 4)]
+        assert update_tool_state(tool_ids[1], "En Uso")[0]
+
+        results = export_all(directory / "csv")
+        assert set(results) == set(data_manager.DATA_FILES), results
+        assert all(success for success, _, _ in results.values()), results
+        assert results["usuarios"][2] == 2 and results[TOOL_DATA_FILE][2] == 3 and results["mantenimientos"][2] == 0
+        with open(directory / "csv" / "usuarios.csv", newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        assert [row["documento"] for row in rows] == ["30000001", "30000002"]
+        assert rows[0]["talleres_inscritos"] == "Carpintería;Electrónica" and rows[1]["rol"] == "Pañolero", rows
+
+        results = export_all(directory / "jsonl", "jsonl", columns={TOOL_DATA_FILE: ["id", "estado"]},
+                             filters={TOOL_DATA_FILE: {"estado": "Disponible"}})
+        lines = (directory / "jsonl" / f"{TOOL_DATA_FILE}.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"id": tool_ids[0], "estado": "Disponible"}, {"id": tool_ids[2], "estado": "Disponible"}
+        ], lines
+        assert results[TOOL_DATA_FILE][2] == 2
+
+        success, message, _ = export_all(directory / "xml", "xml")["usuarios"]
+        assert not success and not list(directory.glob("xml/*")), message
+        assert not list(directory.rglob("*.tmp"))
+
+    print("Exportación: OK\n")
+
+
+def test_cursor_pagination_across_deletes():
+    """Las páginas siguientes continúan después del cursor aunque se borren o agreguen registros."""
+    print("=== Prueba de Paginación con Cursor ===\n")
+
+    with temporary_data() as directory:
+        for kind in ("json", "sqlite"):
+            backend = data_manager.create_backend(kind, directory / "datos.db")
+            data_manager.set_backend(backend)
+            try:
+                ids = [create_tool(_sample_tool(number, numero_serie=f"{kind}-{number}",
+                                                nombre=f"Herramienta {chr(ord('J') - number)}"))[2]
+                       for number in range(10)]
+
+                page, cursor = list_tools(limit=4)
+                assert [tool['id'] for tool in page] == ids[:4] and cursor is not None
+                # Se borra el último entregado y dos que todavía no se entregaron
+                for tool_id in (ids[3], ids[4], ids[6]):
+                    assert delete_tool(tool_id)[0]
+                new_id = create_tool(_sample_tool(99, numero_serie=f"{kind}-99", nombre="Herramienta A"))[2]
+                page, cursor = list_tools(cursor, limit=4)
+                assert [tool['id'] for tool in page] == [ids[5], ids[7], ids[8], ids[9]], page
+                page, cursor = list_tools(cursor, limit=4)
+                assert [tool['id'] for tool in page] == [new_id] and cursor is None
+
+                # Orden por nombre: los nombres van de "J" a "A" a medida que crece el ID
+                names = []
+                cursor = None
+                while True:
+                    page, cursor = list_tools(cursor, limit=3, sort_key="nombre")
+                    names += [tool['nombre'] for tool in page]
+                    if cursor is None:
+                        break
+                assert names == sorted(tool['nombre'] for tool in get_all_tools()), names
+
+                for invalid in ("no-es-un-cursor", None):
+                    try:
+                        list_tools(invalid, limit=0 if invalid is None else 5)
+                        raise AssertionError("Debía rechazarse")
+                    except ValueError:
+                        pass
+                for tool in get_all_tools():
+                    delete_tool(tool['id'])
+            finally:
+                if kind == "sqlite":
+                    backend.close()
+
+    print("Paginación con cursor: OK\n")
+
+
+def test_table_renderer():
+    """Las tablas alinean las columnas, recortan los valores largos y escriben el encabezado una vez."""
+    print("=== Prueba de Tablas ===\n")
+
+    users = [
+        {"id": 1, "apellido": "González", "nombre": "José", "documento": "30111222",
+         "tipo_usuario": "Estudiante", "curso": "5A", "email": None},
+        {"id": 12, "apellido": "Pérez" * 10, "nombre": "Ana", "documento": "30111223",
+         "tipo_usuario": "Personal", "rol": "Pañolero", "email": "ana@example.com"},
+    ]
+    output = io.StringIO()
+    write_table(users, USER_COLUMNS, stream=output)
+    header, separator, first, second = output.getvalue().splitlines()
+    assert header.startswith("ID | Apellido") and set(separator) <= {"-", "+"}, header
+    assert first.split(" | ")[6] == "", first
+    assert first.split(" | ")[5].strip() == "5A" and second.split(" | ")[5].strip() == "Pañolero"
+    assert second.split(" | ")[1] == ("Pérez" * 10)[:MAX_COLUMN_WIDTH]
+    assert len({line.index(" | ") for line in (header, first, second)}) == 1
+    assert not any(line.endswith(" ") for line in (header, second))
+
+    output = io.StringIO()
+    tools = [{"id": number, "nombre": f"Herramienta {number}", "tipo": "Consumible", "marca": ["A", "B"],
+              "estado": "Disponible", "ubicacion": "Depósito"} for number in range(1, 8)]
+    assert write_table_stream(iter(tools), TOOL_COLUMNS, chunk_size=3, stream=output) == 7
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 9 and lines[0].startswith("ID") and lines[2].split(" | ")[3].strip() == "A, B", lines
+    assert write_table_stream(iter([]), TOOL_COLUMNS, stream=io.StringIO()) == 0
+
+    print("Tablas: OK\n")
+
+
+def test_location_tree():
+    """El árbol de ubicaciones agrupa cada subárbol y relocate_tools mueve el subárbol completo."""
+    print("=== Prueba del Árbol de Ubicaciones ===\n")
+
+    with temporary_data():
+        locations = [
+            "Taller de Carpintería - Estante A - Caja 1",
+            "Taller de Carpintería - Estante A - Caja 2",
+            "Taller de Carpintería - Estante B",
+            "Taller de Electrónica - Armario 3",
+        ]
+        ids = [create_tool(_sample_tool(number, ubicacion=location))[2]
+               for number, location in enumerate(locations, start=1)]
+
+        assert get_location_children() == {"Taller de Carpintería": 3, "Taller de Electrónica": 1}
+        assert get_location_children("taller de carpinteria") == {"Estante A": 2, "Estante B": 1}
+        assert count_tools_in_location(["TALLER DE CARPINTERÍA", "estante a"]) == 2
+        assert sorted(tool['id'] for tool in get_tools_in_location("Taller de Carpintería - Estante A")) == ids[:2]
+        assert count_tools_in_location("Taller de Carpintería - Estante") == 0
+        assert get_tools_in_location("") == []
+
+        success, message, moved = relocate_tools("Taller de Carpintería - Estante A", "Depósito - Estante 4")
+        assert success and moved == 2, message
+        assert get_tool_by_id(ids[1])['ubicacion'] == "Depósito - Estante 4 - Caja 2"
+        assert get_location_children("Taller de Carpintería") == {"Estante B": 1}
+        assert get_location_children("Depósito - Estante 4") == {"Caja 1": 1, "Caja 2": 1}
+        assert count_tools_in_location("Taller de Carpintería - Estante A") == 0
+
+        assert relocate_tools("", "Depósito")[0] is False
+        assert relocate_tools("Sin Herramientas", "Depósito")[2] == 0
+        assert delete_tool(ids[3])[0]
+        assert "Taller de Electrónica" not in get_location_children()
+
+    print("Árbol de ubicaciones: OK\n")
+
+
+def test_validate_many():
+    """validate_many informa los errores de los registros guardados, igual en serie que en paralelo."""
+    print("=== Prueba de Validación por Lotes ===\n")
+
+    with temporary_data():
+        tools = [dict(_sample_tool(number), id=number) for number in range(1, 9)]
+        tools[2]['estado'] = "Perdida"
+        tools[5]['fecha_adquisicion'] = "2024-02-30"
+        del tools[6]['marca']
+        assert save_json_data(TOOL_DATA_FILE, tools)
+
+        serial = list(validate_many(TOOL_DATA_FILE, iter_records(TOOL_DATA_FILE), workers=1))
+        assert [tool_id for tool_id, _ in serial] == list(range(1, 9))
+        assert [tool_id for tool_id, errors in serial if errors] == [3, 6, 7], serial
+        assert any("Estado" in error for error in serial[2][1])
+
+        # Los registros de la caché son de solo lectura: el reparto entre
+        # procesos debe poder enviarlos igual
+        original_minimum = validators.PARALLEL_MIN_RECORDS
+        validators.PARALLEL_MIN_RECORDS = 1
+        try:
+            parallel = list(validate_many(TOOL_DATA_FILE, iter_records(TOOL_DATA_FILE), workers=2, chunk_size=3))
+        finally:
+            validators.PARALLEL_MIN_RECORDS = original_minimum
+        assert parallel == serial, parallel
+
+        try:
+            list(validate_many("desconocida", []))
+            raise AssertionError("Una entidad sin validador debía rechazarse")
+        except ValueError:
+            pass
+
+    print("Validación por lotes: OK\n")
+
+
+def test_id_sequences():
+    """Los IDs se reservan en bloques sin repetirse y un archivo de secuencias dañado se reconstruye."""
+    print("=== Prueba de Secuencias de IDs ===\n")
+
+    with temporary_data() as directory:
+        # La secuencia nueva arranca después del mayor ID existente
+        assert save_json_data(TOOL_DATA_FILE, [dict(_sample_tool(1), id=40)])
+        assert list(id_generator.reserve_ids(TOOL_DATA_FILE, 3)) == [41, 42, 43]
+        tool_id = create_tool(_sample_tool(2))[2]
+        assert tool_id == 44
+        # Los IDs de registros eliminados no se vuelven a entregar
+        assert delete_tool(tool_id)[0]
+        assert id_generator.allocate_id(TOOL_DATA_FILE) == 45
+        assert id_generator.allocate_id("usuarios") == 1
+        try:
+            id_generator.reserve_ids(TOOL_DATA_FILE, 0)
+            raise AssertionError("Una reserva vacía debía rechazarse")
+        except ValueError:
+            pass
+
+        # Archivo cortado a la mitad: se rescatan los valores legibles y
+        # ninguna secuencia queda por debajo de los datos
+        sequence_file = directory / "secuencias.json"
+        damaged = '{"herramientas": 30, "usuarios": 9, "mantenim'
+        sequence_file.write_text(damaged, encoding="utf-8")
+        assert id_generator.allocate_id("usuarios") == 10
+        assert id_generator.allocate_id(TOOL_DATA_FILE) == 41
+        assert (directory / "secuencias.json.corrupto").read_text(encoding="utf-8") == damaged
+        sequences = json.loads(sequence_file.read_text(encoding="utf-8"))
+        assert sequences["herramientas"] == 41 and sequences["usuarios"] == 10, sequences
+        assert set(sequences) == set(data_manager.DATA_FILES), sequences
+
+        # Valores que no son enteros también se consideran un archivo dañado
+        sequence_file.write_text('{"herramientas": "45", "usuarios": 12}', encoding="utf-8")
+        assert id_generator.allocate_id("usuarios") == 13
+        assert id_generator.allocate_id(TOOL_DATA_FILE) == 41
+
+    print("Secuencias de IDs: OK\n")
+
+
 def test_tool_crud():
     """Prueba las operaciones CRUD de herramientas."""
     print("=== Prueba del Sistema CRUD de Herramientas ===\n")
 
     # 1. Crear herramienta eléctrica
     electric_tool_data = {
-        "name": "Taladro de Banco Bosch PBD 40",
-        "type": "Máquina Eléctrica",
-        "brand": "Bosch",
-        "model": "PBD 40",
-        "serial_number": "BSH2024001",
-        "state": "Disponible",
-        "location": "Taller de Carpintería - Estante A",
-        "acquisition_date": "2024-01-15",
-        "notes": "Taladro principal del taller de carpintería"
+        "nombre": "Taladro de Banco Bosch PBD 40",
+        "tipo": "Máquina Eléctrica",
+        "marca": "Bosch",
+        "modelo": "PBD 40",
+        "numero_serie": "BSH2024001",
+        "estado": "Disponible",
+        "ubicacion": "Taller de Carpintería - Estante A",
+        "fecha_adquisicion": "2024-01-15",
+        "observaciones": "Taladro principal del taller de carpintería"
     }
 
     success, message, tool_id_1 = create_tool(electric_tool_data)
     print(f"Crear herramienta eléctrica: {success}")
     print(f"Mensaje: {message}")
+    assert success, message
     if success:
         print(f"ID asignado: {tool_id_1}")
     print()
 
     # 2. Crear kit de herramientas manuales
     manual_tool_data = {
-        "name": "Kit de Destornilladores Phillips",
-        "type": "Herramienta Manual",
-        "brand": "Stanley",
-        "model": "STHT60028",
-        "serial_number": "",
-        "state": "Disponible",
-        "location": "Taller de Electrónica - Armario 3",
-        "acquisition_date": "2024-02-20",
-        "notes": "Kit completo con 6 tamaños diferentes"
+        "nombre": "Kit de Destornilladores Phillips",
+        "tipo": "Herramienta Manual",
+        "marca": "Stanley",
+        "modelo": "STHT60028",
+        "numero_serie": "",
+        "estado": "Disponible",
+        "ubicacion": "Taller de Electrónica - Armario 3",
+        "fecha_adquisicion": "2024-02-20",
+        "observaciones": "Kit completo con 6 tamaños diferentes"
     }
 
     success, message, tool_id_2 = create_tool(manual_tool_data)
     print(f"Crear herramienta manual: {success}")
     print(f"Mensaje: {message}")
+    assert success, message
     if success:
         print(f"ID asignado: {tool_id_2}")
     print()
 
     # 3. Crear equipo de medición
     measurement_tool_data = {
-        "name": "Multímetro Digital Fluke 117",
-        "type": "Equipo de Medición",
-        "brand": "Fluke",
-        "model": "117",
-        "serial_number": "FLK117-2024-005",
-        "state": "Disponible",
-        "location": "Laboratorio de Electrónica - Mesa 1",
-        "acquisition_date": "2024-03-10",
-        "notes": "Multímetro profesional para mediciones precisas"
+        "nombre": "Multímetro Digital Fluke 117",
+        "tipo": "Equipo de Medición",
+        "marca": "Fluke",
+        "modelo": "117",
+        "numero_serie": "FLK117-2024-005",
+        "estado": "Disponible",
+        "ubicacion": "Laboratorio de Electrónica - Mesa 1",
+        "fecha_adquisicion": "2024-03-10",
+        "observaciones": "Multímetro profesional para mediciones precisas"
     }
 
     success, message, tool_id_3 = create_tool(measurement_tool_data)
     print(f"Crear equipo de medición: {success}")
     print(f"Mensaje: {message}")
+    assert success, message
     if success:
         print(f"ID asignado: {tool_id_3}")
     print()
 
     # 4. Intentar crear herramienta con datos inválidos
     invalid_tool_data = {
-        "name": "",  # Nombre vacío
-        "type": "Tipo Inexistente",  # Tipo inválido
-        "state": "Estado Inválido",  # Estado inválido
-        "location": "",  # Ubicación vacía
-        "acquisition_date": "fecha-inválida"  # Fecha mal formateada
+        "nombre": "",  # Nombre vacío
+        "tipo": "Tipo Inexistente",  # Tipo inválido
+        "estado": "Estado Inválido",  # Estado inválido
+        "ubicacion": "",  # Ubicación vacía
+        "fecha_adquisicion": "fecha-inválida"  # Fecha mal formateada
     }
 
     success, message, _ = create_tool(invalid_tool_data)
     print(f"Crear herramienta inválida: {success}")
     print(f"Mensaje: {message}\n")
+    assert not success
 
     return tool_id_1, tool_id_2, tool_id_3
 
@@ -107,7 +901,7 @@ def test_tool_retrieval():
     all_tools = get_all_tools()
     print(f"Total de herramientas: {len(all_tools)}")
     for tool in all_tools:
-        print(f"  - ID {tool['id']}: {tool['name']} ({tool['type']})")
+        print(f"  - ID {tool['id']}: {tool['nombre']} ({tool['tipo']})")
     print()
 
     # 2. Obtener herramienta por ID
@@ -116,10 +910,10 @@ def test_tool_retrieval():
         tool = get_tool_by_id(first_tool_id)
         if tool:
             print(f"Herramienta ID {first_tool_id}:")
-            print(f"  Nombre: {tool['name']}")
-            print(f"  Tipo: {tool['type']}")
-            print(f"  Estado: {tool['state']}")
-            print(f"  Ubicación: {tool['location']}")
+            print(f"  Nombre: {tool['nombre']}")
+            print(f"  Tipo: {tool['tipo']}")
+            print(f"  Estado: {tool['estado']}")
+            print(f"  Ubicación: {tool['ubicacion']}")
         else:
             print(f"No se encontró herramienta con ID {first_tool_id}")
     print()
@@ -133,31 +927,31 @@ def test_tool_search():
     available_tools = get_available_tools()
     print(f"Herramientas disponibles: {len(available_tools)}")
     for tool in available_tools:
-        print(f"  - {tool['name']} ({tool['type']})")
+        print(f"  - {tool['nombre']} ({tool['tipo']})")
     print()
 
     # 2. Buscar por tipo usando los nombres de campo correctos (español)
     electric_tools = search_tools({'tipo': 'Máquina Eléctrica'})
     print(f"Máquinas eléctricas: {len(electric_tools)}")
     for tool in electric_tools:
-        brand = tool.get('brand', 'Sin marca')
-        model = tool.get('model', 'Sin modelo')
-        print(f"  - {tool['name']} - {brand} {model}")
+        brand = tool.get('marca', 'Sin marca')
+        model = tool.get('modelo', 'Sin modelo')
+        print(f"  - {tool['nombre']} - {brand} {model}")
     print()
 
     # 3. Buscar por ubicación
     carpentry_tools = search_tools({'ubicacion': 'Carpintería'})
     print(f"Herramientas en taller de carpintería: {len(carpentry_tools)}")
     for tool in carpentry_tools:
-        print(f"  - {tool['name']} en {tool['location']}")
+        print(f"  - {tool['nombre']} en {tool['ubicacion']}")
     print()
 
     # 4. Buscar por marca
     bosch_tools = search_tools({'marca': 'Bosch'})
     print(f"Herramientas marca Bosch: {len(bosch_tools)}")
     for tool in bosch_tools:
-        model = tool.get('model', 'Sin modelo')
-        print(f"  - {tool['name']} ({model})")
+        model = tool.get('modelo', 'Sin modelo')
+        print(f"  - {tool['nombre']} ({model})")
     print()
 
 
@@ -172,8 +966,8 @@ def test_tool_state_management(tool_id: int):
     # 1. Obtener herramienta actual
     tool = get_tool_by_id(tool_id)
     if tool:
-        print(f"Herramienta: {tool['name']}")
-        print(f"Estado actual: {tool['state']}")
+        print(f"Herramienta: {tool['nombre']}")
+        print(f"Estado actual: {tool['estado']}")
     print()
 
     # 2. Cambiar a "En Uso"
@@ -184,7 +978,7 @@ def test_tool_state_management(tool_id: int):
     # Verificar cambio
     tool = get_tool_by_id(tool_id)
     if tool:
-        print(f"Nuevo estado: {tool.get('estado', tool.get('state', 'N/A'))}")
+        print(f"Nuevo estado: {tool.get('estado', 'N/A')}")
     print()
 
     # 3. Cambiar a "En Mantenimiento"
@@ -206,6 +1000,66 @@ def test_tool_state_management(tool_id: int):
     print()
 
 
+def test_maintenance_scheduling(tool_id: int):
+    """Prueba la agenda de mantenimientos preventivos."""
+    print("=== Prueba de Agenda de Mantenimientos ===\n")
+
+    if not tool_id:
+        print("No hay ID de herramienta para probar")
+        return
+
+    today = date.today()
+    success, message, maintenance_id = schedule_maintenance(tool_id, today + timedelta(days=2), frequency_days=30,
+                                                            description="Lubricación y ajuste")
+    assert success, message
+    print(f"Programar mantenimiento: {message}")
+    success, message, later_id = schedule_maintenance(tool_id, today + timedelta(days=40))
+    assert success, message
+    print(f"Programar mantenimiento lejano: {message}")
+
+    due_ids = [maintenance['id'] for maintenance in get_due_this_week()]
+    assert maintenance_id in due_ids
+    assert later_id not in due_ids
+
+    success, message = reschedule_maintenance(later_id, today + timedelta(days=1))
+    assert success, message
+    print(f"Reprogramar: {message}")
+    assert later_id in [maintenance['id'] for maintenance in get_due_this_week()]
+
+    success, message = start_maintenance(maintenance_id, "2024-13-40")
+    assert not success and "Fecha de inicio" in message, message
+
+    # Una herramienta fuera de servicio no entra en mantenimiento: al
+    # completarlo quedaría como disponible
+    assert update_tool_state(tool_id, ToolState.FUERA_DE_SERVICIO.value)[0]
+    success, message = start_maintenance(maintenance_id)
+    assert not success, message
+    print(f"Iniciar sobre herramienta fuera de servicio: {message}")
+    assert get_tool_by_id(tool_id)['estado'] == ToolState.FUERA_DE_SERVICIO.value
+    assert maintenance_id in [maintenance['id'] for maintenance in get_due_this_week()]
+    assert update_tool_state(tool_id, ToolState.DISPONIBLE.value)[0]
+
+    success, message = start_maintenance(maintenance_id)
+    assert success, message
+    print(f"Iniciar: {message}")
+    assert get_tool_by_id(tool_id)['estado'] == ToolState.EN_MANTENIMIENTO.value
+
+    success, message, next_id = complete_maintenance(maintenance_id, cost=1500)
+    assert success, message
+    print(f"Completar: {message}")
+    assert get_tool_by_id(tool_id)['estado'] == ToolState.DISPONIBLE.value
+    assert next_id is not None
+    assert next_id not in [maintenance['id'] for maintenance in get_due_this_week()]
+
+    completed = [maintenance['id'] for maintenance in get_tool_history(tool_id, end=today, status="Completado")]
+    assert completed == [maintenance_id], completed
+    summary = get_tool_maintenance_summary(tool_id)
+    assert summary['mantenimientos'] == 3, summary
+    assert summary['costo_total'] == 1500, summary
+    print(f"Resumen: {summary['mantenimientos']} mantenimientos, costo total {summary['costo_total']:.2f}")
+    print()
+
+
 def test_tool_update(tool_id: int):
     """Prueba la actualización completa de herramientas."""
     print("=== Prueba de Actualización de Herramientas ===\n")
@@ -218,22 +1072,22 @@ def test_tool_update(tool_id: int):
     tool = get_tool_by_id(tool_id)
     if tool:
         print(f"Datos actuales de herramienta ID {tool_id}:")
-        print(f"  Nombre: {tool['name']}")
-        print(f"  Ubicación: {tool['location']}")
-        print(f"  Notas: {tool.get('notes', 'Sin notas')}")
+        print(f"  Nombre: {tool['nombre']}")
+        print(f"  Ubicación: {tool['ubicacion']}")
+        print(f"  Notas: {tool.get('observaciones', 'Sin notas')}")
     print()
 
     # 2. Actualizar datos
     updated_data = {
-        "name": tool['name'],  # Mantener nombre
-        "type": tool['type'],  # Mantener tipo
-        "brand": tool.get('brand', ''),
-        "model": tool.get('model', ''),
-        "serial_number": tool.get('serial_number', ''),
-        "state": tool['state'],
-        "location": "Taller Principal - Estante B",  # Nueva ubicación
-        "acquisition_date": tool.get('acquisition_date', ''),
-        "notes": "Herramienta actualizada - Revisión completa realizada"  # Nuevas notas
+        "nombre": tool['nombre'],  # Mantener nombre
+        "tipo": tool['tipo'],  # Mantener tipo
+        "marca": tool.get('marca', ''),
+        "modelo": tool.get('modelo', ''),
+        "numero_serie": tool.get('numero_serie', ''),
+        "estado": tool['estado'],
+        "ubicacion": "Taller Principal - Estante B",  # Nueva ubicación
+        "fecha_adquisicion": tool.get('fecha_adquisicion', ''),
+        "observaciones": "Herramienta actualizada - Revisión completa realizada"  # Nuevas notas
     }
 
     success, message = update_tool(tool_id, updated_data)
@@ -244,8 +1098,8 @@ def test_tool_update(tool_id: int):
     updated_tool = get_tool_by_id(tool_id)
     if updated_tool:
         print(f"Datos actualizados:")
-        print(f"  Ubicación: {updated_tool['location']}")
-        print(f"  Notas: {updated_tool.get('notes', 'Sin notas')}")
+        print(f"  Ubicación: {updated_tool['ubicacion']}")
+        print(f"  Notas: {updated_tool.get('observaciones', 'Sin notas')}")
     print()
 
 
@@ -260,7 +1114,7 @@ def test_tool_deletion(tool_id: int):
     # 1. Verificar que la herramienta existe
     tool = get_tool_by_id(tool_id)
     if tool:
-        print(f"Herramienta a eliminar: {tool['name']}")
+        print(f"Herramienta a eliminar: {tool['nombre']}")
     else:
         print(f"Herramienta ID {tool_id} no encontrada")
         return
@@ -285,11 +1139,11 @@ def test_tool_validation():
 
     # Herramienta con múltiples errores
     invalid_tool = {
-        "name": "",  # Nombre vacío
-        "type": "Tipo Inválido",  # Tipo no válido
-        "state": "Estado Inválido",  # Estado no válido
-        "location": "",  # Ubicación vacía
-        "acquisition_date": "2024-13-45"  # Fecha inválida
+        "nombre": "",  # Nombre vacío
+        "tipo": "Tipo Inválido",  # Tipo no válido
+        "estado": "Estado Inválido",  # Estado no válido
+        "ubicacion": "",  # Ubicación vacía
+        "fecha_adquisicion": "2024-13-45"  # Fecha inválida
     }
 
     success, message, _ = create_tool(invalid_tool)
@@ -315,7 +1169,7 @@ def test_tools_by_state():
         tools = get_tools_by_state(state)
         print(f"{state}: {len(tools)} herramientas")
         for tool in tools:
-            print(f"  - {tool['name']}")
+            print(f"  - {tool['nombre']}")
         print()
 
 
@@ -404,18 +1258,43 @@ def test_validation_system():
 
 
 if __name__ == "__main__":
-    show_valid_values()
-    test_tool_validation()
-    tool_id_1, tool_id_2, tool_id_3 = test_tool_crud()
-    test_tool_retrieval()
-    test_tool_search()
-
-    # Usar los IDs creados para las pruebas adicionales
-    if tool_id_1:
-        test_tool_state_management(tool_id_1)
-        test_tool_update(tool_id_1)
-
-    if tool_id_3:  # Usar el tercer ID para la prueba de eliminación
-        test_tool_deletion(tool_id_3)
-
-    test_tools_by_state()
+    test_transaction_keeps_indexes()
+    test_transaction_rollback_and_conflict()
+    test_journal_replay()
+    test_duplicate_serial_rejected()
+    test_inventory_counters()
+    test_bulk_state_update()
+    test_compact_round_trip()
+    test_commit_marker_recovery()
+    test_concurrent_journal_writers()
+    test_lookup_by_id_on_sqlite()
+    test_tool_search_on_sqlite()
+    test_accent_insensitive_user_search()
+    test_user_search_planner()
+    test_csv_import_error_rows()
+    test_export_all()
+    test_cursor_pagination_across_deletes()
+    test_table_renderer()
+    test_location_tree()
+    test_validate_many()
+    test_id_sequences()
+
+    # Los recorridos de ejemplo también usan datos temporales, para que la
+    # prueba se pueda repetir sin tocar ni depender de data/
+    with temporary_data():
+        show_valid_values()
+        test_tool_validation()
+        tool_id_1, tool_id_2, tool_id_3 = test_tool_crud()
+        test_tool_retrieval()
+        test_tool_search()
+
+        # Usar los IDs creados para las pruebas adicionales
+        if tool_id_1:
+            test_tool_state_management(tool_id_1)
+            test_maintenance_scheduling(tool_id_1)
+            test_tool_update(tool_id_1)
+
+        if tool_id_3:  # Usar el tercer ID para la prueba de eliminación
+            test_tool_deletion(tool_id_3)
+
+        test_tools_by_state()